@@ -0,0 +1,221 @@
+# === benchmarks/run_benchmarks.py ===
+# Headless benchmark of the DICOM loading pipeline.
+# A synthetic series is generated (see synthetic_series.py), then each stage
+# is timed on it: header scan, pixel decode, windowing, orientation, texture
+# preparation and the end-to-end open used by the viewer. Throughput is
+# reported in slices/s together with the peak Python memory of each stage.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run_benchmarks --slices 300 --size 512
+#   python -m benchmarks.run_benchmarks --compressed --shuffle --json bench.json
+#
+# No window is opened; Kivy textures are only measured with --kivy-textures
+# (this needs an OpenGL context, i.e. a display).
+
+import argparse  # command line options
+import json  # machine-readable results
+import os  # paths and cache folder
+import shutil  # remove the temporary series
+import sys  # platform check for resource
+import tempfile  # temporary series and cache folders
+import time  # perf_counter timings
+import tracemalloc  # peak memory of each stage
+
+import numpy as np
+import pydicom
+from PIL import Image as PILImage
+
+from dicom_viewer.series_loader import scan_series, load_sorted_series
+from dicom_viewer.image_processor import read_slice_pixels, load_dicom_image, render_slice
+from dicom_viewer.dicom_windowing import apply_dicom_windowing
+from dicom_viewer.orientation import apply_radiological_orientation
+from dicom_viewer.background_loader import SeriesLoader
+from benchmarks.synthetic_series import make_series
+
+
+def peak_rss_mb():
+    """Peak resident memory of the process in MB (None where unavailable)."""
+    if sys.platform.startswith("win"):
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def measure(results, name, fn, count):
+    """
+    Run one stage, and record its duration, throughput and peak memory.
+
+    Parameters:
+    - results: list receiving the result dictionary
+    - name: stage name
+    - fn: function running the whole stage (called once)
+    - count: number of slices processed by the stage
+
+    Returns:
+    - the value returned by fn
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results.append({
+        "stage": name,
+        "seconds": seconds,
+        "slices": count,
+        "slices_per_s": count / seconds if seconds > 0 else None,
+        "peak_mb": peak / (1024 * 1024),
+    })
+    return value
+
+
+def run_loader(folder, cache_folder=None, volume_cache=False, processes=0):
+    """
+    Open a series with the viewer's background loader, without Kivy.
+
+    Returns:
+    - (seconds to first slice, seconds to full series, Volume)
+    """
+    first = []
+    start = time.perf_counter()
+    loader = SeriesLoader(
+        folder,
+        on_slice=lambda index, raw: first or first.append(time.perf_counter() - start),
+        cache_folder=cache_folder,
+        volume_cache=volume_cache,
+        processes=processes,
+    )
+    loader.start()
+    while loader.poll(max_slices=10000):
+        time.sleep(0.001)
+    total = time.perf_counter() - start
+    loader.join()  # volume cache written, no thread left using the folders
+    if not first and loader.volume is not None and loader.volume.is_complete:
+        first.append(total)  # opened from the volume cache: everything at once
+    return (first[0] if first else None), total, loader.volume
+
+
+def run_kivy_textures(results, arrays):
+    """Time PIL and NumPy texture creation (needs an OpenGL context)."""
+    from kivy.core.window import Window  # noqa: F401  (creates the GL context)
+    from dicom_viewer.texture_utils import pil_to_texture, array_to_texture
+
+    images = [PILImage.fromarray(a) for a in arrays]
+    measure(results, "pil_to_texture", lambda: [pil_to_texture(img) for img in images], len(arrays))
+    measure(results, "array_to_texture (new)", lambda: [array_to_texture(a) for a in arrays], len(arrays))
+
+    def reuse():
+        tex = None
+        for a in arrays:
+            tex = array_to_texture(a, tex)
+    measure(results, "array_to_texture (reused)", reuse, len(arrays))
+
+
+def run_benchmarks(args):
+    """Generate the series, run every stage and return the results."""
+    work = tempfile.mkdtemp(prefix="radtrainer_bench_")
+    folder = os.path.join(work, "series")
+    cache = os.path.join(work, "cache")
+    results = []
+
+    try:
+        t0 = time.perf_counter()
+        make_series(folder, slices=args.slices, size=args.size, bits=args.bits,
+                    compressed=args.compressed, shuffle=args.shuffle,
+                    missing_tags=args.missing_tags)
+        print(f"Generated {args.slices} slices in {time.perf_counter() - t0:.1f} s ({folder})")
+        n = args.slices
+
+        # --- Header scan ---
+        measure(results, "load_sorted_series", lambda: load_sorted_series(folder), n)
+        slices = measure(results, "scan_series", lambda: scan_series(folder), n)
+        scan_series(folder, cache)  # build the persistent index
+        measure(results, "scan_series (indexed)", lambda: scan_series(folder, cache), n)
+
+        # --- Pixel decode ---
+        raws = measure(results, "read_slice_pixels", lambda: [read_slice_pixels(s) for s in slices], n)
+        measure(results, "pydicom dcmread + pixel_array",
+                lambda: [pydicom.dcmread(s.path).pixel_array for s in slices], n)
+        measure(results, "load_dicom_image", lambda: [load_dicom_image(s.path) for s in slices], n)
+
+        # --- Windowing and orientation ---
+        headers = [pydicom.dcmread(s.path, stop_before_pixels=True) for s in slices]
+        floats = [r.astype(np.float32) for r in raws]
+        windowed = measure(results, "apply_dicom_windowing (float)",
+                           lambda: [apply_dicom_windowing(f, h) for f, h in zip(floats, headers)], n)
+        del floats
+        measure(results, "apply_radiological_orientation",
+                lambda: [np.ascontiguousarray(apply_radiological_orientation(w, h))
+                         for w, h in zip(windowed, headers)], n)
+        arrays = measure(results, "render_slice (LUT + orientation)",
+                         lambda: [render_slice(r, s) for r, s in zip(raws, slices)], n)
+
+        # --- Texture preparation (CPU side of the upload) ---
+        measure(results, "PIL texture buffer (fromarray/convert/tobytes)",
+                lambda: [PILImage.fromarray(a).convert("L").tobytes() for a in arrays], n)
+        measure(results, "NumPy texture buffer (contiguous view)",
+                lambda: [np.ascontiguousarray(a).reshape(-1) for a in arrays], n)
+        if args.kivy_textures:
+            run_kivy_textures(results, arrays)
+        del raws, windowed, arrays
+
+        # --- End-to-end open (viewer loader, no Kivy) ---
+        first, total, _ = run_loader(folder, processes=args.processes)
+        results.append({"stage": "open: first slice", "seconds": first, "slices": 1})
+        results.append({"stage": "open: full series", "seconds": total, "slices": n,
+                        "slices_per_s": n / total if total else None})
+
+        run_loader(folder, cache, volume_cache=True, processes=args.processes)  # write the volume cache
+        first, total, volume = run_loader(folder, cache, volume_cache=True, processes=args.processes)
+        if volume is None or not isinstance(volume.pixels, np.memmap):
+            raise RuntimeError("reopen did not use the volume cache (the series was decoded again)")
+        results.append({"stage": "reopen: volume cache", "seconds": total, "slices": n,
+                        "slices_per_s": n / total if total else None})
+    finally:
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    return results
+
+
+def print_results(results):
+    """Print the results as a table."""
+    print(f"{'stage':50s} {'seconds':>10s} {'slices/s':>10s} {'peak MB':>9s}")
+    for r in results:
+        seconds = f"{r['seconds']:.4f}" if r.get("seconds") is not None else "-"
+        rate = f"{r['slices_per_s']:.1f}" if r.get("slices_per_s") else "-"
+        peak = f"{r['peak_mb']:.1f}" if r.get("peak_mb") is not None else "-"
+        print(f"{r['stage']:50s} {seconds:>10s} {rate:>10s} {peak:>9s}")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"Peak process RSS: {rss:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the RadTrainer DICOM pipeline on a synthetic series.")
+    parser.add_argument("--slices", type=int, default=200, help="number of slices (default 200)")
+    parser.add_argument("--size", type=int, default=512, help="matrix size (default 512)")
+    parser.add_argument("--bits", type=int, choices=(8, 16), default=16, help="bits allocated (default 16)")
+    parser.add_argument("--compressed", action="store_true", help="RLE Lossless pixel data")
+    parser.add_argument("--shuffle", action="store_true", help="random file names")
+    parser.add_argument("--missing-tags", action="store_true", help="omit window/rescale/position tags")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="decoding processes for compressed series in the open stages (default 0)")
+    parser.add_argument("--kivy-textures", action="store_true", help="also time Kivy texture creation (needs a display)")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="keep the generated series and caches")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": vars(args), "results": results, "peak_rss_mb": peak_rss_mb()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
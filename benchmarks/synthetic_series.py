@@ -0,0 +1,120 @@
+# === benchmarks/synthetic_series.py ===
+# This file generates synthetic DICOM series with pydicom, so the loading
+# pipeline can be measured without real patient data.
+# Options cover the cases that matter for performance: slice count, matrix
+# size, bit depth, compressed (RLE) or uncompressed pixel data, shuffled
+# file names and missing optional tags.
+
+import os  # output paths
+import random  # shuffled file names
+import numpy as np
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import (
+    CTImageStorage,
+    ExplicitVRLittleEndian,
+    RLELossless,
+    generate_uid,
+)
+
+
+def phantom_slice(index, count, size, bits):
+    """
+    Create the stored pixel values of one synthetic slice: a body-like
+    ellipse whose content changes along the series, on an air background.
+
+    Parameters:
+    - index, count: slice position in the series
+    - size: matrix size (size x size)
+    - bits: 8 or 16 bits allocated
+
+    Returns:
+    - numpy array (uint8 for 8 bits, int16 stored values for 16 bits)
+    """
+    y, x = np.mgrid[-1:1:size * 1j, -1:1:size * 1j]
+    t = index / max(count - 1, 1)
+
+    hu = np.full((size, size), -1000.0)  # air
+    body = (x / 0.9) ** 2 + (y / 0.7) ** 2 < 1
+    hu[body] = 40.0  # soft tissue
+    organ = ((x - 0.3 * np.cos(t * np.pi)) / 0.25) ** 2 + (y / 0.3) ** 2 < 1
+    hu[organ] = 300.0 + 400.0 * t  # contrast-enhanced structure moving through the series
+    hu += np.random.default_rng(index).normal(0, 10, hu.shape)  # noise, as in real CT
+
+    if bits == 8:
+        return np.clip((hu + 1000) / 8, 0, 255).astype(np.uint8)
+    return np.clip(hu + 1024, -2048, 2047).astype(np.int16)  # 12-bit signed, stored = HU - intercept
+
+
+def make_series(folder, slices=100, size=512, bits=16, compressed=False,
+                shuffle=False, missing_tags=False, seed=0):
+    """
+    Write a synthetic CT series to a folder.
+
+    Parameters:
+    - folder: output folder (created if needed)
+    - slices: number of slices
+    - size: matrix size (rows = columns = size)
+    - bits: 8 or 16 bits allocated
+    - compressed: RLE Lossless instead of uncompressed pixel data
+    - shuffle: random file names, so directory order says nothing about slice order
+    - missing_tags: omit window, rescale and ImagePositionPatient tags
+      (exercises the fallback paths)
+    - seed: random seed for shuffled names
+
+    Returns:
+    - list of written file paths
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    study_uid, series_uid, frame_uid = generate_uid(), generate_uid(), generate_uid()
+    names = [f"slice_{i:05d}.dcm" for i in range(slices)]
+    if shuffle:
+        names = [f"{rng.getrandbits(64):016x}.dcm" for _ in range(slices)]
+
+    paths = []
+    for i in range(slices):
+        ds = Dataset()
+        ds.file_meta = FileMetaDataset()
+        ds.file_meta.MediaStorageSOPClassUID = CTImageStorage
+        ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+        ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+        ds.SOPClassUID = CTImageStorage
+        ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID
+        ds.StudyInstanceUID = study_uid
+        ds.SeriesInstanceUID = series_uid
+        ds.FrameOfReferenceUID = frame_uid
+        ds.Modality = "CT"
+        ds.PatientName = "Synthetic^Phantom"
+        ds.PatientID = "SYNTH0001"
+        ds.InstanceNumber = i + 1
+
+        ds.Rows = size
+        ds.Columns = size
+        ds.SamplesPerPixel = 1
+        ds.PhotometricInterpretation = "MONOCHROME2"
+        ds.BitsAllocated = bits
+        ds.BitsStored = 8 if bits == 8 else 12
+        ds.HighBit = ds.BitsStored - 1
+        ds.PixelRepresentation = 0 if bits == 8 else 1
+        ds.PixelSpacing = [0.7, 0.7]
+        ds.SliceThickness = 1.0
+
+        if not missing_tags:
+            ds.ImagePositionPatient = [-180.0, -180.0, -1.0 * i]
+            ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+            ds.RescaleSlope = 1 if bits == 16 else 8
+            ds.RescaleIntercept = -1024 if bits == 16 else -1000
+            ds.WindowCenter = 40
+            ds.WindowWidth = 400
+
+        arr = phantom_slice(i, slices, size, bits)
+        ds.PixelData = arr.tobytes()
+        if compressed:
+            ds.compress(RLELossless, arr, generate_instance_uid=False)  # pydicom's native RLE encoder
+
+        path = os.path.join(folder, names[i])
+        ds.save_as(path, enforce_file_format=True)
+        paths.append(path)
+
+    return paths
@@ -1,4 +1,56 @@
 # === config.py ===
 
+import os  # default cache path and number of cores
+
 # Define the folder where datasets are stored
-DATA_FOLDER = "/Users/guillaumefahrni/Desktop/radtrainer_data"
\ No newline at end of file
+DATA_FOLDER = "/Users/guillaumefahrni/Desktop/radtrainer_data"
+
+# Folder where RadTrainer keeps its caches (series indexes, ...)
+CACHE_FOLDER = os.path.join(os.path.expanduser("~"), ".radtrainer_cache")
+
+# Keep decoded series in CACHE_FOLDER (.npy, memory-mapped on reopen).
+# Uses about 2 bytes per voxel of disk space per dataset.
+VOLUME_CACHE = True
+
+# Maximum number of slice textures kept in GPU memory
+TEXTURE_CACHE_SIZE = 64
+
+# Number of slices prepared ahead of the current one while scrolling
+PREFETCH_SLICES = 8
+
+# Number of processes decoding compressed (JPEG, JPEG 2000, RLE) series; 0 uses threads only
+DECODE_PROCESSES = os.cpu_count() or 1
+
+# Large series (1024x1024 and up): keep a 1/4 resolution preview of every slice,
+# decoded first when the codec allows it (JPEG 2000, JPEG baseline), so the whole
+# stack can be browsed while full-resolution slices are still loading
+PROGRESSIVE_PREVIEW = True
+
+# Memory budget in bytes for decoded volumes, previews, textures and slab caches of
+# all open datasets (0: unlimited). When it is exceeded, the least recently viewed
+# datasets are released first; a series larger than the budget is decoded into a
+# memory-mapped file in CACHE_FOLDER. 3 GB suits the 8 GB lab machines.
+MEMORY_BUDGET = 3 * 2 ** 30
+
+# Number of recently viewed datasets kept decoded for the session (with their slice,
+# plane and window), so going back to a case is instant; 0 reloads every time.
+# Their memory counts in MEMORY_BUDGET, which evicts the least recently viewed first.
+SESSION_CACHE_SIZE = 4
+
+# Default cine playback rate (slices per second); the viewer offers 10 to 60 fps
+CINE_FPS = 20
+
+# Apply window/level on the GPU: slices are uploaded once as 16-bit textures and
+# dragging the window only changes shader parameters. Falls back to CPU windowing
+# when the OpenGL context cannot run the shader.
+GPU_WINDOWING = False
+
+# Start loading a dataset as soon as it is selected on the main screen
+# (before Start is pressed); set to False to save memory and disk I/O
+PRELOAD_ON_SELECT = True
+
+# Collect per-stage timings from startup (the viewer's "Stats" button also turns them on)
+PERF_STATS = False
+
+# JSON file receiving the timing statistics when the application closes (if collected)
+PERF_LOG = os.path.join(CACHE_FOLDER, "perf_stats.json")
@@ -0,0 +1,386 @@
+# === dicom_viewer/background_loader.py ===
+# This file contains a loader that reads a DICOM series in the background.
+# The folder is scanned and the slices are decoded into a Volume on worker threads, so the
+# Kivy main thread stays responsive while a long series is loading.
+# Finished slices are queued and handed back to the main thread through poll(),
+# which DicomScreen calls from a Kivy Clock callback.
+# With the volume cache enabled, a series decoded before is memory-mapped
+# from the cache instead, and a newly decoded series is written to it.
+# Compressed series can be decoded by a process pool (see process_decoder).
+# Folders holding several series load the main one unless another is asked
+# for; the list of series is reported so the viewer can switch between them.
+# With previews enabled, large compressed slices are first decoded at reduced
+# resolution (whole stack), then at full resolution, nearest to the focus first.
+# Decoded memory is accounted in the shared memory budget; a series larger
+# than the budget is decoded into a memory-mapped file instead of RAM.
+
+import os  # used to choose the number of worker threads
+import queue  # thread-safe queue to pass results back to the main thread
+import threading  # worker threads and cancellation event
+
+from .series_loader import scan_folder, select_series, series_id, series_label  # one header parse per file
+from .volume import Volume, volume_layout  # contiguous array holding the whole series
+from .image_processor import can_decode_reduced, read_slice_preview  # low-resolution previews
+from .series_index import series_fingerprint  # detects changes in the dataset folder
+from .volume_cache import open_cached_volume, save_volume_cache, create_spilled_volume  # memory-mapped volumes
+from .memory_budget import memory, resident_bytes, VOLUME, PREVIEW  # shared memory budget
+from .process_decoder import ProcessDecoder  # multi-process decoding of compressed slices
+
+# Default number of decoding threads (pydicom releases the GIL during file I/O
+# and most NumPy operations, so a few threads give a good speed-up)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class SeriesLoader:
+    """
+    Load a DICOM series progressively on background threads.
+
+    Responsibilities:
+    - Scan and sort the series folder without blocking the UI
+    - Decode slices on worker threads, nearest to the focused slice first
+    - Queue results so the main thread can create textures from them
+
+    Callbacks are only ever called from poll(), i.e. on the thread that
+    calls poll() (the Kivy main thread in the viewer).
+    """
+
+    def __init__(self, folder, on_series=None, on_slice=None, on_error=None,
+                 on_done=None, decode=None, workers=DEFAULT_WORKERS,
+                 focus=0, cache_folder=None, volume_cache=False, processes=0,
+                 series=None, on_series_list=None, preview=False, on_preview=None):
+        """
+        Initialize the loader (nothing starts until start() is called).
+
+        Parameters:
+        - folder: path to the folder containing the DICOM series
+        - on_series: callback(volume) called once the series has been sorted
+          (the Volume is allocated but its slices are not decoded yet)
+        - on_slice: callback(index, result) called for each decoded slice
+        - on_error: callback(index, path, exception) for slices that failed
+        - on_done: callback() called once every slice has been processed
+          (and the volume cache written, when enabled)
+        - decode: function(volume, index) used to decode one slice
+          (default: Volume.load_slice, the result is the stored pixel array)
+        - workers: number of decoding threads
+        - focus: slice index to decode first (e.g. the displayed slice)
+        - cache_folder: root cache folder for the persistent series index
+        - volume_cache: also keep decoded volumes in the cache folder and
+          memory-map them when the dataset is opened again
+        - processes: number of decoding processes used for compressed
+          (JPEG, JPEG 2000, RLE) series; 0 decodes them on threads
+        - series: series_id of the series to load (None: the main series)
+        - on_series_list: callback(series_list) called with the
+          [(series_id, label), ...] of every series of the folder, main first
+        - preview: keep a low-resolution level for large series (see
+          Volume.enable_preview); slices that can be decoded at reduced
+          resolution get their preview before any full-resolution decode
+        - on_preview: callback(index) called when the preview of a slice is ready
+        """
+        self.folder = folder
+        self.on_series = on_series
+        self.on_slice = on_slice
+        self.on_error = on_error
+        self.on_done = on_done
+        self.decode = decode
+        self.workers = max(1, workers)
+        self.cache_folder = cache_folder
+        self.volume_cache = volume_cache and cache_folder is not None
+        self.processes = processes
+        self.series = series
+        self.on_series_list = on_series_list
+        self.preview = preview
+        self.on_preview = on_preview
+        self._process_decoder = None  # ProcessDecoder of a compressed series
+
+        self.series_list = []  # (series_id, label) of each series of the folder
+
+        self.volume = None  # Volume of the series, created after the scan
+        self.total = 0  # number of slices in the series
+        self.loaded = 0  # number of slices already handed to on_slice
+        self.previewed = 0  # number of previews already handed to on_preview
+        self.finished = False  # True once on_done has been called
+
+        self._focus = focus  # slice index the workers gravitate to
+        self._pending = set()  # slice indices not yet picked by a worker
+        self._preview_pending = set()  # slices waiting for a reduced-resolution decode
+        self._remaining = 0  # slices not yet finished (decoded or failed)
+        self._failed = 0  # slices that could not be decoded
+        self._fingerprint = None  # dataset fingerprint taken before the scan
+        self._lock = threading.Lock()  # protects _focus, _pending, _remaining, _failed
+        self._cancelled = threading.Event()  # set to stop all threads
+        self._resumed = threading.Event()  # cleared to pause the decoding threads
+        self._resumed.set()
+        self._results = queue.Queue()  # finished work, drained by poll()
+        self._threads = []
+
+    # -------------------------------
+    #   CONTROL (MAIN THREAD)
+    # -------------------------------
+
+    def start(self):
+        """
+        Start scanning the folder on a background thread.
+        Decoding threads are started once the series order is known.
+        """
+        t = threading.Thread(target=self._scan, daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def cancel(self):
+        """
+        Stop loading. Results that are still queued are discarded.
+        """
+        self._cancelled.set()
+        self._resumed.set()  # wake paused threads so they can exit
+        with self._lock:
+            self._pending.clear()
+            self._preview_pending.clear()
+        if self._process_decoder is not None:
+            self._process_decoder.release()
+
+    def pause(self):
+        """
+        Stop decoding after the slices in progress (e.g. while the dataset
+        is parked in the session cache). Results stay queued.
+        """
+        self._resumed.clear()
+
+    def resume(self):
+        """
+        Continue decoding after pause().
+        """
+        self._resumed.set()
+
+    def join(self, timeout=None):
+        """
+        Wait for the background threads to exit (e.g. before removing the
+        cache folder). The decoding threads are started by the scan thread,
+        which is joined first.
+
+        Parameters:
+        - timeout: maximum seconds to wait for each thread (None: no limit)
+        """
+        i = 0
+        while i < len(self._threads):
+            self._threads[i].join(timeout)
+            i += 1
+
+    @property
+    def cancelled(self):
+        """True if cancel() has been called."""
+        return self._cancelled.is_set()
+
+    def set_focus(self, index):
+        """
+        Tell the workers which slice the user is looking at.
+        Slices closest to this index are decoded next.
+        """
+        with self._lock:
+            self._focus = index
+
+    def poll(self, max_slices=64):
+        """
+        Deliver queued results by calling the callbacks.
+
+        Parameters:
+        - max_slices: maximum number of decoded slices delivered per call,
+          so the work done in on_slice is spread over several frames
+
+        Returns:
+        - True while loading is still in progress, False once finished
+        """
+        if self.finished:
+            return False  # polled again after a pause in the session cache
+        delivered = 0
+        while delivered < max_slices and not self.cancelled:
+            try:
+                kind, *payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "series_list":
+                self.series_list = payload[0]
+                if self.on_series_list:
+                    self.on_series_list(self.series_list)
+            elif kind == "series":
+                self.volume = payload[0]
+                self.total = self.volume.count()
+                self.loaded = int(self.volume.loaded.sum())  # all slices when opened from the cache
+                if self.on_series:
+                    self.on_series(self.volume)
+            elif kind == "preview":
+                self.previewed += 1
+                if self.on_preview:
+                    self.on_preview(payload[0])
+            elif kind == "slice":
+                index, result = payload
+                self.loaded += 1
+                delivered += 1
+                if self.on_slice:
+                    self.on_slice(index, result)
+            elif kind == "error":
+                index, path, e = payload
+                if self.on_error:
+                    self.on_error(index, path, e)
+                else:
+                    print("Image error:", path, e)
+            elif kind == "done":
+                self.finished = True
+                if self.on_done:
+                    self.on_done()
+                return False
+
+        return not self.cancelled
+
+    # -------------------------------
+    #   WORKER THREADS
+    # -------------------------------
+
+    def _scan_folder(self):
+        """Read (or look up) the headers of the folder and report its series."""
+        try:
+            series = scan_folder(self.folder, self.cache_folder)
+        except Exception as e:
+            print("Series scan error:", self.folder, e)
+            series = []
+        self._results.put(("series_list", [(series_id(s[0]), series_label(s)) for s in series]))
+        return series
+
+    def _scan(self):
+        """Sort the series, allocate its volume, then start the decoding threads."""
+        if self.volume_cache:
+            try:
+                self._fingerprint = series_fingerprint(self.folder)
+                volume = open_cached_volume(self.cache_folder, self.folder, self._fingerprint, self.series)
+            except OSError as e:
+                print("Volume cache error:", self.folder, e)
+                volume = None
+            if volume is not None:
+                # Decoded before: nothing to decode, pages are read on demand
+                memory.set(self.folder, VOLUME, 0)  # file-backed: no RAM to account
+                self._results.put(("series", volume))
+                self._scan_folder()  # headers come from the series index: no file is parsed
+                self._results.put(("done",))
+                return
+
+        series = self._scan_folder()
+        slices = select_series(series, self.series)
+        if series and slices is series[0]:
+            self.series = None  # main series (also when the requested one is gone)
+
+        if self.cancelled:
+            return
+
+        rows, columns, dtype = volume_layout(slices)
+        nbytes = len(slices) * rows * columns * dtype.itemsize
+        volume = None
+        workers = self.workers
+        # Other datasets are released on the main thread (see schedule_enforce below):
+        # spill only if the volume would not fit even once they are
+        if not memory.fits(nbytes, release=True) and self.cache_folder is not None:
+            try:
+                volume = create_spilled_volume(self.cache_folder, self.folder, slices)
+            except OSError as e:
+                print("Volume spill error:", self.folder, e)
+        if volume is not None:
+            pass  # decoded on threads into the memory-mapped file
+        elif self.processes > 0 and self.decode is None and any(s.is_encapsulated for s in slices):
+            # CPU-bound codecs: decode in processes, straight into a shared-memory volume;
+            # one loader thread per process keeps the nearest-first order
+            self._process_decoder = ProcessDecoder(slices, self.processes)
+            volume = self._process_decoder.volume
+            workers = self.processes
+        else:
+            volume = Volume(slices)
+        memory.set(self.folder, VOLUME, resident_bytes(volume.pixels))
+        memory.schedule_enforce(keep=self.folder)  # make room: release other datasets first
+
+        previews = set()
+        if self.preview and self.decode is None and volume.enable_preview():
+            previews = {i for i, info in enumerate(slices) if can_decode_reduced(info)}
+            memory.set(self.folder, PREVIEW, volume.preview.nbytes,
+                       release=lambda: self._release_preview(volume))
+            memory.schedule_enforce(keep=self.folder)  # the preview goes first if it does not fit
+
+        with self._lock:
+            self._focus = min(max(self._focus, 0), max(len(slices) - 1, 0))
+            self._pending = set(range(len(slices)))
+            self._preview_pending = previews
+            self._remaining = len(slices)
+
+        self._results.put(("series", volume))
+
+        if not slices:
+            self._results.put(("done",))
+            return
+
+        for _ in range(min(workers, len(slices))):
+            t = threading.Thread(target=self._decode_loop, args=(volume,), daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _next_index(self):
+        """
+        Pick the next slice nearest to the focus: previews first, then full
+        resolution. Returns (index, is_preview), index None when finished.
+        """
+        with self._lock:
+            pending = self._preview_pending or self._pending
+            if not pending:
+                return None, False
+            focus = self._focus
+            index = min(pending, key=lambda i: (abs(i - focus), i))
+            pending.discard(index)
+            return index, pending is self._preview_pending
+
+    def _release_preview(self, volume):
+        """Drop the preview level to free memory (memory budget callback)."""
+        with self._lock:
+            self._preview_pending.clear()  # no reduced decodes left to do
+        volume.drop_preview()
+
+    def _decode_preview(self, volume, index):
+        """Decode a slice at reduced resolution (failures are left to the full decode)."""
+        try:
+            volume.set_preview(index, read_slice_preview(volume.slices[index], volume.preview_factor))
+        except Exception:
+            return
+        self._results.put(("preview", index))
+
+    def _decode_loop(self, volume):
+        """Decode slices until none are left or loading is cancelled."""
+        while not self.cancelled:
+            self._resumed.wait()  # paused while the dataset is not viewed
+            if self.cancelled:
+                return
+            index, is_preview = self._next_index()
+            if index is None:
+                return
+            if is_preview:
+                self._decode_preview(volume, index)
+                continue
+
+            try:
+                if self.decode is not None:
+                    result = self.decode(volume, index)
+                elif self._process_decoder is not None:
+                    result = self._process_decoder.decode(index)
+                else:
+                    result = volume.load_slice(index)
+                self._results.put(("slice", index, result))
+            except Exception as e:
+                self._results.put(("error", index, volume.slices[index].path, e))
+                with self._lock:
+                    self._failed += 1
+
+            with self._lock:
+                self._remaining -= 1
+                finished = self._remaining == 0
+
+            if finished:
+                if self._process_decoder is not None:
+                    self._process_decoder.release()
+                if self.volume_cache and not self._failed and not self.cancelled:
+                    # written (or failed) before "done": a reopen right after finds the cache
+                    save_volume_cache(self.cache_folder, self.folder, volume, self._fingerprint, self.series)
+                self._results.put(("done",))
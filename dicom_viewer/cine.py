@@ -0,0 +1,140 @@
+# === dicom_viewer/cine.py ===
+# This file schedules cine playback: slices are played at a fixed rate
+# locked to wall-clock time. The slice due at a given time only depends on
+# the time elapsed since playback started, so when rendering or decoding
+# falls behind, late frames are skipped (and counted as dropped) instead of
+# slowing the playback down.
+# The player holds no Kivy objects: DicomScreen drives it from a Clock
+# callback and tells it whether each frame could be shown.
+
+import time  # achieved frame rate
+from collections import deque  # timestamps of recently shown frames
+
+DEFAULT_CINE_FPS = 20  # frames per second
+FPS_WINDOW = 2.0  # seconds over which the achieved frame rate is measured
+
+
+class CinePlayer:
+    """
+    Wall-clock frame scheduler for cine playback.
+
+    Responsibilities:
+    - Map elapsed time to the slice due now (looping or back and forth)
+    - Count the frames skipped because the display fell behind
+    - Measure the frame rate actually achieved
+    """
+
+    def __init__(self, fps=DEFAULT_CINE_FPS, bounce=True):
+        """
+        Initialize a stopped player.
+
+        Parameters:
+        - fps: playback rate in frames (slices) per second
+        - bounce: play back and forth; False loops from the last slice to the first
+
+        Attributes:
+        - playing: True between start() and stop()
+        - shown: frames displayed since start()
+        - dropped: frames skipped or not ready when due since start()
+        """
+        self.fps = max(1.0, float(fps))
+        self.bounce = bounce
+        self.playing = False
+        self.shown = 0
+        self.dropped = 0
+        self._start_time = 0.0  # time of frame 0
+        self._start_index = 0  # slice shown at frame 0
+        self._last_frame = -1  # last frame number handed out by tick()
+        self._shown_times = deque()  # times of the frames shown in the last FPS_WINDOW seconds
+
+    def start(self, index, now=None):
+        """
+        Start playing from a slice.
+
+        Parameters:
+        - index: slice shown first
+        - now: current time (time.perf_counter() by default)
+        """
+        self.playing = True
+        self.shown = 0
+        self.dropped = 0
+        self._shown_times.clear()
+        self._rebase(index, time.perf_counter() if now is None else now)
+
+    def stop(self):
+        """
+        Stop playing (statistics are kept until the next start).
+        """
+        self.playing = False
+
+    def set_fps(self, fps, index, now=None):
+        """
+        Change the playback rate, continuing from the slice shown now.
+        """
+        self.fps = max(1.0, float(fps))
+        if self.playing:
+            self._rebase(index, time.perf_counter() if now is None else now)
+
+    def _rebase(self, index, now):
+        """Make `index` frame 0 at time `now`."""
+        self._start_time = now
+        self._start_index = index
+        self._last_frame = -1
+
+    def tick(self, count, now=None):
+        """
+        Return the slice due now, if a new frame is due.
+
+        Parameters:
+        - count: number of slices
+        - now: current time (time.perf_counter() by default)
+
+        Returns:
+        - slice index to display, or None if no new frame is due yet
+          (frames that were due since the previous call are counted as dropped)
+        """
+        if not self.playing or count < 1:
+            return None
+        now = time.perf_counter() if now is None else now
+        frame = int((now - self._start_time) * self.fps)
+        if frame <= self._last_frame:
+            return None
+        self.dropped += frame - self._last_frame - 1  # frames the display was too late for
+        self._last_frame = frame
+        return self._index(self._start_index + frame, count)
+
+    def _index(self, position, count):
+        """Map a position along the playback to a slice index."""
+        if count == 1:
+            return 0
+        if not self.bounce:
+            return position % count
+        period = 2 * (count - 1)  # forward then backward
+        position %= period
+        return position if position < count else period - position
+
+    def frame_shown(self, now=None):
+        """
+        Record that the frame returned by tick() was displayed.
+        """
+        now = time.perf_counter() if now is None else now
+        self.shown += 1
+        self._shown_times.append(now)
+        while self._shown_times and self._shown_times[0] < now - FPS_WINDOW:
+            self._shown_times.popleft()
+
+    def frame_missed(self):
+        """
+        Record that the frame returned by tick() could not be displayed
+        (its slice was not decoded yet).
+        """
+        self.dropped += 1
+
+    def achieved_fps(self):
+        """
+        Return the frame rate actually displayed over the last FPS_WINDOW seconds.
+        """
+        if len(self._shown_times) < 2:
+            return 0.0
+        span = self._shown_times[-1] - self._shown_times[0]
+        return (len(self._shown_times) - 1) / span if span > 0 else 0.0
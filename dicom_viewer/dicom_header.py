@@ -0,0 +1,509 @@
+# === dicom_viewer/dicom_header.py ===
+# This file reads the header of a DICOM file once and keeps everything the
+# viewer needs later (sort position, geometry, rescale, windowing, pixel format
+# and the byte offset of the pixel data). Pixels can then be decoded from the
+# stored offset without parsing the header a second time.
+# Multi-frame files (e.g. enhanced CT/MR) give one SliceInfo per frame, with
+# the geometry of its per-frame functional groups and the location of its
+# own pixels in the file, so each frame can be decoded on its own.
+# DICOM files are recognized by their "DICM" preamble, not by their extension.
+
+import os  # file names
+import struct  # decode the pixel data element header
+import pydicom  # read DICOM headers
+from pydicom.errors import InvalidDicomError  # raised for files that are not DICOM
+from pydicom.uid import UID, ImplicitVRLittleEndian  # transfer syntax helpers
+from .orientation import get_anatomical_position  # Z position used for sorting
+from .dicom_windowing import get_window_parameters  # window center/width from metadata
+
+DICOM_MAGIC = b"DICM"  # written after the 128-byte preamble of every DICOM file
+PREAMBLE_LENGTH = 128
+SKIPPED_NAMES = ("DICOMDIR",)  # media directories: DICOM, but without images
+NON_DICOM_EXTENSIONS = ('.txt', '.json', '.xml', '.csv', '.ini', '.db', '.pdf',
+                        '.jpg', '.jpeg', '.png', '.bmp', '.zip', '.tmp')  # never opened
+PIXEL_DATA_TAG = (0x7FE0, 0x0010)  # (7FE0,0010) Pixel Data
+UNDEFINED_LENGTH = 0xFFFFFFFF  # length used by encapsulated (compressed) pixel data
+ITEM_TAG = (0xFFFE, 0xE000)  # item of encapsulated pixel data (offset table or fragment)
+SEQUENCE_DELIMITER_TAG = (0xFFFE, 0xE0DD)  # end of encapsulated pixel data
+
+
+def is_dicom_file_name(name):
+    """
+    True if a file may be DICOM, judging by its name only (DICOM files often
+    have no extension). Hidden files, DICOMDIR and common non-DICOM
+    extensions are excluded; the preamble decides for the others.
+    """
+    if name.startswith(".") or name.upper() in SKIPPED_NAMES:
+        return False
+    return os.path.splitext(name)[1].lower() not in NON_DICOM_EXTENSIONS
+
+
+def _check_preamble(fp, path):
+    """Raise InvalidDicomError unless the file starts with a DICOM preamble."""
+    preamble = fp.read(PREAMBLE_LENGTH + len(DICOM_MAGIC))
+    if preamble[PREAMBLE_LENGTH:] != DICOM_MAGIC:
+        raise InvalidDicomError(f"no DICOM preamble: {path}")
+
+
+def has_dicom_preamble(path):
+    """
+    True if the file starts with a DICOM preamble (only 132 bytes are read).
+    """
+    try:
+        with open(path, "rb") as fp:
+            _check_preamble(fp, path)
+        return True
+    except (OSError, InvalidDicomError):
+        return False
+
+
+def _float_or_none(value):
+    """Convert a DICOM value to float, None if missing or invalid."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_tuple_or_none(value):
+    """Convert a multi-valued DICOM element to a tuple of floats, None if invalid."""
+    try:
+        return tuple(float(v) for v in value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_plain_little_endian(transfer_syntax):
+    """True for little endian transfer syntaxes that are not deflated."""
+    try:
+        uid = UID(transfer_syntax)
+        return uid.is_little_endian and not uid.is_deflated
+    except ValueError:
+        return False  # unknown (private) transfer syntax
+
+
+class SliceInfo:
+    """
+    Header information of a single DICOM file.
+
+    Responsibilities:
+    - Keep the values extracted from the header in plain Python types
+    - Locate the pixel data inside the file so it can be read directly
+    """
+
+    def __init__(self, path):
+        """
+        Initialize an empty SliceInfo (use read_slice_info to fill it).
+
+        Attributes:
+        - path: path to the DICOM file
+        - series_uid: SeriesInstanceUID ("" if absent)
+        - series_number, series_description: shown in the series list
+        - position: anatomical Z position used to sort the series
+        - image_position: ImagePositionPatient (x, y, z) or None
+        - orientation: ImageOrientationPatient (6 values) or None
+        - pixel_spacing: PixelSpacing (row, column) in mm or None
+        - slice_thickness: SliceThickness in mm or None
+        - rows, columns: matrix size
+        - bits_allocated, bits_stored, pixel_representation: stored pixel format
+        - samples_per_pixel, planar_configuration, photometric: color layout
+        - number_of_frames: frames described by this SliceInfo (1 for
+          each frame of a multi-frame file)
+        - frame: index of the frame inside its file (0 for single-frame files)
+        - file_frames: number of frames stored in the file
+        - rescale_slope, rescale_intercept: modality rescale (1.0 / 0.0 if absent)
+        - window_center, window_width: default window or None
+        - transfer_syntax: TransferSyntaxUID of the file
+        - pixel_data_offset: byte offset of the pixel data value (None if unknown);
+          for a frame of a multi-frame file, offset of its own pixels
+          (of its first fragment item when encapsulated)
+        - pixel_data_length: byte length of the pixel data (None if encapsulated)
+        - frame_data_length: byte length of the fragment items of a frame of an
+          encapsulated multi-frame file (None: the pixel data runs to its end)
+        """
+        self.path = path
+        self.series_uid = ""
+        self.series_number = None
+        self.series_description = ""
+        self.position = 0.0
+        self.image_position = None
+        self.orientation = None
+        self.pixel_spacing = None
+        self.slice_thickness = None
+        self.rows = 0
+        self.columns = 0
+        self.bits_allocated = 16
+        self.bits_stored = 16
+        self.pixel_representation = 0
+        self.samples_per_pixel = 1
+        self.planar_configuration = 0
+        self.photometric = "MONOCHROME2"
+        self.number_of_frames = 1
+        self.frame = 0
+        self.file_frames = 1
+        self.rescale_slope = 1.0
+        self.rescale_intercept = 0.0
+        self.window_center = None
+        self.window_width = None
+        self.transfer_syntax = ImplicitVRLittleEndian
+        self.pixel_data_offset = None
+        self.pixel_data_length = None
+        self.frame_data_length = None
+
+    def to_dict(self):
+        """
+        Return the header values as a JSON-serializable dictionary.
+        """
+        return {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in self.__dict__.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a SliceInfo from a dictionary created by to_dict().
+        """
+        info = cls(data["path"])
+        for key, value in data.items():
+            if hasattr(info, key):
+                setattr(info, key, tuple(value) if isinstance(value, list) else value)
+        return info
+
+    @property
+    def is_encapsulated(self):
+        """True if the pixel data is compressed (encapsulated)."""
+        return self.pixel_data_offset is not None and self.pixel_data_length is None
+
+    @property
+    def is_native(self):
+        """
+        True if the pixels can be read straight from the file as a NumPy array
+        (uncompressed little endian, one grayscale frame).
+        """
+        return (
+            self.pixel_data_length is not None
+            and _is_plain_little_endian(self.transfer_syntax)
+            and self.samples_per_pixel == 1
+            and self.number_of_frames == 1
+            and self.bits_allocated in (8, 16, 32)
+        )
+
+
+def _locate_pixel_data(fp, transfer_syntax):
+    """
+    Read the Pixel Data element header at the current file position.
+
+    Parameters:
+    - fp: open binary file positioned on the Pixel Data tag
+    - transfer_syntax: TransferSyntaxUID of the file
+
+    Returns:
+    - (offset, length): offset of the value and its length (None if encapsulated)
+    - (None, None) if the element could not be located
+    """
+    if not _is_plain_little_endian(transfer_syntax):
+        return None, None  # offsets are only meaningful for plain little endian files
+
+    start = fp.tell()
+    header = fp.read(12)
+    if len(header) < 8:
+        return None, None
+
+    group, element = struct.unpack("<HH", header[:4])
+    if (group, element) != PIXEL_DATA_TAG:
+        return None, None  # e.g. Float Pixel Data, handled by the pydicom fallback
+
+    if UID(transfer_syntax).is_implicit_VR:
+        length = struct.unpack("<I", header[4:8])[0]
+        offset = start + 8
+    else:
+        if len(header) < 12:
+            return None, None
+        length = struct.unpack("<I", header[8:12])[0]  # OB/OW: VR, 2 reserved bytes, 4-byte length
+        offset = start + 12
+
+    return offset, (None if length == UNDEFINED_LENGTH else length)
+
+
+def _read_items(fp, offset):
+    """
+    List the items of encapsulated pixel data.
+
+    Parameters:
+    - fp: open binary file
+    - offset: byte offset of the first item (the basic offset table)
+
+    Returns:
+    - list of (item offset, value length); only the 8-byte item headers are read
+    """
+    items = []
+    fp.seek(offset)
+    while True:
+        header = fp.read(8)
+        if len(header) < 8:
+            break
+        group, element, length = struct.unpack("<HHI", header)
+        if (group, element) == SEQUENCE_DELIMITER_TAG:
+            break
+        if (group, element) != ITEM_TAG or length == UNDEFINED_LENGTH:
+            break  # corrupted data: keep the items found so far
+        items.append((fp.tell() - 8, length))
+        fp.seek(length, 1)
+    return items
+
+
+def fragment_values(data):
+    """
+    Split the bytes of consecutive encapsulated items into their values.
+
+    Parameters:
+    - data: bytes starting with an item header
+
+    Returns:
+    - list of item values (bytes)
+    """
+    values = []
+    position = 0
+    while position + 8 <= len(data):
+        group, element, length = struct.unpack_from("<HHI", data, position)
+        if (group, element) != ITEM_TAG:
+            break
+        values.append(data[position + 8:position + 8 + length])
+        position += 8 + length
+    return values
+
+
+def _locate_frames(fp, offset, frames, extended_offsets=None):
+    """
+    Find the fragment items of each frame of encapsulated multi-frame pixel data.
+
+    Uses the Extended Offset Table if present, otherwise the Basic Offset
+    Table, otherwise assumes one fragment per frame when the counts match.
+
+    Parameters:
+    - fp: open binary file
+    - offset: byte offset of the basic offset table item
+    - frames: NumberOfFrames
+    - extended_offsets: value of ExtendedOffsetTable (7FE0,0001), or None
+
+    Returns:
+    - list of (offset, length) of the items of each frame, or None if the
+      frames cannot be located this way
+    """
+    items = _read_items(fp, offset)
+    if len(items) < 2:
+        return None
+    (bot_offset, bot_length), fragments = items[0], items[1:]
+
+    if extended_offsets:
+        starts = list(struct.unpack(f"<{len(extended_offsets) // 8}Q", extended_offsets))
+    elif bot_length:
+        fp.seek(bot_offset + 8)
+        starts = list(struct.unpack(f"<{bot_length // 4}I", fp.read(bot_length)))
+    elif len(fragments) == frames:
+        starts = [start - fragments[0][0] for start, _ in fragments]
+    else:
+        return None  # e.g. several fragments per frame without offset table
+
+    if len(starts) != frames:
+        return None
+
+    first = fragments[0][0]  # offsets are relative to the first fragment item
+    end = fragments[-1][0] + 8 + fragments[-1][1]
+    bounds = [first + s for s in starts] + [end]
+    return [(bounds[i], bounds[i + 1] - bounds[i]) for i in range(frames)]
+
+
+def _functional_value(ds, frame, sequence, keyword):
+    """
+    Return a value from the functional groups of a frame: the per-frame
+    group first, then the shared group, then the top-level dataset.
+    """
+    groups = []
+    per_frame = ds.get("PerFrameFunctionalGroupsSequence")
+    if per_frame and frame < len(per_frame):
+        groups.append(per_frame[frame])
+    shared = ds.get("SharedFunctionalGroupsSequence")
+    if shared:
+        groups.append(shared[0])
+
+    for group in groups:
+        items = group.get(sequence)
+        if items:
+            value = items[0].get(keyword)
+            if value is not None:
+                return value
+    return ds.get(keyword)
+
+
+def _first_float(value):
+    """First value of a (possibly multi-valued) DICOM element as float, None if invalid."""
+    if value is not None and not isinstance(value, (str, bytes, int, float)):
+        value = value[0] if len(value) else None
+    return _float_or_none(value)
+
+
+def _read_header(path):
+    """
+    Parse the header of a DICOM file and locate its pixel data.
+
+    Returns:
+    - (ds, transfer_syntax, offset, length, frames): frames is the list of
+      (offset, length) of each frame for encapsulated multi-frame files, else None
+
+    Raises InvalidDicomError if the file is not DICOM (no preamble).
+    """
+    with open(path, "rb") as fp:
+        _check_preamble(fp, path)  # cheap rejection of non-DICOM files
+        fp.seek(0)
+        # stop_before_pixels leaves the file positioned on the Pixel Data tag
+        ds = pydicom.dcmread(fp, stop_before_pixels=True)
+        file_meta = getattr(ds, "file_meta", None)
+        transfer_syntax = getattr(file_meta, "TransferSyntaxUID", None) or ImplicitVRLittleEndian
+        offset, length = _locate_pixel_data(fp, transfer_syntax)
+
+        frames = None
+        number_of_frames = int(ds.get("NumberOfFrames", 1) or 1)
+        if number_of_frames > 1 and offset is not None and length is None:
+            frames = _locate_frames(fp, offset, number_of_frames, ds.get("ExtendedOffsetTable"))
+    return ds, transfer_syntax, offset, length, frames
+
+
+def _slice_info_from_dataset(path, ds, transfer_syntax, offset, length):
+    """Fill a SliceInfo from a parsed header (whole file)."""
+    info = SliceInfo(path)
+    info.series_uid = str(ds.get("SeriesInstanceUID", ""))
+    try:
+        info.series_number = int(ds.get("SeriesNumber"))
+    except (TypeError, ValueError):
+        info.series_number = None  # absent or invalid
+    info.series_description = str(ds.get("SeriesDescription", "") or ds.get("Modality", ""))
+    info.position = get_anatomical_position(ds)
+    info.image_position = _float_tuple_or_none(ds.get("ImagePositionPatient"))
+    info.orientation = _float_tuple_or_none(ds.get("ImageOrientationPatient"))
+    info.pixel_spacing = _float_tuple_or_none(ds.get("PixelSpacing"))
+    info.slice_thickness = _float_or_none(ds.get("SliceThickness"))
+
+    info.rows = int(ds.get("Rows", 0))
+    info.columns = int(ds.get("Columns", 0))
+    info.bits_allocated = int(ds.get("BitsAllocated", 16))
+    info.bits_stored = int(ds.get("BitsStored", info.bits_allocated))
+    info.pixel_representation = int(ds.get("PixelRepresentation", 0))
+    info.samples_per_pixel = int(ds.get("SamplesPerPixel", 1))
+    info.planar_configuration = int(ds.get("PlanarConfiguration", 0))
+    info.photometric = str(ds.get("PhotometricInterpretation", "MONOCHROME2"))
+    info.number_of_frames = int(ds.get("NumberOfFrames", 1) or 1)
+    info.file_frames = info.number_of_frames
+
+    # Rescale is only applied when both tags are present
+    if hasattr(ds, "RescaleSlope") and hasattr(ds, "RescaleIntercept"):
+        info.rescale_slope = float(ds.RescaleSlope)
+        info.rescale_intercept = float(ds.RescaleIntercept)
+
+    info.window_center, info.window_width = get_window_parameters(ds)
+
+    info.transfer_syntax = str(transfer_syntax)
+    info.pixel_data_offset = offset
+    info.pixel_data_length = length
+    return info
+
+
+def _frame_infos(file_info, ds, frames):
+    """
+    Split the SliceInfo of a multi-frame file into one SliceInfo per frame.
+
+    Parameters:
+    - file_info: SliceInfo of the whole file
+    - ds: parsed header (functional groups)
+    - frames: (offset, length) of the items of each encapsulated frame, or None
+
+    Returns:
+    - list of SliceInfo, in file order
+    """
+    count = file_info.number_of_frames
+    frame_bytes = (file_info.rows * file_info.columns * file_info.samples_per_pixel
+                   * file_info.bits_allocated // 8)
+    native = (file_info.pixel_data_length is not None
+              and file_info.bits_allocated % 8 == 0
+              and file_info.pixel_data_length >= count * frame_bytes)
+
+    infos = []
+    for frame in range(count):
+        info = SliceInfo.from_dict(file_info.to_dict())
+        info.frame = frame
+        info.number_of_frames = 1
+
+        position = _float_tuple_or_none(_functional_value(ds, frame, "PlanePositionSequence", "ImagePositionPatient"))
+        if position and len(position) == 3:
+            info.image_position = position
+            info.position = position[2]
+        else:
+            info.position = file_info.position + frame  # keep file order
+        orientation = _float_tuple_or_none(_functional_value(ds, frame, "PlaneOrientationSequence",
+                                                             "ImageOrientationPatient"))
+        if orientation:
+            info.orientation = orientation
+        spacing = _float_tuple_or_none(_functional_value(ds, frame, "PixelMeasuresSequence", "PixelSpacing"))
+        if spacing:
+            info.pixel_spacing = spacing
+        thickness = _float_or_none(_functional_value(ds, frame, "PixelMeasuresSequence", "SliceThickness"))
+        if thickness is not None:
+            info.slice_thickness = thickness
+
+        slope = _float_or_none(_functional_value(ds, frame, "PixelValueTransformationSequence", "RescaleSlope"))
+        intercept = _float_or_none(_functional_value(ds, frame, "PixelValueTransformationSequence",
+                                                     "RescaleIntercept"))
+        if slope is not None and intercept is not None:
+            info.rescale_slope, info.rescale_intercept = slope, intercept
+        center = _first_float(_functional_value(ds, frame, "FrameVOILUTSequence", "WindowCenter"))
+        width = _first_float(_functional_value(ds, frame, "FrameVOILUTSequence", "WindowWidth"))
+        if center is not None and width is not None:
+            info.window_center, info.window_width = center, width
+
+        if native:
+            # Uncompressed: the frame is a fixed-size block of the pixel data
+            info.pixel_data_offset = file_info.pixel_data_offset + frame * frame_bytes
+            info.pixel_data_length = frame_bytes
+        elif frames is not None:
+            # Compressed: only the fragment items of this frame are read
+            info.pixel_data_offset, info.frame_data_length = frames[frame]
+        else:
+            info.pixel_data_offset = None  # decoded by pydicom, one frame at a time
+            info.pixel_data_length = None
+        infos.append(info)
+    return infos
+
+
+def read_slice_infos(path):
+    """
+    Parse the header of a DICOM file (without its pixel data).
+
+    Parameters:
+    - path: path to the DICOM file
+
+    Returns:
+    - list of SliceInfo: one for a single-frame file, one per frame for a
+      multi-frame file (each frame is then sorted and decoded on its own)
+
+    Raises InvalidDicomError if the file is not DICOM (no preamble).
+    """
+    ds, transfer_syntax, offset, length, frames = _read_header(path)
+    info = _slice_info_from_dataset(path, ds, transfer_syntax, offset, length)
+    if info.number_of_frames > 1:
+        return _frame_infos(info, ds, frames)
+    return [info]
+
+
+def read_slice_info(path):
+    """
+    Parse the header of a single-frame DICOM file (without its pixel data).
+
+    Parameters:
+    - path: path to the DICOM file
+
+    Returns:
+    - SliceInfo with the values needed to sort, decode and display the slice
+      (the first frame of a multi-frame file)
+    """
+    return read_slice_infos(path)[0]
@@ -4,8 +4,12 @@ DICOM Windowing Module
 This module handles DICOM window center and width extraction and application.
 It provides robust functions to read windowing parameters from DICOM files
 regardless of how they are stored (single value vs multi-value format).
+
+For interactive window/level, one lookup table is built per
+(rescale, window) pair and mapped over the stored pixel values.
 """
 
+from functools import lru_cache
 import pydicom
 import numpy as np
 
@@ -79,8 +83,27 @@ def apply_dicom_windowing(image_array, ds):
     #print(f"DEBUG - Has rescale params: {has_rescale}")
     if has_rescale:
         #print(f"DEBUG - RescaleSlope: {ds.RescaleSlope}, RescaleIntercept: {ds.RescaleIntercept}")
+        slope, intercept = float(ds.RescaleSlope), float(ds.RescaleIntercept)
+    else:
+        slope, intercept = None, None
+
+    return window_array(image_array, slope, intercept, window_center, window_width)
+
+def window_array(image_array, slope, intercept, window_center, window_width):
+    """
+    Apply rescale and windowing to a numpy array using already parsed parameters.
+
+    Parameters:
+    - image_array: numpy array with stored pixel values
+    - slope, intercept: modality rescale (None to skip the rescale)
+    - window_center, window_width: window parameters (None for min/max fallback)
+
+    Returns:
+    - uint8 numpy array (0-255)
+    """
+    if slope is not None and intercept is not None:
         # APPLY RESCALE - CRITICAL FOR CT!
-        image_array = image_array * float(ds.RescaleSlope) + float(ds.RescaleIntercept)
+        image_array = image_array * float(slope) + float(intercept)
     
     #print(f"DEBUG - Raw array range: [{np.min(image_array):.1f}, {np.max(image_array):.1f}]")
     
@@ -116,4 +139,104 @@ def apply_dicom_windowing(image_array, ds):
             result = np.zeros_like(image_array, dtype=np.uint8)
     
     #print(f"DEBUG - Final range: [{np.min(result)}, {np.max(result)}]")
-    return result
\ No newline at end of file
+    return result
+
+# -------------------------------
+#   LOOKUP-TABLE WINDOWING
+# -------------------------------
+
+# Common CT window presets: name -> (center, width) in Hounsfield units
+WINDOW_PRESETS = {
+    "Brain": (40.0, 80.0),
+    "Soft tissue": (50.0, 400.0),
+    "Lung": (-600.0, 1500.0),
+    "Bone": (500.0, 2000.0),
+}
+
+def lut_supported(dtype):
+    """
+    True if a lookup table can be used for stored values of this dtype
+    (8 or 16-bit integers, i.e. at most 65536 entries).
+    """
+    dtype = np.dtype(dtype)
+    return dtype.kind in "iu" and dtype.itemsize <= 2
+
+@lru_cache(maxsize=32)
+def _cached_window_lut(dtype_str, slope, intercept, window_center, window_width):
+    """Build (and cache) the LUT for one (dtype, rescale, window) combination."""
+    dtype = np.dtype(dtype_str)
+    unsigned = np.dtype(f"u{dtype.itemsize}")
+
+    # Every possible stored value, in the order of their unsigned bit pattern
+    values = np.arange(2 ** (8 * dtype.itemsize), dtype=unsigned).view(dtype).astype(np.float64)
+    values = values * slope + intercept
+
+    window_min = window_center - window_width / 2
+    window_max = window_center + window_width / 2
+    if window_max > window_min:
+        lut = (np.clip(values, window_min, window_max) - window_min) / (window_max - window_min) * 255
+        lut = np.clip(lut, 0, 255).astype(np.uint8)
+    else:
+        lut = np.zeros(values.shape, dtype=np.uint8)
+
+    lut.flags.writeable = False  # shared between slices and threads
+    return lut
+
+def get_window_lut(dtype, slope, intercept, window_center, window_width):
+    """
+    Return the uint8 lookup table mapping every stored value to its display value.
+
+    Parameters:
+    - dtype: dtype of the stored values (see lut_supported)
+    - slope, intercept: modality rescale
+    - window_center, window_width: window parameters
+
+    Returns:
+    - read-only uint8 numpy array indexed by the unsigned view of the stored values
+    """
+    return _cached_window_lut(np.dtype(dtype).str, float(slope), float(intercept),
+                              float(window_center), float(window_width))
+
+def apply_window_lut(raw, lut):
+    """
+    Map stored pixel values through a window lookup table.
+
+    Parameters:
+    - raw: numpy array of stored values (8 or 16-bit integers)
+    - lut: table from get_window_lut for the same dtype
+
+    Returns:
+    - uint8 numpy array (0-255)
+    """
+    unsigned = np.dtype(f"u{raw.dtype.itemsize}")
+    return lut[raw.view(unsigned)]
+
+def packed_offset(dtype):
+    """
+    Offset added to stored values of this dtype to make them unsigned
+    (2**15 for int16, 0 for unsigned types), as done by image_processor.pack_slice.
+    """
+    dtype = np.dtype(dtype)
+    return 2 ** (8 * dtype.itemsize - 1) if dtype.kind == "i" else 0
+
+def window_bounds(dtype, slope, intercept, window_center, window_width):
+    """
+    Convert a window to the range of packed stored values it displays,
+    for windowing on the GPU (see gpu_windowing).
+
+    Parameters:
+    - dtype: dtype of the stored values (see lut_supported)
+    - slope, intercept: modality rescale
+    - window_center, window_width: window parameters
+
+    Returns:
+    - (low, high): packed values displayed black and white; (0, 0) for an
+      empty window (everything black, as with the lookup tables).
+      low > high when the rescale slope is negative.
+    """
+    if window_width <= 0 or slope == 0:
+        return 0.0, 0.0
+    offset = packed_offset(dtype)
+    low = (window_center - window_width / 2 - intercept) / slope + offset
+    high = (window_center + window_width / 2 - intercept) / slope + offset
+    return float(low), float(high)
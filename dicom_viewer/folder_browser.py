@@ -0,0 +1,173 @@
+# === dicom_viewer/folder_browser.py ===
+# This file lists the folders and datasets of DATA_FOLDER on a background
+# thread, so a slow (network) share never blocks the Kivy main thread.
+# Listings are cached in memory and refreshed incrementally: a folder whose
+# modification time did not change is not listed again. Slice counts (and
+# the fingerprint of the files they were indexed from, reused by the
+# thumbnails) are read from the persistent series indexes, when a dataset has one.
+# Like SeriesLoader, results are queued and handed to the callbacks by poll().
+
+import json  # read slice counts from the series indexes
+import os  # scandir and stat
+import queue  # results handed back to the main thread
+import threading  # background listing
+from .series_index import SeriesIndex  # location of the index of a dataset
+
+
+def list_subfolders(path):
+    """
+    Return the sorted names of the subfolders of a folder.
+    Raises OSError if the folder cannot be read.
+    """
+    with os.scandir(path) as it:
+        return sorted(entry.name for entry in it if entry.is_dir())
+
+
+def indexed_summary(cache_folder, dataset_folder):
+    """
+    Return (slice count, fingerprint) recorded in the series index of a
+    dataset: the number of DICOM slices and the series_fingerprint of the
+    files at the last scan. (None, None) if the dataset has never been indexed.
+    The index may be out of date: the values are only informative.
+    """
+    path = SeriesIndex(cache_folder, dataset_folder).path
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    count = sum(len(entry.get("infos", ())) for entry in data.get("files", {}).values())
+    return count, data.get("fingerprint")
+
+
+def indexed_slice_count(cache_folder, dataset_folder):
+    """
+    Return the number of DICOM slices recorded in the series index of a
+    dataset, or None if the dataset has never been indexed.
+    """
+    return indexed_summary(cache_folder, dataset_folder)[0]
+
+
+class FolderBrowser:
+    """
+    Asynchronous, cached folder listings.
+
+    Responsibilities:
+    - List folders on a background thread (os.scandir)
+    - Keep the last listing of each folder and skip folders that did not change
+    - Read the slice counts of datasets from their cached series indexes
+
+    Callbacks are only ever called from poll(), i.e. on the Kivy main thread.
+    """
+
+    def __init__(self, cache_folder=None):
+        """
+        Parameters:
+        - cache_folder: root cache folder holding the series indexes
+          (None: no slice counts)
+        """
+        self.cache_folder = cache_folder
+        self._listings = {}  # folder path -> (mtime_ns, [subfolder names])
+        self._counts = {}  # dataset path -> (index mtime_ns, slice count, fingerprint)
+        self._lock = threading.Lock()  # protects _listings and _counts
+        self._results = queue.Queue()  # finished listings, drained by poll()
+
+    def cached(self, path):
+        """
+        Return the last known subfolder names of a folder (None if never listed).
+        """
+        with self._lock:
+            listing = self._listings.get(path)
+        return list(listing[1]) if listing else None
+
+    def cached_counts(self, path):
+        """
+        Return the last known slice counts of the datasets of a folder.
+        """
+        with self._lock:
+            listing = self._listings.get(path)
+            if not listing:
+                return {}
+            return {name: self._counts[os.path.join(path, name)][1]
+                    for name in listing[1] if os.path.join(path, name) in self._counts}
+
+    def cached_fingerprint(self, dataset):
+        """
+        Return the fingerprint recorded in the series index of a dataset when
+        its slice count was read (None if unknown), see indexed_summary.
+        """
+        with self._lock:
+            known = self._counts.get(dataset)
+        return known[2] if known is not None else None
+
+    def request(self, path, callback, counts=False):
+        """
+        Refresh the listing of a folder in the background.
+
+        Parameters:
+        - path: folder to list
+        - callback: function(path, names, counts) called from poll() once the
+          listing is known (names is None if the folder cannot be read), and
+          once more when slice counts were read
+        - counts: also read the slice count of each subfolder (datasets)
+        """
+        t = threading.Thread(target=self._refresh, args=(path, callback, counts), daemon=True)
+        t.start()
+
+    def poll(self, *args):
+        """
+        Deliver finished listings by calling their callbacks.
+        Accepts (and ignores) the dt argument of a Kivy Clock callback.
+        """
+        while True:
+            try:
+                callback, path, names, counts = self._results.get_nowait()
+            except queue.Empty:
+                return True
+            callback(path, names, counts)
+
+    # -------------------------------
+    #   BACKGROUND THREAD
+    # -------------------------------
+
+    def _refresh(self, path, callback, counts):
+        """List a folder (if it changed) and read the slice counts of its subfolders."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with self._lock:
+                listing = self._listings.get(path)
+            if listing is None or listing[0] != mtime_ns:
+                names = list_subfolders(path)
+                with self._lock:
+                    self._listings[path] = (mtime_ns, names)
+            else:
+                names = listing[1]  # unchanged since the last listing
+        except OSError as e:
+            print("Folder read error:", path, e)
+            self._results.put((callback, path, None, {}))
+            return
+
+        self._results.put((callback, path, list(names), self.cached_counts(path)))
+
+        if counts and self.cache_folder is not None:
+            changed = False
+            for name in names:
+                changed |= self._update_count(os.path.join(path, name))
+            if changed:
+                self._results.put((callback, path, list(names), self.cached_counts(path)))
+
+    def _update_count(self, dataset):
+        """Read the slice count of a dataset if its index changed. Returns True if it changed."""
+        index_path = SeriesIndex(self.cache_folder, dataset).path
+        try:
+            mtime_ns = os.stat(index_path).st_mtime_ns
+        except OSError:
+            return False  # never indexed
+        with self._lock:
+            known = self._counts.get(dataset)
+        if known is not None and known[0] == mtime_ns:
+            return False
+        count, fingerprint = indexed_summary(self.cache_folder, dataset)
+        with self._lock:
+            self._counts[dataset] = (mtime_ns, count, fingerprint)
+        return known is None or known[1:] != (count, fingerprint)
@@ -0,0 +1,115 @@
+# === dicom_viewer/gpu_windowing.py ===
+# This file applies window/level on the GPU.
+# Each slice is uploaded once with its full 16-bit stored values (packed in
+# a luminance + alpha texture, see image_processor.pack_slice), and a
+# fragment shader maps them to gray levels. Changing the window then only
+# changes two shader uniforms: no slice is rendered or uploaded again.
+# When the GL context cannot run the shader, the viewer keeps the CPU path.
+
+from kivy.graphics import RenderContext  # canvas with its own shader
+from kivy.graphics.texture import Texture  # packed slice textures
+from kivy.graphics.opengl_utils import gl_has_texture_format  # GL capabilities
+from kivy.uix.image import Image  # base widget
+
+# Kivy's default fragment shader (restored when GPU windowing is turned off)
+DEFAULT_FS = """
+$HEADER$
+void main(void) {
+    gl_FragColor = frag_color * texture2D(texture0, tex_coord0);
+}
+"""
+
+# Rebuild the 16-bit value from its two bytes and apply the window
+WINDOW_FS = """
+$HEADER$
+#ifdef GL_ES
+#ifndef GL_FRAGMENT_PRECISION_HIGH
+#error "16-bit windowing needs high precision floats"
+#endif
+#endif
+uniform float window_low;   // packed stored value shown black
+uniform float window_high;  // packed stored value shown white
+
+void main(void) {
+    vec4 texel = texture2D(texture0, tex_coord0);
+    float value = texel.a * 65280.0 + texel.r * 255.0;  // high byte * 256 + low byte
+    float range = window_high - window_low;
+    float gray = range == 0.0 ? 0.0 : clamp((value - window_low) / range, 0.0, 1.0);
+    gl_FragColor = frag_color * vec4(gray, gray, gray, 1.0);
+}
+"""
+
+
+def packed_to_texture(packed, texture=None):
+    """
+    Copy a packed slice (see image_processor.pack_slice) into a Kivy texture.
+
+    Parameters:
+    - packed: uint8 numpy array (rows, columns, 2)
+    - texture: existing texture to update in place (None to create one)
+
+    Returns:
+    - luminance + alpha Kivy Texture
+    """
+    rows, columns = packed.shape[:2]
+    if texture is None or tuple(texture.size) != (columns, rows) or texture.colorfmt != 'luminance_alpha':
+        texture = Texture.create(size=(columns, rows), colorfmt='luminance_alpha')
+        # Interpolating would mix the high and low bytes of neighbouring pixels
+        texture.mag_filter = 'nearest'
+        texture.min_filter = 'nearest'
+    texture.blit_buffer(packed.reshape(-1), colorfmt='luminance_alpha', bufferfmt='ubyte')
+    return texture
+
+
+class WindowedImage(Image):
+    """
+    Image widget that can apply window/level in a fragment shader.
+
+    Responsibilities:
+    - Draw the texture with Kivy's default shader (CPU windowing) or with
+      WINDOW_FS (packed textures, GPU windowing)
+    - Hold the window bounds as shader uniforms
+    """
+
+    def __init__(self, **kwargs):
+        # The canvas must be a RenderContext to have its own shader
+        self.canvas = RenderContext(use_parent_projection=True,
+                                    use_parent_modelview=True,
+                                    use_parent_frag_modelview=True)
+        self.gpu_windowing = False  # True while WINDOW_FS is active
+        super().__init__(**kwargs)
+
+    def enable_gpu_windowing(self, enabled=True):
+        """
+        Switch between GPU and CPU windowing.
+
+        Returns:
+        - True if GPU windowing is active; False if it was turned off or
+          is not supported by the GL context (the default shader is kept)
+        """
+        if enabled == self.gpu_windowing:
+            return enabled
+
+        shader = self.canvas.shader
+        if enabled:
+            if not gl_has_texture_format('luminance_alpha'):
+                print("GPU windowing: luminance_alpha textures not supported, using CPU windowing")
+                return False
+            shader.fs = WINDOW_FS
+            if not shader.success:
+                print("GPU windowing not supported by this OpenGL context, using CPU windowing")
+                shader.fs = DEFAULT_FS
+                return False
+            self.set_window_bounds(0.0, 0.0)
+        else:
+            shader.fs = DEFAULT_FS
+
+        self.gpu_windowing = enabled
+        return enabled
+
+    def set_window_bounds(self, low, high):
+        """
+        Set the packed values shown black and white (see dicom_windowing.window_bounds).
+        """
+        self.canvas['window_low'] = float(low)
+        self.canvas['window_high'] = float(high)
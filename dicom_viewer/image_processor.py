@@ -1,35 +1,333 @@
 # === dicom_viewer/image_processor.py ===
 # This file contains functions to load DICOM images and convert them
-# into a format suitable for display in the Kivy app (PIL Image objects).
+# into a format suitable for display in the Kivy app (uint8 NumPy arrays
+# for the viewer, PIL Image objects for other uses).
+# Pixels are decoded using the header information collected by the series
+# scan (SliceInfo), so the header of each file is only parsed once.
+# Large slices can also be decoded at reduced resolution (previews shown
+# while the full-resolution slices load).
 
+import io  # compressed frames handed to Pillow
 import pydicom
 import numpy as np
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.encaps import encapsulate
+from pydicom.pixels import pixel_array
 from PIL import Image as PILImage
-from .orientation import apply_radiological_orientation
-from .dicom_windowing import apply_dicom_windowing  # Import the new windowing function
+from .orientation import orient_array
+from .dicom_windowing import window_array, lut_supported, get_window_lut, apply_window_lut, packed_offset
+from .dicom_header import read_slice_info, fragment_values
+from .instrumentation import perf
 
-def load_dicom_image(path):
+# Codecs able to decode a reduced resolution directly, much faster than the full image
+REDUCED_DECODE_SYNTAXES = {
+    "1.2.840.10008.1.2.4.50": "jpeg",  # JPEG Baseline (8-bit): DCT scaling
+    "1.2.840.10008.1.2.4.90": "j2k",  # JPEG 2000 Lossless: wavelet resolution levels
+    "1.2.840.10008.1.2.4.91": "j2k",  # JPEG 2000
+}
+
+
+def native_dtype(info):
     """
-    Load a single DICOM file and convert it to a PIL Image.
+    Return the NumPy dtype of the stored pixel values of a slice
+    (e.g. int16 for signed 16-bit CT).
+    """
+    signed = info.pixel_representation == 1
+    kind = "i" if signed else "u"
+    return np.dtype(f"<{kind}{info.bits_allocated // 8}")
+
+
+def _fix_bits_stored(arr, info):
+    """
+    Mask unused high bits (and sign-extend signed values) when fewer bits
+    are stored than allocated, e.g. 12-bit CT stored in 16-bit words.
+    """
+    unused = info.bits_allocated - info.bits_stored
+    if unused <= 0 or info.bits_allocated == 8:
+        return arr
+    if info.pixel_representation == 1:
+        # shift left then arithmetic shift right to propagate the sign bit
+        return (arr << unused) >> unused
+    return arr & ((1 << info.bits_stored) - 1)
+
+
+def _read_encapsulated(info):
+    """Read the encapsulated items of a slice (of its own frame in a multi-frame file)."""
+    with open(info.path, "rb") as fp:
+        fp.seek(info.pixel_data_offset)
+        if info.frame_data_length is None:
+            return fp.read()  # items up to the sequence delimiter (trailing bytes are ignored)
+        return fp.read(info.frame_data_length)
+
+
+def _decode_encapsulated(info):
+    """
+    Decode compressed pixel data using the header values of the slice.
+
+    A minimal dataset is rebuilt from the SliceInfo and only the
+    encapsulated pixel data is read from disk, so the header is not parsed again.
+    For a frame of a multi-frame file, only the fragments of that frame are read.
+    """
+    data = _read_encapsulated(info)
+    perf.add_bytes("decode", len(data))
+    if info.frame_data_length is not None:
+        # One frame: rebuild a single-frame pixel data element from its fragments
+        data = encapsulate([b"".join(fragment_values(data))])
+
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = info.transfer_syntax
+    ds.Rows = info.rows
+    ds.Columns = info.columns
+    ds.BitsAllocated = info.bits_allocated
+    ds.BitsStored = info.bits_stored
+    ds.HighBit = info.bits_stored - 1
+    ds.PixelRepresentation = info.pixel_representation
+    ds.SamplesPerPixel = info.samples_per_pixel
+    ds.PhotometricInterpretation = info.photometric
+    ds.NumberOfFrames = info.number_of_frames
+    if info.samples_per_pixel > 1:
+        ds.PlanarConfiguration = info.planar_configuration
+    ds.PixelData = data
+    return ds.pixel_array
+
+
+def to_luminance(arr, info):
+    """
+    Convert a decoded color slice (rows, columns, 3) to one grayscale value
+    per pixel (ITU-R 601 luma, as PIL's "L" mode), since volumes, windowing
+    and textures work on a single channel. Grayscale slices are returned as is.
 
     Parameters:
-    - path: path to the DICOM file
+    - arr: pixel array decoded by pydicom (color spaces are converted to RGB)
+    - info: SliceInfo of the slice (for the error message)
+
+    Returns:
+    - 2D numpy array with the dtype of `arr`
+
+    Raises ValueError for other pixel layouts (unsupported photometric interpretation).
+    """
+    if arr.ndim == 2:
+        return arr
+    if arr.ndim != 3 or arr.shape[2] != 3:
+        raise ValueError(f"Unsupported photometric interpretation {info.photometric} "
+                         f"(samples per pixel {info.samples_per_pixel}, array shape {arr.shape})")
+    luma = arr[..., 0] * np.float32(0.299) + arr[..., 1] * np.float32(0.587) + arr[..., 2] * np.float32(0.114)
+    return np.rint(luma).astype(arr.dtype)
+
+
+def read_slice_pixels(info):
+    """
+    Read the stored pixel values of a slice.
+
+    Parameters:
+    - info: SliceInfo of the slice (from the series scan)
+
+    Returns:
+    - 2D numpy array with the stored values (native dtype, no rescale
+      applied); color slices are converted to luminance (see to_luminance)
+    """
+    with perf.timed("decode"):
+        if info.is_native:
+            # Uncompressed: read the pixel block directly at its offset
+            count = info.rows * info.columns
+            arr = np.fromfile(info.path, dtype=native_dtype(info), count=count,
+                              offset=info.pixel_data_offset)
+            if arr.size != count:
+                raise ValueError(f"Truncated pixel data ({arr.size}/{count} pixels)")
+            perf.add_bytes("decode", arr.nbytes)
+            return _fix_bits_stored(arr.reshape(info.rows, info.columns), info)
+
+        if info.is_encapsulated:
+            return to_luminance(_decode_encapsulated(info), info)
+
+        # Anything else (color, big endian, deflated, float pixel data...): let pydicom handle it
+        if info.file_frames > 1:
+            return to_luminance(pixel_array(info.path, index=info.frame), info)  # decodes this frame only
+        return to_luminance(pydicom.dcmread(info.path).pixel_array, info)
+
+
+def block_average(raw, factor):
+    """
+    Downsample a slice by averaging blocks of factor x factor pixels.
+
+    Parameters:
+    - raw: 2D numpy array (stored values)
+    - factor: integer reduction factor (trailing rows/columns that do not
+      fill a whole block are dropped)
+
+    Returns:
+    - numpy array (rows // factor, columns // factor) with the dtype of `raw`
+    """
+    rows, columns = raw.shape[0] // factor, raw.shape[1] // factor
+    blocks = raw[:rows * factor, :columns * factor].reshape(rows, factor, columns, factor)
+    return np.rint(blocks.mean(axis=(1, 3), dtype=np.float32)).astype(raw.dtype)
+
+
+def can_decode_reduced(info):
+    """
+    True if a slice can be decoded directly at reduced resolution
+    (JPEG 2000 resolution levels, JPEG DCT scaling), see read_slice_preview.
+    """
+    return (info.is_encapsulated
+            and str(info.transfer_syntax) in REDUCED_DECODE_SYNTAXES
+            and info.samples_per_pixel == 1
+            and info.pixel_representation == 0
+            and info.bits_stored <= 16)
+
+
+def read_slice_preview(info, factor):
+    """
+    Decode a compressed slice at reduced resolution, without decoding the
+    full image (only for slices accepted by can_decode_reduced).
+
+    Parameters:
+    - info: SliceInfo of the slice
+    - factor: reduction factor (a power of 2)
+
+    Returns:
+    - numpy array (rows // factor, columns // factor) with the stored values
+
+    Raises ValueError if the codec did not reduce the image enough.
+    """
+    with perf.timed("preview"):
+        values = fragment_values(_read_encapsulated(info))
+        if info.frame_data_length is None:
+            values = values[1:]  # the first item is the Basic Offset Table
+        image = PILImage.open(io.BytesIO(b"".join(values)))
+        codec = REDUCED_DECODE_SYNTAXES[str(info.transfer_syntax)]
+        if codec == "j2k":
+            image.reduce = factor.bit_length() - 1  # resolution level: 2 ** reduce == factor
+        else:
+            image.draft(image.mode, (info.columns // factor, info.rows // factor))
+        arr = np.asarray(image)
+        if codec == "j2k" and info.bits_allocated > info.bits_stored:
+            arr = arr >> (info.bits_allocated - info.bits_stored)  # Pillow scales to the full 16 bits
+
+    rows, columns = info.rows // factor, info.columns // factor
+    if arr.shape[0] >= 2 * rows and arr.shape[1] >= 2 * columns:
+        arr = block_average(arr, min(arr.shape[0] // rows, arr.shape[1] // columns))
+    if arr.shape[0] < rows or arr.shape[1] < columns:
+        raise ValueError(f"Preview shape {arr.shape} smaller than ({rows}, {columns})")
+    return arr[:rows, :columns]
+
+
+def slice_window(raw, info):
+    """
+    Return the default window of a slice.
+
+    Parameters:
+    - raw: numpy array with the stored values of the slice
+    - info: SliceInfo of the slice
+
+    Returns:
+    - (center, width) from the DICOM header, or covering the full
+      value range of the slice when the header has no window
+    """
+    if info.window_center is not None and info.window_width is not None:
+        return info.window_center, info.window_width
+
+    # Fallback: min/max of the rescaled values
+    low = float(np.min(raw)) * info.rescale_slope + info.rescale_intercept
+    high = float(np.max(raw)) * info.rescale_slope + info.rescale_intercept
+    low, high = min(low, high), max(low, high)
+    return (low + high) / 2, high - low
+
+
+def render_slice(raw, info, window=None):
+    """
+    Convert stored pixel values to a displayable 8-bit image array.
+
+    Parameters:
+    - raw: numpy array with the stored values of the slice
+    - info: SliceInfo of the slice (rescale, window and orientation)
+    - window: (center, width) to use instead of the slice default window
+
+    Returns:
+    - uint8 numpy array with corrected orientation and proper windowing
+    """
+    window_center, window_width = window if window is not None else slice_window(raw, info)
+
+    # Apply radiological orientation first: flips are views, and the
+    # windowing below writes a new C-contiguous array in display order
+    with perf.timed("orientation"):
+        raw = orient_array(raw, info.orientation)
+
+    with perf.timed("window"):
+        if lut_supported(raw.dtype):
+            # 8/16-bit stored values: one table lookup per pixel
+            lut = get_window_lut(raw.dtype, info.rescale_slope, info.rescale_intercept,
+                                 window_center, window_width)
+            return apply_window_lut(raw, lut)
+
+        # Convert pixel data to float32 for processing
+        return window_array(raw.astype(np.float32), info.rescale_slope, info.rescale_intercept,
+                            window_center, window_width)
+
+
+def pack_slice(raw, info):
+    """
+    Prepare stored pixel values for windowing on the GPU.
+
+    The values are oriented, made unsigned (see dicom_windowing.packed_offset)
+    and split into (low byte, high byte) pairs, uploaded as a two-channel
+    luminance + alpha texture: every 8-bit GL texture format is exact, so
+    the shader recovers the full 16-bit value.
+
+    Parameters:
+    - raw: numpy array with the stored values of the slice (8 or 16-bit integers)
+    - info: SliceInfo of the slice (orientation)
+
+    Returns:
+    - C-contiguous uint8 numpy array (rows, columns, 2)
+    """
+    with perf.timed("orientation"):
+        raw = orient_array(raw, info.orientation)
+
+    unsigned = raw.view(np.dtype(f"u{raw.dtype.itemsize}"))
+    offset = packed_offset(raw.dtype)
+    if offset:
+        unsigned = unsigned ^ offset  # flipping the sign bit adds the offset
+    packed = np.ascontiguousarray(unsigned, dtype="<u2")  # little endian: low byte first
+    return packed.view(np.uint8).reshape(packed.shape + (2,))
+
+
+def load_slice_image(info):
+    """
+    Decode a slice described by a SliceInfo and convert it to a PIL Image.
+
+    Parameters:
+    - info: SliceInfo of the slice (from the series scan)
 
     Returns:
     - PIL Image object with corrected orientation and proper windowing
     """
+    return PILImage.fromarray(render_slice(read_slice_pixels(info), info))
+
+
+def volume_slice_array(volume, index, window=None):
+    """
+    Render an already decoded slice of a Volume for display.
 
-    # Read the DICOM file
-    ds = pydicom.dcmread(path)
+    Parameters:
+    - volume: Volume holding the stored pixel values
+    - index: slice index inside the volume
+    - window: (center, width), None for the slice default window
 
-    # Convert pixel data to float32 for processing
-    arr = ds.pixel_array.astype(np.float32)
+    Returns:
+    - C-contiguous uint8 numpy array, ready for texture_utils.array_to_texture
+    """
+    return render_slice(volume.get_slice(index), volume.slices[index], window)
 
-    # Apply DICOM windowing using the new robust function
-    arr = apply_dicom_windowing(arr, ds)
 
-    # Apply radiological orientation
-    arr = apply_radiological_orientation(arr, ds)
+def load_dicom_image(path):
+    """
+    Load a single DICOM file and convert it to a PIL Image.
 
-    # Convert the numpy array to a PIL Image
-    return PILImage.fromarray(arr)
\ No newline at end of file
+    Parameters:
+    - path: path to the DICOM file
+
+    Returns:
+    - PIL Image object with corrected orientation and proper windowing
+    """
+    return load_slice_image(read_slice_info(path))
@@ -0,0 +1,188 @@
+# === dicom_viewer/instrumentation.py ===
+# This file records how long each stage of the pipeline takes (header scan,
+# pixel decode, windowing, orientation, texture upload, frame display).
+# Stages are wrapped in `with perf.timed("decode"):` blocks; when collection
+# is disabled, timed() returns a shared do-nothing context manager, so the
+# cost is one attribute check per call.
+#
+# Only the current process is measured: slices decoded by the process pool
+# (see process_decoder) are not included in the "decode" stage.
+
+import json  # dump the statistics to a log file
+import os  # create the log folder
+import threading  # stages are recorded from worker threads
+import time  # perf_counter timings
+from collections import deque  # bounded list of recent durations
+from contextlib import nullcontext  # no-op context manager when disabled
+
+MAX_SAMPLES = 2000  # durations kept per stage for the percentiles
+
+_DISABLED = nullcontext()  # shared, so disabled timing allocates nothing
+
+
+def _percentile(values, fraction):
+    """Return the given percentile (0-1) of a sorted list (nearest rank)."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class _StageStats:
+    """Durations and counters of one stage."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=MAX_SAMPLES)  # recent durations in seconds
+        self.count = 0  # number of recorded calls
+        self.items = 0  # number of slices/frames processed
+        self.total = 0.0  # summed durations in seconds
+        self.nbytes = 0  # bytes read or uploaded
+        self.first_start = None  # perf_counter of the first call
+        self.last_end = None  # perf_counter of the end of the last call
+
+
+class _Timer:
+    """Context manager recording the duration of one call."""
+
+    __slots__ = ("stats", "stage", "items", "start")
+
+    def __init__(self, stats, stage, items):
+        self.stats = stats
+        self.stage = stage
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.stage, time.perf_counter() - self.start,
+                          items=self.items, start=self.start)
+        return False
+
+
+class PerfStats:
+    """
+    Collect per-stage timings.
+
+    Responsibilities:
+    - Time code blocks with timed(stage) (thread-safe)
+    - Count slices and bytes per stage
+    - Aggregate p50/p95 durations and throughput, and dump them to JSON
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Parameters:
+        - enabled: start collecting immediately
+        """
+        self.enabled = enabled
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def timed(self, stage, items=1):
+        """
+        Return a context manager timing one call of a stage.
+
+        Parameters:
+        - stage: stage name (e.g. "decode")
+        - items: number of slices/frames processed by the call
+        """
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, stage, items)
+
+    def record(self, stage, seconds, items=1, start=None):
+        """
+        Record the duration of one call of a stage.
+
+        Parameters:
+        - stage: stage name
+        - seconds: duration of the call
+        - items: number of slices/frames processed
+        - start: perf_counter at the start of the call (now - seconds if None)
+        """
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        if start is None:
+            start = end - seconds
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.samples.append(seconds)
+            stats.count += 1
+            stats.items += items
+            stats.total += seconds
+            if stats.first_start is None:
+                stats.first_start = start
+            stats.last_end = end
+
+    def add_bytes(self, stage, nbytes):
+        """
+        Count bytes read (or uploaded) by a stage.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.nbytes += nbytes
+
+    def reset(self):
+        """
+        Forget every recorded timing (e.g. when a new series is opened).
+        """
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self):
+        """
+        Aggregate the recorded timings.
+
+        Returns:
+        - dictionary stage -> {calls, items, total_s, mean_ms, p50_ms, p95_ms,
+          items_per_s, bytes}; items_per_s is measured over the wall time
+          between the first and last call, so parallel stages (decoding on
+          several threads) report their real throughput
+        """
+        with self._lock:
+            stages = {name: (sorted(s.samples), s) for name, s in self._stages.items()}
+
+        result = {}
+        for name, (samples, s) in stages.items():
+            wall = (s.last_end - s.first_start) if s.first_start is not None else 0.0
+            p50 = _percentile(samples, 0.50)
+            p95 = _percentile(samples, 0.95)
+            result[name] = {
+                "calls": s.count,
+                "items": s.items,
+                "total_s": s.total,
+                "mean_ms": 1000.0 * s.total / s.count if s.count else None,
+                "p50_ms": 1000.0 * p50 if p50 is not None else None,
+                "p95_ms": 1000.0 * p95 if p95 is not None else None,
+                "items_per_s": s.items / wall if wall > 0 else None,
+                "bytes": s.nbytes,
+            }
+        return result
+
+    def dump_json(self, path):
+        """
+        Write the summary to a JSON file.
+
+        Returns:
+        - True if the file was written
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"time": time.time(), "stages": self.summary()}, f, indent=2)
+            return True
+        except OSError as e:
+            print("Performance log write error:", path, e)
+            return False
+
+
+# Statistics shared by the whole application (disabled until someone turns them on)
+perf = PerfStats()
@@ -0,0 +1,191 @@
+# === dicom_viewer/memory_budget.py ===
+# This file keeps track of the memory used by each dataset (decoded volume,
+# preview level, textures, slab caches...) against one configurable budget.
+# Data that can be rebuilt registers a release callback: when the budget is
+# exceeded, the least recently used datasets release theirs first, then the
+# cheapest data of the dataset being viewed.
+# Memory-mapped arrays (volume caches, spilled volumes) are backed by files:
+# the OS can drop their pages at any time, so they are not counted.
+# Release callbacks touch GL textures and viewer state, so they only run on
+# the main thread: worker threads record their usage and call
+# schedule_enforce(), which hands enforce() to the main-thread scheduler.
+# A global `memory` instance is shared by the loaders and the viewer.
+
+import threading  # loaders account from worker threads
+from collections import OrderedDict  # datasets, least recently used first
+import numpy as np
+
+VOLUME = "volume"  # decoded stored values (Volume.pixels)
+PREVIEW = "preview"  # low-resolution level of a volume
+TEXTURES = "textures"  # GPU textures of displayed and prefetched slices
+SLAB = "slab"  # cached slab projections (block maxima, running sums)
+
+# Data released first when the budget is exceeded (cheapest to rebuild first)
+RELEASE_ORDER = (SLAB, TEXTURES, PREVIEW, VOLUME)
+
+
+def resident_bytes(array):
+    """
+    Return the bytes of RAM an array needs: 0 for memory-mapped arrays
+    (their pages are backed by a file), nbytes otherwise.
+    """
+    if array is None or isinstance(array, np.memmap):
+        return 0
+    return array.nbytes
+
+
+class MemoryBudget:
+    """
+    Memory accounting per dataset and per kind of data.
+
+    Responsibilities:
+    - Record the bytes used by each (dataset, category) entry
+    - Tell whether a new allocation fits in the budget
+    - Release entries (through their callbacks) until the budget is respected,
+      least recently used datasets first
+    """
+
+    def __init__(self, limit=0, scheduler=None):
+        """
+        Parameters:
+        - limit: budget in bytes (0: unlimited, nothing is ever released)
+        - scheduler: function(callback) running callback() on the main
+          thread (main.py uses Kivy's Clock); None: schedule_enforce() does
+          nothing (headless use, no main loop)
+        """
+        self.limit = limit
+        self.scheduler = scheduler
+        self._datasets = OrderedDict()  # dataset -> {category: (nbytes, release)}, LRU first
+        self._lock = threading.Lock()  # protects _datasets and _enforce_keep
+        self._enforce_keep = None  # dataset kept by the scheduled enforce(), None: none scheduled
+        self._enforce_scheduled = False
+
+    def set(self, dataset, category, nbytes, release=None):
+        """
+        Record the memory used by one kind of data of a dataset.
+
+        Parameters:
+        - dataset: dataset key (its folder path)
+        - category: VOLUME, PREVIEW, TEXTURES, SLAB...
+        - nbytes: bytes currently used (replaces the previous value)
+        - release: function() freeing the data when the budget is exceeded,
+          None if it cannot be released
+        """
+        with self._lock:
+            self._datasets.setdefault(dataset, {})[category] = (int(nbytes), release)
+
+    def discard(self, dataset, category=None):
+        """
+        Forget the memory of a dataset (one category, or all of them),
+        e.g. once its data was dropped.
+        """
+        with self._lock:
+            entries = self._datasets.get(dataset)
+            if entries is None:
+                return
+            if category is None:
+                del self._datasets[dataset]
+            else:
+                entries.pop(category, None)
+
+    def touch(self, dataset):
+        """
+        Mark a dataset as the most recently used one.
+        """
+        with self._lock:
+            if dataset in self._datasets:
+                self._datasets.move_to_end(dataset)
+
+    def used(self, dataset=None):
+        """
+        Return the bytes used by one dataset, or by all of them.
+        """
+        with self._lock:
+            if dataset is not None:
+                return sum(n for n, _ in self._datasets.get(dataset, {}).values())
+            return sum(n for entries in self._datasets.values() for n, _ in entries.values())
+
+    def report(self):
+        """
+        Return {dataset: {category: bytes}} (least recently used first).
+        """
+        with self._lock:
+            return {dataset: {category: n for category, (n, _) in entries.items()}
+                    for dataset, entries in self._datasets.items()}
+
+    def fits(self, nbytes, release=False):
+        """
+        True if `nbytes` more can be used without exceeding the budget.
+
+        Parameters:
+        - release: also count the memory enforce() could release
+        """
+        if not self.limit:
+            return True
+        used = self.used()
+        if release:
+            used -= sum(n for _, _, n, _ in self._candidates(None))
+        return used + nbytes <= self.limit
+
+    def schedule_enforce(self, keep=None):
+        """
+        Run enforce(keep) on the main thread (callable from any thread).
+        Requests made before it runs are merged.
+        """
+        if not self.limit or self.scheduler is None:
+            return
+        with self._lock:
+            self._enforce_keep = keep
+            if self._enforce_scheduled:
+                return
+            self._enforce_scheduled = True
+        self.scheduler(self._run_scheduled_enforce)
+
+    def _run_scheduled_enforce(self):
+        """Main-thread side of schedule_enforce()."""
+        with self._lock:
+            keep = self._enforce_keep
+            self._enforce_scheduled = False
+        self.enforce(keep=keep)
+
+    def enforce(self, keep=None, extra=0):
+        """
+        Release data until the budget is respected (with room for `extra` bytes).
+
+        Datasets other than `keep` are released first, least recently used
+        first; then the releasable data of `keep` itself, cheapest first
+        (see RELEASE_ORDER). Data without a release callback is kept.
+        Main thread only (see schedule_enforce).
+
+        Returns:
+        - number of bytes released
+        """
+        if not self.limit:
+            return 0
+        released = 0
+        for dataset, category, nbytes, release in self._candidates(keep):
+            if self.used() + extra <= self.limit:
+                break
+            release()  # called without the lock: it may account again
+            self.discard(dataset, category)
+            released += nbytes
+        return released
+
+    def _candidates(self, keep):
+        """Releasable entries in release order."""
+        def rank(category):
+            return RELEASE_ORDER.index(category) if category in RELEASE_ORDER else -1
+
+        with self._lock:
+            others = [(d, e) for d, e in self._datasets.items() if d != keep]
+            kept = [(keep, self._datasets[keep])] if keep in self._datasets else []
+            candidates = []
+            for dataset, entries in others + kept:
+                for category in sorted(entries, key=rank):
+                    nbytes, release = entries[category]
+                    if release is not None and nbytes > 0:
+                        candidates.append((dataset, category, nbytes, release))
+        return candidates
+
+
+memory = MemoryBudget()  # shared budget (the limit is set by main.py from config.MEMORY_BUDGET)
@@ -3,6 +3,19 @@
 # It supports:
 # - Right-click dragging to navigate slices
 # - Mouse wheel scrolling to move through slices
+# - Left-click dragging to adjust window/level
+# Fast gestures cover more slices: drag distance is scaled by the drag speed,
+# and quick successive wheel clicks accelerate.
+
+import time  # speed of drags and wheel clicks
+
+DRAG_PIXELS_PER_SLICE = 5  # slow drag: one slice per 5 px
+DRAG_REFERENCE_SPEED = 800.0  # px/s at which a drag moves twice as many slices
+MAX_DRAG_GAIN = 8.0  # fastest drag: 8x more slices per pixel
+SCROLL_ACCELERATION = 1.5  # speed-up of each quick successive wheel click
+SCROLL_RESET_DELAY = 0.15  # seconds between wheel clicks that reset the speed
+MAX_SCROLL_STEP = 10  # slices per wheel click at most
+
 
 class MouseController:
     """
@@ -11,6 +24,7 @@ class MouseController:
     Responsibilities:
     - Track right-click state for dragging
     - Detect scroll up/down events
+    - Track left-click drags for window/level
     """
 
     def __init__(self):
@@ -19,10 +33,17 @@ class MouseController:
 
         Attributes:
         - is_right_click: True if the right mouse button is currently pressed
+        - is_left_click: True if the left mouse button is currently pressed
         - last_pos: last recorded mouse position (x, y)
         """
         self.is_right_click = False  # right-click is not active initially
+        self.is_left_click = False  # left-click is not active initially
         self.last_pos = (0, 0)  # initial mouse position
+        self._last_move_time = 0.0  # time of the last right-drag event
+        self._drag_remainder = 0.0  # fraction of a slice not applied yet
+        self._scroll_direction = 0  # direction of the last wheel click
+        self._scroll_time = 0.0  # time of the last wheel click
+        self._scroll_speed = 1.0  # slices per wheel click (accelerates)
 
     def touch_down(self, widget, touch):
         """
@@ -34,7 +55,7 @@ class MouseController:
 
         Returns:
         - 'up'/'down' for scroll events (used by DicomScreen)
-        - True if right-click started
+        - True if right-click or left-click started
         - False otherwise
         """
         if not widget.collide_point(*touch.pos):
@@ -49,8 +70,16 @@ class MouseController:
             # If right-click pressed, start drag mode
             self.is_right_click = True
             self.last_pos = touch.pos  # store initial click position
+            self._last_move_time = time.perf_counter()
+            self._drag_remainder = 0.0
             return True  # indicate right-click handled
 
+        if touch.button == 'left':
+            # If left-click pressed, start window/level drag
+            self.is_left_click = True
+            self.last_pos = touch.pos
+            return True
+
         return False  # all other touches are ignored
 
     def touch_move(self, widget, touch):
@@ -62,19 +91,67 @@ class MouseController:
         - touch: Kivy touch object
 
         Returns:
-        - 'up' if dragging upwards
-        - 'down' if dragging downwards
-        - None if no action
+        - number of slices to move: negative when dragging upwards
+          (previous slices), positive when dragging downwards (next slices),
+          0 if no action. A slow drag moves one slice per 5 px; faster drags
+          move proportionally more (up to MAX_DRAG_GAIN times).
         """
-        if self.is_right_click and widget.collide_point(*touch.pos):
-            # Calculate vertical movement (dy)
-            dy = touch.pos[1] - self.last_pos[1]
+        if not self.is_right_click or not widget.collide_point(*touch.pos):
+            return 0
+
+        now = time.perf_counter()
+        dy = touch.pos[1] - self.last_pos[1]  # vertical movement since the last event
+        dt = max(now - self._last_move_time, 1e-3)
+        self.last_pos = touch.pos
+        self._last_move_time = now
+
+        gain = min(1.0 + abs(dy) / dt / DRAG_REFERENCE_SPEED, MAX_DRAG_GAIN)
+        # dragging up (dy > 0) goes to previous slices; keep the fraction for the next event
+        self._drag_remainder += -dy * gain / DRAG_PIXELS_PER_SLICE
+        steps = int(self._drag_remainder)
+        self._drag_remainder -= steps
+        return steps
+
+    def scroll_steps(self, button):
+        """
+        Convert a wheel click into a number of slices.
 
-            if abs(dy) > 5:  # threshold to avoid small jitters
-                self.last_pos = touch.pos  # update last known position
-                return "up" if dy > 0 else "down"  # return movement direction
+        Parameters:
+        - button: 'scrolldown' (next slices) or 'scrollup' (previous slices)
 
-        return None  # no significant movement
+        Returns:
+        - signed number of slices; quick successive clicks in the same
+          direction move more slices each (up to MAX_SCROLL_STEP)
+        """
+        direction = 1 if button == 'scrolldown' else -1
+        now = time.perf_counter()
+        if direction != self._scroll_direction or now - self._scroll_time > SCROLL_RESET_DELAY:
+            self._scroll_speed = 1.0
+        else:
+            self._scroll_speed = min(self._scroll_speed * SCROLL_ACCELERATION, MAX_SCROLL_STEP)
+        self._scroll_direction = direction
+        self._scroll_time = now
+        return direction * int(self._scroll_speed)
+
+    def window_move(self, widget, touch):
+        """
+        Handle mouse movement while the left button is pressed.
+
+        Parameters:
+        - widget: the widget receiving the touch
+        - touch: Kivy touch object
+
+        Returns:
+        - (dx, dy) movement in pixels since the last call
+        - None if no left-click drag is active
+        """
+        if not self.is_left_click or not widget.collide_point(*touch.pos):
+            return None
+
+        dx = touch.pos[0] - self.last_pos[0]
+        dy = touch.pos[1] - self.last_pos[1]
+        self.last_pos = touch.pos
+        return dx, dy
 
     def touch_up(self, touch):
         """
@@ -84,10 +161,13 @@ class MouseController:
         - touch: Kivy touch object
 
         Returns:
-        - True if right-click was released
+        - True if right-click or left-click was released
         - False otherwise
         """
         if touch.button == 'right':
             self.is_right_click = False  # end drag mode
             return True
+        if touch.button == 'left':
+            self.is_left_click = False  # end window/level drag
+            return True
         return False
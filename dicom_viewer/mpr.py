@@ -0,0 +1,139 @@
+# === dicom_viewer/mpr.py ===
+# This file builds multiplanar reformats (coronal and sagittal views) from
+# the Volume of an axial series. Reformat slices are cut from the in-memory
+# (or memory-mapped) pixel array with strided NumPy indexing, so no file is
+# read again, and stretched vertically so that slice spacing and pixel
+# spacing give the correct aspect ratio.
+# The acquired plane is treated as axial: the head is shown at the top of
+# both reformats, patient right on the left of the coronal view (radiological
+# convention) and anterior on the left of the sagittal view. Directions are
+# taken from the ImageOrientationPatient direction cosines (DICOM patient
+# axes: +x left, +y posterior, +z head).
+# Like the axial slices once oriented (see orientation.py), reformats are
+# returned bottom row first: Kivy shows array row 0 at the bottom.
+
+import numpy as np
+from .dicom_header import SliceInfo
+
+AXIAL = "axial"  # acquired slices
+CORONAL = "coronal"  # one image row of every slice
+SAGITTAL = "sagittal"  # one image column of every slice
+VIEWS = (AXIAL, CORONAL, SAGITTAL)
+
+
+def view_length(volume, view):
+    """
+    Return the number of slices of a view of a volume.
+    """
+    if volume is None:
+        return 0
+    if view == CORONAL:
+        return volume.rows
+    if view == SAGITTAL:
+        return volume.columns
+    return volume.count()
+
+
+def slice_spacing(slices):
+    """
+    Return the distance between adjacent slices in mm: the median step of
+    the sorted positions, else SliceThickness, else 1.0.
+    """
+    if len(slices) > 1:
+        steps = np.abs(np.diff([s.position for s in slices]))
+        step = float(np.median(steps))
+        if step > 0:
+            return step
+    thickness = slices[0].slice_thickness if slices else None
+    return thickness if thickness else 1.0
+
+
+def _stretch_rows(image, scale):
+    """
+    Resample the rows of an image by `scale` (linear interpolation between
+    adjacent rows, computed for all pixels at once).
+    """
+    count = image.shape[0]
+    out_rows = max(1, int(round(count * scale)))
+    if out_rows == count or count < 2:
+        return image
+    position = np.linspace(0, count - 1, out_rows, dtype=np.float32)
+    low = position.astype(np.intp)
+    high = np.minimum(low + 1, count - 1)
+    weight = (position - low)[:, None]
+    mixed = image[low] * (1 - weight) + image[high] * weight  # float32
+    return np.rint(mixed).astype(image.dtype)
+
+
+def in_plane_directions(iop):
+    """
+    Return how the image axes of the acquired slices run in the patient.
+
+    Parameters:
+    - iop: the 6 ImageOrientationPatient values (None or empty: rows along
+      +x, columns along +y, as in a standard axial slice)
+
+    Returns:
+    - (left, posterior): True if the column index increases towards the
+      patient's left, True if the row index increases towards posterior
+    """
+    if not iop or len(iop) < 6:
+        return True, True
+    row_x = float(iop[0])  # x component of the direction of image rows
+    column_y = float(iop[4])  # y component of the direction of image columns
+    return row_x >= 0, column_y >= 0
+
+
+def reformat_slice(volume, view, index):
+    """
+    Cut one slice of a view out of a volume.
+
+    Parameters:
+    - volume: Volume of the series (slices not decoded yet are black)
+    - view: AXIAL, CORONAL or SAGITTAL
+    - index: slice index in that view (0 = anterior for coronal,
+      patient right for sagittal, as displayed on the axial slices)
+
+    Returns:
+    - numpy array of stored values, already in display orientation and
+      aspect ratio: row 0 is the foot end (shown at the bottom by Kivy),
+      column 0 is patient right (coronal) or anterior (sagittal); axial
+      slices are returned as stored (they are oriented by render_slice)
+    """
+    if view == AXIAL:
+        return volume.get_slice(index)
+
+    info = volume.slices[len(volume.slices) // 2]
+    left, posterior = in_plane_directions(info.orientation)
+    row_spacing, column_spacing = info.pixel_spacing if info.pixel_spacing else (1.0, 1.0)
+
+    if view == CORONAL:
+        row = index if posterior else volume.rows - 1 - index
+        image = volume.pixels[:, row, :]  # (slices, columns)
+        if not left:
+            image = image[:, ::-1]  # patient right first
+        spacing = column_spacing
+    else:
+        column = index if left else volume.columns - 1 - index
+        image = volume.pixels[:, :, column]  # (slices, rows), strided
+        if not posterior:
+            image = image[:, ::-1]  # anterior first
+        spacing = row_spacing
+
+    if volume.count() > 1 and volume.slices[0].position > volume.slices[-1].position:
+        image = image[::-1]  # first slice is the highest: put the foot in row 0 (bottom)
+
+    image = _stretch_rows(image, slice_spacing(volume.slices) / (spacing or 1.0))
+    return np.ascontiguousarray(image)
+
+
+def reformat_info(volume):
+    """
+    Return the SliceInfo used to render reformatted slices: rescale and
+    default window of the middle slice, and an empty orientation so that
+    no flip is applied (reformat_slice already returns display orientation,
+    bottom row first).
+    """
+    info = SliceInfo.from_dict(volume.slices[len(volume.slices) // 2].to_dict())
+    info.orientation = ()
+    return info
@@ -43,10 +43,51 @@ def apply_radiological_orientation(arr, ds):
     - Oriented numpy array suitable for display
     """
 
+    # A missing ImageOrientationPatient tag is handled by orient_array
+    return orient_array(arr, getattr(ds, "ImageOrientationPatient", None))
+
+def orient_array(arr, iop):
+    """
+    Correct the image array using an already parsed ImageOrientationPatient.
+
+    Parameters:
+    - arr: numpy array representing the image pixels
+    - iop: the 6 ImageOrientationPatient values, [] if the tag is empty,
+      None if the tag is missing
+
+    Returns:
+    - Oriented numpy array suitable for display
+    """
+    flip_v, flip_h = orientation_flips(iop)
+
+    # Apply vertical flip if necessary
+    if flip_v:
+        arr = np.flipud(arr)  # flip upside-down
+
+    # Apply horizontal flip if necessary
+    if flip_h:
+        arr = np.fliplr(arr)  # flip left-right
+
+    return arr  # return the oriented image array
+
+def orientation_flips(iop):
+    """
+    Decide how a slice must be flipped for display (see orient_array).
+
+    Parameters:
+    - iop: the 6 ImageOrientationPatient values, [] if the tag is empty,
+      None if the tag is missing
+
+    Returns:
+    - (flip_v, flip_h): flip upside-down, flip left-right
+    """
+
+    if iop is None:
+        return True, False  # tag missing: same fallback as below
+
     try:
-        iop = ds.ImageOrientationPatient  # get orientation metadata
         if not iop:
-            return arr  # no orientation info, return original array
+            return False, False  # no orientation info, keep the original array
 
         # Orientation vectors
         row = np.array(iop[:3])  # direction of image rows
@@ -68,16 +109,8 @@ def apply_radiological_orientation(arr, ds):
         if abs(norm[2]) > 0.7 and norm[2] > 0:
             flip_v = True
 
-        # Apply vertical flip if necessary
-        if flip_v:
-            arr = np.flipud(arr)  # flip upside-down
-
-        # Apply horizontal flip if necessary
-        if flip_h:
-            arr = np.fliplr(arr)  # flip left-right
+        return flip_v, flip_h
 
     except Exception:
         # If anything fails, fallback to a vertical flip
-        arr = np.flipud(arr)
-
-    return arr  # return the oriented image array
+        return True, False
@@ -0,0 +1,142 @@
+# === dicom_viewer/process_decoder.py ===
+# This file decodes slices in a pool of worker processes.
+# Decompressing JPEG / JPEG 2000 / RLE pixel data is CPU-bound and the
+# Python-side handlers hold the GIL, so threads barely help; processes use
+# every core. The volume lives in shared memory: each process writes its
+# slice directly into it and only the slice index travels back, so no pixel
+# array is ever pickled.
+#
+# This module must not import Kivy: it is imported by the worker processes.
+
+import os  # default number of processes
+import threading  # protects the shared pool
+from concurrent.futures import ProcessPoolExecutor  # pool of decoding processes
+from multiprocessing import shared_memory  # volume buffer shared with the workers
+import numpy as np
+from .dicom_header import SliceInfo
+from .image_processor import read_slice_pixels
+from .volume import Volume, volume_layout
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+
+_pool = None  # process pool shared by every series (starting processes is slow)
+_pool_size = 0
+_pool_lock = threading.Lock()  # loaders may ask for the pool from several threads
+
+
+def get_process_pool(processes=DEFAULT_PROCESSES):
+    """
+    Return the shared process pool, creating it on first use.
+
+    Parameters:
+    - processes: number of worker processes
+
+    Returns:
+    - ProcessPoolExecutor
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=processes)
+            _pool_size = processes
+        return _pool
+
+
+def shutdown_process_pool():
+    """
+    Stop the worker processes (e.g. when the application exits).
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool, _pool_size = None, 0
+
+
+def _decode_into_shared(shm_name, shape, dtype, index, info_dict):
+    """
+    Worker process: decode one slice into the shared volume buffer.
+
+    Parameters:
+    - shm_name: name of the shared memory block holding the volume
+    - shape, dtype: layout of the volume array
+    - index: slice index to write
+    - info_dict: SliceInfo.to_dict() of the slice
+
+    Returns:
+    - the slice index (the pixels are already in shared memory)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pixels = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        raw = read_slice_pixels(SliceInfo.from_dict(info_dict))
+        if raw.shape != shape[1:]:
+            raise ValueError(f"Slice shape {raw.shape} does not match volume {shape[1:]}")
+        pixels[index] = raw
+        del pixels  # release the buffer before closing the shared memory
+    finally:
+        shm.close()
+    return index
+
+
+class ProcessDecoder:
+    """
+    Decode the slices of a series with a process pool into shared memory.
+
+    Responsibilities:
+    - Allocate the volume in a shared memory block
+    - Submit one slice at a time to the pool (callers choose the order)
+    - Release the shared memory name once decoding is over
+    """
+
+    def __init__(self, slices, processes=DEFAULT_PROCESSES):
+        """
+        Allocate the shared volume.
+
+        Parameters:
+        - slices: sorted list of SliceInfo
+        - processes: number of worker processes
+
+        Attributes:
+        - volume: Volume whose pixel array lives in shared memory
+        """
+        rows, columns, dtype = volume_layout(slices)
+        self.shape = (len(slices), rows, columns)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        pixels = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        self.volume = Volume(slices, pixels=pixels, decoded=False)
+        # the volume keeps the shared memory alive as long as its pixels are used
+        self.volume.buffer_owner = self._shm
+
+        self._infos = [info.to_dict() for info in slices]
+        self._pool = get_process_pool(processes)
+
+    def decode(self, index):
+        """
+        Decode one slice in a worker process and wait for it.
+        Blocks only the calling (loader) thread.
+
+        Returns:
+        - the stored values of the slice (a view into the shared volume)
+        """
+        future = self._pool.submit(_decode_into_shared, self._shm.name, self.shape,
+                                   self.dtype.str, index, self._infos[index])
+        future.result()  # re-raises decoding errors
+        self.volume.loaded[index] = True
+        self.volume.update_preview(index)
+        return self.volume.pixels[index]
+
+    def release(self):
+        """
+        Remove the shared memory name once no more slices will be decoded.
+        The memory itself stays valid until the volume is garbage collected.
+        """
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass  # already released
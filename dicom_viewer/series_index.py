@@ -0,0 +1,240 @@
+# === dicom_viewer/series_index.py ===
+# This file stores the parsed headers of a dataset folder on disk, so that
+# reopening a dataset does not parse every DICOM header again.
+# Each file entry is validated against the file size and modification time;
+# only new or modified files are read again.
+
+import hashlib  # stable cache folder name per dataset
+import json  # index file format
+import os  # paths and atomic file replacement
+import tempfile  # unique temporary files for concurrent writers
+from .dicom_header import SliceInfo, is_dicom_file_name
+
+INDEX_VERSION = 3  # bump when the SliceInfo fields change
+INDEX_FILE = "index.json"
+
+
+def dataset_cache_dir(cache_folder, dataset_folder):
+    """
+    Return the cache folder used for one dataset.
+
+    Parameters:
+    - cache_folder: root cache folder (config.CACHE_FOLDER)
+    - dataset_folder: path to the dataset folder
+
+    Returns:
+    - Path of a folder named after a hash of the dataset path
+    """
+    key = hashlib.sha1(os.path.abspath(dataset_folder).encode("utf-8")).hexdigest()
+    return os.path.join(cache_folder, key)
+
+
+def open_temp_file(path, mode="w", **kwargs):
+    """
+    Create a uniquely named temporary file next to `path`, to be moved over
+    it with os.replace once written. Several threads or processes (loader,
+    thumbnails, precompute.py) may write the same cache file at once: each
+    gets its own temporary file, so none can publish another's partial write.
+
+    Parameters:
+    - path: final path of the file
+    - mode, kwargs: passed to open() ("w" with encoding, or "wb")
+
+    Returns:
+    - (open file object, temporary path)
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        return os.fdopen(fd, mode, **kwargs), tmp
+    except Exception:
+        os.close(fd)
+        os.remove(tmp)
+        raise
+
+
+def remove_temp_file(tmp):
+    """
+    Delete a temporary file left by an interrupted write (None is ignored).
+    """
+    if tmp is not None:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def series_fingerprint(dataset_folder):
+    """
+    Return a fingerprint of the (possibly) DICOM files of a dataset folder.
+
+    Only file names, sizes and modification times are used (no file is
+    opened), so checking whether a cache is still valid costs one
+    directory listing.
+
+    Parameters:
+    - dataset_folder: path to the dataset folder
+
+    Returns:
+    - hexadecimal string, different as soon as a file is added, removed or modified
+    """
+    entries = []
+    with os.scandir(dataset_folder) as it:
+        for entry in it:
+            if is_dicom_file_name(entry.name) and entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return fingerprint_of(entries)
+
+
+def fingerprint_of(entries):
+    """
+    Return the fingerprint of a list of (name, size, mtime_ns) file entries
+    (see series_fingerprint).
+    """
+    h = hashlib.sha1()
+    for name, size, mtime_ns in sorted(entries):
+        h.update(f"{name}\0{size}\0{mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class SeriesIndex:
+    """
+    Persistent index of the DICOM headers of one dataset folder.
+
+    Responsibilities:
+    - Load/save the index file in the dataset cache folder
+    - Return cached SliceInfo objects for files that did not change
+    - Remember files that are not readable DICOM (e.g. no preamble), so they are skipped too
+    """
+
+    def __init__(self, cache_folder, dataset_folder):
+        """
+        Initialize the index (call load() to read it from disk).
+
+        Attributes:
+        - path: location of the index file
+        - entries: file name -> {"size", "mtime_ns", "infos" or "error"}
+          ("infos" holds one SliceInfo per frame)
+        - fingerprint: series_fingerprint of the folder when the entries
+          were last checked against it (None if unknown)
+        - changed: True if entries must be written back by save()
+        """
+        self.dataset_folder = dataset_folder
+        self.path = os.path.join(dataset_cache_dir(cache_folder, dataset_folder), INDEX_FILE)
+        self.entries = {}
+        self.fingerprint = None
+        self.changed = False
+
+    def load(self):
+        """
+        Read the index file. A missing, corrupted or outdated index is ignored
+        (the dataset is simply scanned again).
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data.get("files", {})
+                self.fingerprint = data.get("fingerprint")
+        except (OSError, ValueError):
+            self.entries = {}
+            self.fingerprint = None
+        return self
+
+    def save(self):
+        """
+        Write the index file if it changed.
+        The file is replaced atomically so an interrupted write never corrupts it.
+        """
+        if not self.changed:
+            return
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            f, tmp = open_temp_file(self.path, "w", encoding="utf-8")
+            with f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "folder": os.path.abspath(self.dataset_folder),
+                    "fingerprint": self.fingerprint,
+                    "files": self.entries,
+                }, f)
+            os.replace(tmp, self.path)
+            tmp = None
+            self.changed = False
+        except OSError as e:
+            print("Index write error:", self.path, e)
+        finally:
+            remove_temp_file(tmp)
+
+    def lookup(self, name, stat):
+        """
+        Return the cached entry of a file if it is still valid.
+
+        Parameters:
+        - name: file name inside the dataset folder
+        - stat: os.stat_result of the file
+
+        Returns:
+        - list of SliceInfo (one per frame) if the header is cached
+        - False if the file is known not to be a readable DICOM file
+        - None if the file is new or changed (it must be read again)
+        """
+        entry = self.entries.get(name)
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            return None
+        if "error" in entry:
+            return False
+        path = os.path.join(self.dataset_folder, name)
+        infos = []
+        for data in entry["infos"]:
+            info = SliceInfo.from_dict(data)
+            info.path = path
+            infos.append(info)
+        return infos
+
+    def set_fingerprint(self, fingerprint):
+        """
+        Record the fingerprint of the folder the entries are up to date with.
+        """
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.changed = True
+
+    def all_slices(self):
+        """
+        Return the SliceInfo of every indexed frame, without checking the
+        files (compare `fingerprint` with series_fingerprint first).
+        """
+        slices = []
+        for name, entry in self.entries.items():
+            path = os.path.join(self.dataset_folder, name)
+            for data in entry.get("infos", ()):
+                info = SliceInfo.from_dict(data)
+                info.path = path
+                slices.append(info)
+        return slices
+
+    def store(self, name, stat, infos=None, error=None):
+        """
+        Record the header of a file (its SliceInfo list, or the error raised while reading it).
+        """
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if infos is not None:
+            entry["infos"] = [info.to_dict() for info in infos]
+        else:
+            entry["error"] = str(error)
+        self.entries[name] = entry
+        self.changed = True
+
+    def prune(self, names):
+        """
+        Drop entries of files that no longer exist.
+
+        Parameters:
+        - names: set of file names currently in the dataset folder
+        """
+        for name in list(self.entries):
+            if name not in names:
+                del self.entries[name]
+                self.changed = True
@@ -2,44 +2,182 @@
 # This file contains functions to load DICOM series from a folder,
 # read their anatomical positions, and sort them cranio-caudally
 # (head → foot) for correct display order.
+# A folder may hold several series (localizers, other reconstructions):
+# slices are grouped by SeriesInstanceUID, orientation and matrix size, in
+# the same pass that reads the headers, and each group is sorted on its own.
 
 import os  # import OS module to work with filesystem paths
-import pydicom  # import pydicom to read DICOM files
-from .orientation import get_anatomical_position  # import function to get Z position of a slice
+import time  # scan duration for the performance statistics
+from pydicom.errors import InvalidDicomError  # files without a DICOM preamble
+from .dicom_header import read_slice_infos, is_dicom_file_name  # parse each header once and keep the result
+from .series_index import SeriesIndex, fingerprint_of  # persistent header index (optional)
+from .instrumentation import perf  # per-stage timings
 
-def load_sorted_series(folder_path):
+ORIENTATION_DECIMALS = 2  # orientations equal at this precision belong to the same stack
+
+
+def series_id(info):
     """
-    Load all DICOM files in a folder, sort them by anatomical position,
-    and return the file paths in cranio-caudal order.
+    Return the identifier of the series (stack) a slice belongs to:
+    SeriesInstanceUID, matrix size and rounded orientation, so a localizer
+    or a reformat stored under the same UID forms its own stack.
+    """
+    orientation = ",".join(f"{v:.{ORIENTATION_DECIMALS}f}" for v in info.orientation or ())
+    return f"{info.series_uid}|{info.rows}x{info.columns}|{orientation}"
+
+
+def group_series(slices):
+    """
+    Split slices into series and sort each of them.
+
+    Parameters:
+    - slices: list of SliceInfo, in any order
+
+    Returns:
+    - list of series (lists of SliceInfo sorted cranial → caudal); the main
+      series (most slices, then lowest series number) comes first
+    """
+    groups = {}
+    for info in slices:
+        if info.rows and info.columns:  # objects without an image (reports...) are skipped
+            groups.setdefault(series_id(info), []).append(info)
+
+    series = list(groups.values())
+    for group in series:
+        # Sort the slices based on anatomical position (cranial → caudal)
+        group.sort(key=lambda s: s.position)
+    series.sort(key=lambda g: (-len(g), g[0].series_number if g[0].series_number is not None else 1 << 31))
+    return series
+
+
+def series_label(slices):
+    """
+    Return a short description of a series for the series list
+    (e.g. "3 AX T1 - 120 images").
+    """
+    info = slices[0]
+    number = f"{info.series_number} " if info.series_number is not None else ""
+    description = info.series_description or "Series"
+    return f"{number}{description} - {len(slices)} images ({info.rows}x{info.columns})"
+
+
+def scan_folder(folder_path, cache_folder=None):
+    """
+    Read the header of every DICOM file in a folder and group the slices
+    into sorted series.
+
+    Every file that may be DICOM is opened once: files without a DICOM
+    preamble are rejected after reading 132 bytes, and the headers of the
+    others are kept in SliceInfo objects with everything needed to decode
+    the pixels later (see image_processor.read_slice_pixels).
 
     Parameters:
     - folder_path: path to the folder containing DICOM files
+    - cache_folder: optional root cache folder; when given, headers are
+      taken from the persistent series index for files whose size and
+      modification time did not change, and the index is updated
 
     Returns:
-    - List of file paths sorted from top (head) to bottom (foot)
+    - list of series, main series first (see group_series)
+    """
+
+    start = time.perf_counter()
+    slices = []  # list of SliceInfo objects
+    index = SeriesIndex(cache_folder, folder_path).load() if cache_folder else None
+    names = set()  # DICOM file names found in the folder
+    files = []  # (name, size, mtime_ns) of those files, for the index fingerprint
+
+    # Loop over each file in the folder (scandir gives the file stats cheaply)
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            # Skip files that are certainly not DICOM (the preamble decides for the others)
+            if not is_dicom_file_name(entry.name) or not entry.is_file():
+                continue
+            names.add(entry.name)
+
+            stat = entry.stat() if index is not None else None
+            if stat is not None:
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+            infos = index.lookup(entry.name, stat) if index is not None else None
+            if infos is False:
+                continue  # known unreadable file, unchanged since last scan
+            if infos is None:
+                try:
+                    # Read the DICOM header only (the pixel data offset is recorded, not loaded);
+                    # multi-frame files give one SliceInfo per frame
+                    infos = read_slice_infos(entry.path)
+                    if index is not None:
+                        index.store(entry.name, stat, infos=infos)
+                except InvalidDicomError as e:
+                    # Not a DICOM file: remembered until the file changes
+                    if index is not None:
+                        index.store(entry.name, stat, error=e)
+                    continue
+                except Exception as e:
+                    # Print a warning if the DICOM header cannot be read; not indexed,
+                    # so a transient error (file being copied, network share) is retried
+                    print("Header read error:", entry.path, e)
+                    continue
+            slices.extend(infos)
+
+    if index is not None:
+        index.prune(names)
+        index.set_fingerprint(fingerprint_of(files))  # every entry was checked against these files
+        index.save()
+
+    series = group_series(slices)
+
+    perf.record("scan", time.perf_counter() - start, items=len(slices), start=start)
+    return series
+
+
+def select_series(series, wanted=None):
+    """
+    Pick one series of a folder.
+
+    Parameters:
+    - series: list of series returned by scan_folder
+    - wanted: series_id of the series to pick (None: the main series)
+
+    Returns:
+    - the sorted SliceInfo list of the series (the main series if `wanted`
+      is not found, empty if the folder has no image)
+    """
+    if wanted is not None:
+        for slices in series:
+            if series_id(slices[0]) == wanted:
+                return slices
+    return series[0] if series else []
+
+
+def scan_series(folder_path, cache_folder=None, series=None):
     """
+    Read the headers of a folder and return one of its series, sorted
+    by anatomical position.
 
-    dicom_files = []  # list to store tuples: (position, file_path)
+    Parameters:
+    - folder_path: path to the folder containing DICOM files
+    - cache_folder: optional root cache folder for the series index
+    - series: series_id of the series to return (None: the main series)
 
-    # Loop over each file in the folder
-    for f in os.listdir(folder_path):
-        # Only consider files with DICOM extensions
-        if f.lower().endswith(('.dcm', '.dicom')):
-            path = os.path.join(folder_path, f)  # get full path of the file
+    Returns:
+    - List of SliceInfo sorted from top (head) to bottom (foot)
+    """
+    return select_series(scan_folder(folder_path, cache_folder), series)
 
-            try:
-                # Read the DICOM header only (stop_before_pixels=True avoids loading image data)
-                ds = pydicom.dcmread(path, stop_before_pixels=True)
-                # Get the anatomical Z position (or fallback to InstanceNumber)
-                pos = get_anatomical_position(ds)
-                # Store a tuple of (position, path) to sort later
-                dicom_files.append((pos, path))
-            except Exception as e:
-                # Print a warning if the DICOM header cannot be read
-                print("Header read error:", path, e)
 
-    # Sort the files based on anatomical position (cranial → caudal)
-    dicom_files.sort(key=lambda x: x[0])  # sort by the first element of the tuple (position)
+def load_sorted_series(folder_path, cache_folder=None):
+    """
+    Load the main series of a folder, sort it by anatomical position,
+    and return the file paths in cranio-caudal order.
+
+    Parameters:
+    - folder_path: path to the folder containing DICOM files
+    - cache_folder: optional root cache folder for the series index
+
+    Returns:
+    - List of file paths sorted from top (head) to bottom (foot)
+    """
 
     # Return a list of only the file paths, now sorted in the correct order
-    return [path for _, path in dicom_files]
+    return [s.path for s in scan_series(folder_path, cache_folder)]
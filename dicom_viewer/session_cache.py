@@ -0,0 +1,135 @@
+# === dicom_viewer/session_cache.py ===
+# This file keeps the last datasets opened in the viewer "warm" for the
+# session: their SeriesLoader (sorted slices, decoded volume, queued
+# results) and the viewing state (current slice, plane, window) are parked
+# when the viewer is left, so going back to a case during a lesson shows it
+# again instantly, where the user left it.
+# The cache holds at most `capacity` datasets and evicts the least recently
+# used one. Parked volumes are also registered in the memory budget, which
+# evicts them (least recently used first) when memory is needed.
+
+import threading  # the memory budget may evict from a loader thread
+from collections import OrderedDict  # parked datasets, least recently used first
+from .memory_budget import memory, resident_bytes, VOLUME, TEXTURES, SLAB  # shared memory budget
+
+DEFAULT_SESSION_CACHE_SIZE = 4  # datasets kept warm
+
+
+class SessionEntry:
+    """
+    A dataset parked in the session cache.
+
+    Attributes:
+    - loader: SeriesLoader of the dataset (paused while parked)
+    - index: slice displayed when the viewer was left
+    - view: plane displayed (mpr.AXIAL, CORONAL or SAGITTAL)
+    - window: (center, width) chosen by the user, None for the DICOM default
+    """
+
+    def __init__(self, loader, index=0, view=None, window=None):
+        self.loader = loader
+        self.index = index
+        self.view = view
+        self.window = window
+
+
+class SessionCache:
+    """
+    Bounded LRU cache of recently viewed datasets.
+
+    Responsibilities:
+    - Park the loader and viewing state of a dataset when it is left
+    - Hand them back when the dataset is opened again
+    - Cancel the loaders of evicted datasets and release their memory
+    """
+
+    def __init__(self, capacity=DEFAULT_SESSION_CACHE_SIZE):
+        """
+        Parameters:
+        - capacity: maximum number of datasets kept (0 disables the cache)
+        """
+        self.capacity = max(0, capacity)
+        self._entries = OrderedDict()  # folder -> SessionEntry, least recently used first
+        self._lock = threading.Lock()  # protects _entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, folder):
+        return folder in self._entries
+
+    def park(self, entry):
+        """
+        Keep a dataset warm. Its loader is paused; the least recently used
+        datasets are evicted beyond the capacity.
+
+        Parameters:
+        - entry: SessionEntry of the dataset (keyed by its loader's folder)
+        """
+        folder = entry.loader.folder
+        if self.capacity == 0:
+            self._cancel(folder, entry)
+            return
+        entry.loader.pause()  # no decoding competes with the dataset being viewed
+
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(folder, None)
+            if previous is not None and previous.loader is not entry.loader:
+                evicted.append((folder, previous))
+            self._entries[folder] = entry
+            while len(self._entries) > self.capacity:
+                evicted.append(self._entries.popitem(last=False))
+
+        for old_folder, old_entry in evicted:
+            self._cancel(old_folder, old_entry)
+
+        # Textures and slab caches belong to the viewer: only the volume stays
+        memory.discard(folder, TEXTURES)
+        memory.discard(folder, SLAB)
+        volume = entry.loader.volume
+        if volume is not None:
+            memory.set(folder, VOLUME, resident_bytes(volume.pixels), release=lambda: self.evict(folder))
+
+    def take(self, folder):
+        """
+        Remove a dataset from the cache and return it, resumed.
+
+        Returns:
+        - SessionEntry, or None if the dataset is not warm
+        """
+        with self._lock:
+            entry = self._entries.pop(folder, None)
+        if entry is None:
+            return None
+        entry.loader.resume()
+        volume = entry.loader.volume
+        if volume is not None:
+            memory.set(folder, VOLUME, resident_bytes(volume.pixels))  # in use: no longer releasable
+        memory.touch(folder)
+        return entry
+
+    def evict(self, folder):
+        """
+        Drop a dataset: cancel its loader and release its memory.
+        Also called by the memory budget when it is exceeded.
+        """
+        with self._lock:
+            entry = self._entries.pop(folder, None)
+        if entry is not None:
+            self._cancel(folder, entry)
+
+    def clear(self):
+        """
+        Drop every dataset.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+        for folder, entry in entries:
+            self._cancel(folder, entry)
+
+    def _cancel(self, folder, entry):
+        """Stop the loader of a dropped dataset and forget its memory."""
+        entry.loader.cancel()
+        memory.discard(folder)
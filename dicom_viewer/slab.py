@@ -0,0 +1,170 @@
+# === dicom_viewer/slab.py ===
+# This file computes thick-slab projections (MIP, MinIP, average) over N
+# adjacent slices of a Volume, with NumPy reductions along the slice axis.
+# Projections are updated incrementally while scrolling:
+# - average: a running sum of the slab, corrected by the slices that
+#   enter and leave it instead of summing the whole slab again
+# - MIP/MinIP: maxima (minima) of fixed blocks of slices are cached, so a
+#   slab only reduces a few block images plus the slices at its two ends
+
+import math  # block size
+from collections import OrderedDict  # LRU cache of block maxima
+import numpy as np
+from .instrumentation import perf  # per-stage timings
+
+MIP = "MIP"  # maximum intensity projection
+MINIP = "MinIP"  # minimum intensity projection
+AVERAGE = "Average"  # average intensity projection
+SLAB_MODES = (MIP, MINIP, AVERAGE)
+
+
+class SlabProjector:
+    """
+    Thick-slab projections of a Volume.
+
+    Responsibilities:
+    - Choose the slices of the slab centered on a slice
+    - Reduce them with np.maximum / np.minimum / a sum
+    - Reuse the previous slab (running sum, cached block extrema) when
+      scrolling, so moving by one slice costs a few slice operations
+    """
+
+    def __init__(self, volume, mode=MIP, thickness=10):
+        """
+        Initialize the projector.
+
+        Parameters:
+        - volume: Volume of the series
+        - mode: MIP, MINIP or AVERAGE
+        - thickness: number of slices in the slab
+        """
+        self.volume = volume
+        self.mode = None
+        self.thickness = 0
+        self.block_size = 1
+        self._blocks = OrderedDict()  # block index -> max/min image, least recently used first
+        self._sum = None  # running sum of the last average slab
+        self._sum_range = None  # (lo, hi) of the running sum
+        self.configure(mode, thickness)
+
+    def configure(self, mode, thickness):
+        """
+        Change the projection mode and/or slab thickness.
+        Cached results are kept when they are still valid.
+        """
+        thickness = max(1, int(thickness))
+        block_size = max(2, int(round(math.sqrt(thickness))))
+        if mode != self.mode or block_size != self.block_size:
+            self._blocks.clear()  # block extrema depend on the mode and block size
+        self.mode = mode
+        self.thickness = thickness
+        self.block_size = block_size
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the cached block extrema and the running sum, in bytes.
+        """
+        total = sum(image.nbytes for image in self._blocks.values())
+        return total + (self._sum.nbytes if self._sum is not None else 0)
+
+    def invalidate(self):
+        """
+        Forget cached results (e.g. after more slices were decoded).
+        """
+        self._blocks.clear()
+        self._sum = None
+        self._sum_range = None
+
+    def slab_range(self, index):
+        """
+        Return the (lo, hi) slice range of the slab centered on a slice
+        (hi excluded), shifted to stay inside the volume.
+        """
+        count = self.volume.count()
+        lo = min(max(index - (self.thickness - 1) // 2, 0), max(count - self.thickness, 0))
+        return lo, min(lo + self.thickness, count)
+
+    def project(self, index):
+        """
+        Compute the projection of the slab centered on a slice.
+
+        Returns:
+        - numpy array (rows, columns) with the dtype of the volume
+        """
+        lo, hi = self.slab_range(index)
+        with perf.timed("slab"):
+            if self.mode == AVERAGE:
+                return self._average(lo, hi)
+            return self._extremum(lo, hi)
+
+    # -------------------------------
+    #   MIP / MinIP
+    # -------------------------------
+
+    def _reduce(self, lo, hi):
+        """Max (or min) of slices lo..hi-1."""
+        ufunc = np.maximum if self.mode == MIP else np.minimum
+        return ufunc.reduce(self.volume.pixels[lo:hi], axis=0)
+
+    def _block(self, block):
+        """Max (or min) of one block of slices, cached."""
+        image = self._blocks.get(block)
+        if image is None:
+            size = self.block_size
+            image = self._reduce(block * size, min((block + 1) * size, self.volume.count()))
+            self._blocks[block] = image
+            capacity = 2 * (self.thickness // size + 2)  # blocks of the slab and its neighbours
+            while len(self._blocks) > capacity:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(block)
+        return image
+
+    def _extremum(self, lo, hi):
+        """Max (or min) of slices lo..hi-1 from cached blocks and the slices at both ends."""
+        size = self.block_size
+        first_block = -(-lo // size)  # first block starting inside the slab
+        last_block = hi // size  # blocks before this one end inside the slab
+
+        parts = []
+        head_end = min(first_block * size, hi)
+        if lo < head_end:
+            parts.append(self._reduce(lo, head_end))
+        parts.extend(self._block(b) for b in range(first_block, last_block))
+        if last_block >= first_block and last_block * size < hi:
+            parts.append(self._reduce(last_block * size, hi))
+
+        ufunc = np.maximum if self.mode == MIP else np.minimum
+        result = parts[0].copy()  # cached blocks must not be modified
+        for part in parts[1:]:
+            ufunc(result, part, out=result)
+        return result
+
+    # -------------------------------
+    #   AVERAGE
+    # -------------------------------
+
+    def _average(self, lo, hi):
+        """Mean of slices lo..hi-1, updating the running sum of the previous slab."""
+        pixels = self.volume.pixels
+        accumulator = np.int64 if pixels.dtype.kind in "iu" else np.float64  # exact for integers
+
+        previous = self._sum_range
+        if previous is not None and lo < previous[1] and previous[0] < hi and \
+                abs(lo - previous[0]) + abs(hi - previous[1]) < hi - lo:
+            # Overlapping slab: add the slices that entered, subtract those that left
+            old_lo, old_hi = previous
+            if lo < old_lo:
+                self._sum += pixels[lo:old_lo].sum(axis=0, dtype=accumulator)
+            elif lo > old_lo:
+                self._sum -= pixels[old_lo:lo].sum(axis=0, dtype=accumulator)
+            if hi > old_hi:
+                self._sum += pixels[old_hi:hi].sum(axis=0, dtype=accumulator)
+            elif hi < old_hi:
+                self._sum -= pixels[hi:old_hi].sum(axis=0, dtype=accumulator)
+        else:
+            self._sum = pixels[lo:hi].sum(axis=0, dtype=accumulator)
+        self._sum_range = (lo, hi)
+
+        return np.rint(self._sum / (hi - lo)).astype(pixels.dtype)
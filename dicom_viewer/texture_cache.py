@@ -0,0 +1,120 @@
+# === dicom_viewer/texture_cache.py ===
+# This file defines a bounded LRU cache for slice textures.
+# Textures are created lazily by a factory function when a slice is displayed
+# or prefetched; the least recently used ones are dropped once the capacity
+# is reached, so GPU memory stays constant whatever the series length.
+# Dropped textures are recycled: the next slice is blitted into them in place
+# instead of allocating a new GPU texture.
+
+from collections import OrderedDict  # keeps insertion/usage order for LRU eviction
+
+BYTES_PER_PIXEL = {"luminance": 1, "luminance_alpha": 2, "rgb": 3, "rgba": 4}
+
+
+def texture_nbytes(tex):
+    """
+    Return the GPU memory used by a texture (width x height x bytes per pixel).
+    """
+    width, height = tex.size
+    return width * height * BYTES_PER_PIXEL.get(tex.colorfmt, 4)
+
+
+class TextureCache:
+    """
+    Least-recently-used cache of slice textures.
+
+    Responsibilities:
+    - Create textures on demand through a factory function
+    - Keep at most `capacity` textures alive
+    - Evict the least recently used texture when full
+    - Hand evicted textures back to the factory for reuse
+    """
+
+    def __init__(self, capacity, factory=None):
+        """
+        Initialize the cache.
+
+        Parameters:
+        - capacity: maximum number of textures kept alive
+        - factory: function(index, texture) returning the texture of a slice,
+          or None if the slice is not available yet (None results are not
+          cached); `texture` is a recycled texture to update in place, or None
+        """
+        self.capacity = max(1, capacity)
+        self.factory = factory
+        self._items = OrderedDict()  # index -> texture, least recently used first
+        self._free = []  # evicted textures waiting to be reused
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, index):
+        return index in self._items
+
+    @property
+    def nbytes(self):
+        """
+        GPU memory held by the cached and recycled textures, in bytes.
+        """
+        return sum(texture_nbytes(tex) for tex in list(self._items.values()) + self._free)
+
+    def get(self, index):
+        """
+        Return the texture of a slice, creating it if needed.
+
+        Parameters:
+        - index: slice index
+
+        Returns:
+        - the texture, or None if it could not be created yet
+        """
+        tex = self._items.get(index)
+        if tex is not None:
+            self._items.move_to_end(index)  # mark as most recently used
+            return tex
+
+        if self.factory is None:
+            return None
+        recycled = self._free.pop() if self._free else None
+        tex = self.factory(index, recycled)
+        if tex is not None:
+            self.put(index, tex)
+        elif recycled is not None:
+            self._free.append(recycled)  # slice not ready, keep the texture for later
+        return tex
+
+    def put(self, index, tex):
+        """
+        Store a texture, evicting the least recently used ones if needed.
+        """
+        self._items[index] = tex
+        self._items.move_to_end(index)
+        while len(self._items) > self.capacity:
+            _, old = self._items.popitem(last=False)  # drop the least recently used texture
+            self._recycle(old)
+
+    def discard(self, index):
+        """
+        Remove the texture of a slice (e.g. after its pixels changed).
+        """
+        self._items.pop(index, None)
+
+    def clear(self, recycle=False):
+        """
+        Drop every cached texture.
+
+        Parameters:
+        - recycle: keep the texture objects for reuse (e.g. when only the
+          window changed); False releases them (e.g. for a new series)
+        """
+        if recycle:
+            self._free.extend(self._items.values())
+            del self._free[self.capacity:]
+        else:
+            self._free.clear()
+        self._items.clear()
+
+    def _recycle(self, tex):
+        """Keep an evicted texture for reuse, without exceeding the capacity."""
+        if tex is not None and len(self._free) + len(self._items) <= self.capacity:
+            self._free.append(tex)
@@ -1,8 +1,10 @@
 # === dicom_viewer/texture_utils.py ===
-# This file contains helper functions to convert images from PIL format
-# into Kivy textures, which can be displayed in Kivy Image widgets.
+# This file contains helper functions to convert images (NumPy arrays or
+# PIL images) into Kivy textures, which can be displayed in Kivy Image widgets.
 
+import numpy as np  # pixel arrays
 from kivy.graphics.texture import Texture  # import Kivy Texture class
+from .instrumentation import perf  # per-stage timings
 
 def pil_to_texture(pil_image):
     """
@@ -31,3 +33,32 @@ def pil_to_texture(pil_image):
 
     # Return the Kivy texture so it can be displayed in the UI
     return tex
+
+
+def array_to_texture(arr, texture=None):
+    """
+    Copy a uint8 NumPy array into a Kivy Texture, without intermediate copies.
+
+    Parameters:
+    - arr: 2D uint8 numpy array (rows, columns), ideally C-contiguous
+    - texture: existing texture to update in place; a new texture is only
+      created if it is None or has another size
+
+    Returns:
+    - Kivy Texture object holding the image (the same object as `texture`
+      when it could be reused)
+    """
+
+    with perf.timed("texture"):
+        # No copy if the array is already contiguous uint8 (the normal case)
+        arr = np.ascontiguousarray(arr, dtype=np.uint8)
+        rows, columns = arr.shape
+
+        if texture is None or tuple(texture.size) != (columns, rows) or texture.colorfmt != 'luminance':
+            texture = Texture.create(size=(columns, rows), colorfmt='luminance')
+
+        # blit_buffer accepts any object implementing the buffer interface:
+        # the flat array view is uploaded directly from NumPy memory
+        texture.blit_buffer(arr.reshape(-1), colorfmt='luminance', bufferfmt='ubyte')
+    perf.add_bytes("texture", arr.nbytes)
+    return texture
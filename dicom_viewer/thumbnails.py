@@ -0,0 +1,280 @@
+# === dicom_viewer/thumbnails.py ===
+# This file creates small preview images of datasets: the middle slice of
+# the series, windowed with its default window and downsampled.
+# Thumbnails are stored as PNG files in the dataset cache folder, keyed by
+# the series fingerprint, so a modified dataset gets a new thumbnail.
+# ThumbnailLoader creates the missing ones on a background thread, decoding
+# only the middle slice of each series. Requests carry the fingerprint
+# recorded in the series index (see folder_browser.py), so a dataset
+# rescanned during the session gets a new thumbnail without its files
+# being listed again; unindexed datasets are fingerprinted by the thread.
+
+import glob  # find outdated thumbnails
+import os  # paths and atomic file replacement
+import queue  # results handed back to the main thread
+import threading  # background generation
+from collections import deque  # datasets waiting for a thumbnail
+from PIL import Image as PILImage
+from .image_processor import read_slice_pixels, render_slice
+from .series_index import SeriesIndex, dataset_cache_dir, series_fingerprint, open_temp_file, remove_temp_file
+from .series_loader import scan_series, group_series
+
+THUMBNAIL_SIZE = 128  # longest side in pixels
+THUMBNAIL_PREFIX = "thumbnail_"
+
+
+def thumbnail_path(cache_folder, dataset_folder, fingerprint):
+    """
+    Return the path of the thumbnail of a dataset for a given fingerprint.
+    """
+    folder = dataset_cache_dir(cache_folder, dataset_folder)
+    return os.path.join(folder, f"{THUMBNAIL_PREFIX}{fingerprint[:16]}.png")
+
+
+def find_thumbnail(cache_folder, dataset_folder, fingerprint=None):
+    """
+    Return the path of the thumbnail of a dataset if it is up to date.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - fingerprint: series_fingerprint of the dataset (computed if None)
+
+    Returns:
+    - path of the PNG file, or None if there is no valid thumbnail
+    """
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset_folder)
+    path = thumbnail_path(cache_folder, dataset_folder, fingerprint)
+    return path if os.path.isfile(path) else None
+
+
+def render_thumbnail(raw, info, size=THUMBNAIL_SIZE):
+    """
+    Render the thumbnail of a slice.
+
+    Parameters:
+    - raw: stored pixel values of the slice
+    - info: SliceInfo of the slice (default window and orientation)
+    - size: longest side of the thumbnail in pixels
+
+    Returns:
+    - PIL Image (grayscale)
+    """
+    image = PILImage.fromarray(render_slice(raw, info))
+    image.thumbnail((size, size), PILImage.BILINEAR)  # keeps the aspect ratio
+    return image
+
+
+def _write_thumbnail(image, path):
+    """
+    Write a thumbnail atomically and remove the older ones of the dataset.
+    The thumbnail thread, the viewer and precompute.py may write the same
+    thumbnail at once: each writes its own temporary file.
+    """
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f, tmp = open_temp_file(path, "wb")
+        with f:
+            image.save(f, format="PNG")
+        os.replace(tmp, path)
+        tmp = None
+        for old in glob.glob(os.path.join(os.path.dirname(path), THUMBNAIL_PREFIX + "*.png")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass  # removed by another writer
+        return path
+    except OSError as e:
+        print("Thumbnail write error:", path, e)
+        return None
+    finally:
+        remove_temp_file(tmp)
+
+
+def save_thumbnail(cache_folder, dataset_folder, volume, fingerprint=None, size=THUMBNAIL_SIZE):
+    """
+    Render the thumbnail of a series and write it to the dataset cache folder.
+    Thumbnails of older versions of the dataset are removed.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - volume: Volume whose middle slice is decoded
+    - fingerprint: series_fingerprint taken before the series was scanned
+      (computed now if None)
+    - size: longest side of the thumbnail in pixels
+
+    Returns:
+    - path of the written thumbnail, or None (middle slice not decoded)
+    """
+    index = volume.count() // 2
+    if volume.count() == 0 or not volume.is_loaded(index):
+        return None
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset_folder)
+
+    image = render_thumbnail(volume.get_slice(index), volume.slices[index], size)
+    return _write_thumbnail(image, thumbnail_path(cache_folder, dataset_folder, fingerprint))
+
+
+def _main_series(cache_folder, dataset_folder, fingerprint):
+    """
+    Return the sorted main series of a dataset: straight from its series
+    index when the index matches the fingerprint (no file is touched),
+    otherwise by scanning the folder (which updates the index).
+    """
+    index = SeriesIndex(cache_folder, dataset_folder).load()
+    if index.fingerprint == fingerprint:
+        series = group_series(index.all_slices())
+        return series[0] if series else []
+    return scan_series(dataset_folder, cache_folder)
+
+
+def make_thumbnail(cache_folder, dataset_folder, size=THUMBNAIL_SIZE, fingerprint=None):
+    """
+    Return the thumbnail of a dataset, creating it if needed.
+
+    Only the headers (taken from the series index when possible) and the
+    pixels of the middle slice are read.
+
+    Parameters:
+    - fingerprint: series_fingerprint of the dataset (computed if None)
+
+    Returns:
+    - path of the thumbnail, or None if the dataset has no readable slice
+    """
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset_folder)
+    path = find_thumbnail(cache_folder, dataset_folder, fingerprint)
+    if path is not None:
+        return path  # dataset unchanged since the thumbnail was made
+
+    slices = _main_series(cache_folder, dataset_folder, fingerprint)
+    if not slices:
+        return None
+    info = slices[len(slices) // 2]
+    image = render_thumbnail(read_slice_pixels(info), info, size)
+    return _write_thumbnail(image, thumbnail_path(cache_folder, dataset_folder, fingerprint))
+
+
+class ThumbnailLoader:
+    """
+    Create dataset thumbnails on a background thread.
+
+    Responsibilities:
+    - Queue datasets in request order (the list order, top first)
+    - Create or reuse each thumbnail once per dataset version (see make_thumbnail)
+    - Drop waiting requests when another folder is shown
+
+    Callbacks are only ever called from poll(), i.e. on the Kivy main thread.
+    """
+
+    def __init__(self, cache_folder, size=THUMBNAIL_SIZE):
+        """
+        Parameters:
+        - cache_folder: root cache folder
+        - size: longest side of the thumbnails in pixels
+        """
+        self.cache_folder = cache_folder
+        self.size = size
+        self._paths = {}  # (dataset, fingerprint) -> thumbnail path (None if it cannot be made)
+        self._fingerprints = {}  # dataset -> fingerprint of its latest thumbnail
+        self._pending = deque()  # datasets waiting, in request order
+        self._callbacks = {}  # dataset -> callback(dataset, path)
+        self._requested = {}  # dataset -> fingerprint given with its request (None: unknown)
+        self._cond = threading.Condition()  # protects the fields above, wakes the thread
+        self._results = queue.Queue()  # finished thumbnails, drained by poll()
+        self._thread = None
+
+    def cached(self, dataset):
+        """
+        Return the latest thumbnail path of a dataset if it was already made
+        ("" otherwise). It is checked again when the dataset is requested.
+        """
+        with self._cond:
+            return self._paths.get((dataset, self._fingerprints.get(dataset))) or ""
+
+    def request(self, dataset, callback, fingerprint=None):
+        """
+        Ask for the thumbnail of a dataset.
+
+        Parameters:
+        - dataset: path to the dataset folder
+        - callback: function(dataset, path) called from poll() when the
+          thumbnail is ready (path is None if it cannot be made); not
+          called again if the dataset did not change since the last request
+        - fingerprint: fingerprint of the dataset if already known (e.g.
+          from its series index); None: computed by the background thread
+        """
+        with self._cond:
+            if fingerprint is not None or dataset not in self._requested:
+                self._requested[dataset] = fingerprint
+            if dataset in self._callbacks:
+                return  # already waiting
+            self._callbacks[dataset] = callback
+            self._pending.append(dataset)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def clear_pending(self):
+        """
+        Forget the requests that have not started yet (e.g. another folder is shown).
+        """
+        with self._cond:
+            for dataset in self._pending:
+                self._callbacks.pop(dataset, None)
+                self._requested.pop(dataset, None)
+            self._pending.clear()
+
+    def poll(self, *args):
+        """
+        Deliver finished thumbnails by calling their callbacks.
+        Accepts (and ignores) the dt argument of a Kivy Clock callback.
+        """
+        while True:
+            try:
+                callback, dataset, path = self._results.get_nowait()
+            except queue.Empty:
+                return True
+            callback(dataset, path)
+
+    def _run(self):
+        """Background thread: make the requested thumbnails one at a time."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                dataset = self._pending.popleft()
+                fingerprint = self._requested.pop(dataset, None)
+
+            if fingerprint is None:
+                try:
+                    fingerprint = series_fingerprint(dataset)  # not indexed yet: list its files
+                except OSError as e:
+                    print("Thumbnail error:", dataset, e)
+
+            with self._cond:
+                key = (dataset, fingerprint)
+                known = key in self._paths
+                path = self._paths.get(key)
+            if fingerprint is not None and not known:
+                try:
+                    path = make_thumbnail(self.cache_folder, dataset, self.size, fingerprint)
+                except Exception as e:
+                    print("Thumbnail error:", dataset, e)
+                    path = None
+
+            with self._cond:
+                previous = self._fingerprints.get(dataset)
+                if previous != fingerprint:
+                    self._paths.pop((dataset, previous), None)  # older version of the dataset
+                self._paths[key] = path
+                self._fingerprints[dataset] = fingerprint
+                callback = self._callbacks.pop(dataset, None)
+            if callback is not None and not known:
+                self._results.put((callback, dataset, path))
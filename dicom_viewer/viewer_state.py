@@ -1,47 +1,128 @@
 # === dicom_viewer/viewer_state.py ===
 # This file defines a class to keep track of the current DICOM series
-# and the currently displayed slice. Essentially, it stores all images
-# (as Kivy textures) and provides methods to navigate through them.
+# and the currently displayed slice. The series pixels are stored in a
+# Volume; the state navigates slice indices into it and creates the Kivy
+# textures lazily through a bounded LRU cache, prefetching the slices
+# around the current one in the scrolling direction.
+# The slices can be those of the acquired plane or of a reformat (see mpr.py).
+
+from .texture_cache import TextureCache  # bounded LRU cache of slice textures
+from .mpr import AXIAL, view_length  # displayed plane
+
+DEFAULT_TEXTURE_CACHE_SIZE = 64  # textures kept alive at most
+DEFAULT_PREFETCH_SLICES = 8  # slices prefetched ahead in the scrolling direction
+
 
 class ViewerState:
     """
     Class to manage the state of the DICOM viewer.
 
     Responsibilities:
-    - Store all loaded image textures
-    - Keep track of the currently displayed slice
+    - Store the Volume of the loaded series
+    - Create display textures lazily (bounded LRU cache)
+    - Keep track of the currently displayed slice and scrolling direction
     - Provide methods to navigate through slices
     """
 
-    def __init__(self):
+    def __init__(self, texture_factory=None, cache_size=DEFAULT_TEXTURE_CACHE_SIZE,
+                 prefetch=DEFAULT_PREFETCH_SLICES):
         """
         Initialize the ViewerState object.
 
+        Parameters:
+        - texture_factory: function(volume, index, texture) creating the
+          texture of a slice (updating `texture` in place when it is not None),
+          returning None if the slice is not decoded yet
+        - cache_size: maximum number of textures kept alive
+        - prefetch: number of slices prefetched ahead of the current one
+
         Attributes:
-        - images: list of Kivy textures representing each DICOM slice
+        - volume: Volume holding the series pixels (None until a series is loaded)
+        - textures: TextureCache of the display textures
         - current_index: integer index of the currently displayed image
+        - direction: +1 or -1, last scrolling direction
+        - window: (center, width) chosen by the user, None for the DICOM default
+        - view: displayed plane (mpr.AXIAL, CORONAL or SAGITTAL); indices
+          are slice indices in that plane
         """
-        self.images = []  # empty list to store image textures
+        self.volume = None  # no series loaded yet
+        self.texture_factory = texture_factory
+        # keep room for the prefetch window on both sides of the current slice
+        self.prefetch = max(0, min(prefetch, (cache_size - 1) * 2 // 3))
+        self.textures = TextureCache(cache_size, self._create_texture)
         self.current_index = 0  # start at the first slice by default
+        self.direction = 1  # scrolling towards higher indices by default
+        self.window = None  # use the window stored in the DICOM files
+        self.view = AXIAL  # acquired slices
 
     def reset(self):
         """
         Reset the viewer state.
 
-        Clears all loaded images and sets the current index back to 0.
+        Clears the loaded series and sets the current index back to 0.
         Useful when loading a new DICOM series.
         """
-        self.images.clear()  # remove all textures from the list
+        self.volume = None  # release the series pixels
+        self.textures.clear()  # remove all textures
         self.current_index = 0  # reset the current slice index
+        self.direction = 1
+        self.window = None
+        self.view = AXIAL
+
+    def set_volume(self, volume):
+        """
+        Use a new Volume and go back to the first slice.
+
+        Parameters:
+        - volume: Volume of the series to display
+        """
+        self.volume = volume
+        self.textures.clear()
+        self.current_index = 0
+        self.direction = 1
+        self.window = None
+        self.view = AXIAL
+
+    def set_view(self, view):
+        """
+        Display another plane, starting at its middle slice.
+
+        Parameters:
+        - view: mpr.AXIAL, CORONAL or SAGITTAL
+        """
+        if view == self.view:
+            return
+        self.view = view
+        self.textures.clear(recycle=True)
+        self.current_index = self.count() // 2
+        self.direction = 1
+
+    def set_window(self, window, rerender=True):
+        """
+        Change the display window.
+
+        Parameters:
+        - window: (center, width), or None to go back to the DICOM default
+        - rerender: False if the textures do not depend on the window
+          (windowing done on the GPU)
+
+        Cached textures are dropped; only the displayed and prefetched
+        slices are rendered again.
+        """
+        if window == self.window:
+            return
+        self.window = window
+        if rerender:
+            self.textures.clear(recycle=True)  # same sizes: textures are re-blitted in place
 
     def count(self):
         """
-        Return the number of loaded images.
+        Return the number of slices in the series.
 
         Returns:
-        - Integer count of images in self.images
+        - Integer count of slices in the displayed plane (0 if no series is loaded)
         """
-        return len(self.images)  # simply return the length of the images list
+        return view_length(self.volume, self.view)
 
     def set_index(self, index):
         """
@@ -56,7 +137,9 @@ class ViewerState:
 
         This ensures the viewer does not go beyond first/last slice.
         """
-        if 0 <= index < len(self.images):  # check if index is within valid range
+        if 0 <= index < self.count():  # check if index is within valid range
+            if index != self.current_index:
+                self.direction = 1 if index > self.current_index else -1  # remember scrolling direction
             self.current_index = index  # update current_index
             return True  # indicate success
         return False  # index was invalid, do not update
@@ -67,10 +150,45 @@ class ViewerState:
 
         Returns:
         - Kivy Texture object of the current image
-        - None if no images are loaded
+        - None if no images are loaded or the slice is not decoded yet
 
         This is used by DicomScreen to update the displayed image.
         """
-        if self.images:  # check if there are any loaded images
-            return self.images[self.current_index]  # return the texture at current_index
-        return None  # no images loaded, return None
+        return self.textures.get(self.current_index)  # created on demand, None if not decoded yet
+
+    def prefetch_indices(self):
+        """
+        Return the slice indices worth preparing around the current slice.
+
+        Returns:
+        - List of indices, nearest first: `prefetch` slices ahead in the
+          scrolling direction and half as many behind
+        """
+        ahead = [self.current_index + self.direction * k for k in range(1, self.prefetch + 1)]
+        behind = [self.current_index - self.direction * k for k in range(1, self.prefetch // 2 + 1)]
+
+        # interleave so the nearest slices come first, ahead before behind
+        order = []
+        for k in range(self.prefetch):
+            order.append(ahead[k])
+            if k < len(behind):
+                order.append(behind[k])
+        return [i for i in order if 0 <= i < self.count()]
+
+    def prefetch_next(self):
+        """
+        Create the texture of the next missing slice of the prefetch window.
+
+        Returns:
+        - True if a texture was created, False if nothing is left to prefetch
+        """
+        for index in self.prefetch_indices():
+            if index not in self.textures and self.textures.get(index) is not None:
+                return True
+        return False
+
+    def _create_texture(self, index, texture):
+        """Texture factory used by the cache (None if no series or factory)."""
+        if self.volume is None or self.texture_factory is None:
+            return None
+        return self.texture_factory(self.volume, index, texture)
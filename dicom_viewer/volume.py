@@ -0,0 +1,219 @@
+# === dicom_viewer/volume.py ===
+# This file defines the Volume class, which holds a whole DICOM series as one
+# contiguous 3D NumPy array of stored pixel values (native int16/uint16),
+# together with the per-slice header information (geometry, rescale, window).
+# Display images are derived from it, so the raw data is never thrown away.
+# Large series can also keep a low-resolution level (preview), filled first
+# so the whole stack can be browsed while full-resolution slices load.
+
+from collections import Counter  # find the most common matrix size
+import numpy as np
+from .image_processor import read_slice_pixels, native_dtype, block_average
+
+PREVIEW_FACTOR = 4  # the preview level is 1/PREVIEW_FACTOR of the matrix size
+PREVIEW_MIN_SIZE = 1024  # only matrices at least this large get a preview level
+
+
+def volume_layout(slices):
+    """
+    Choose the matrix size and dtype of the volume of a series.
+
+    Parameters:
+    - slices: list of SliceInfo
+
+    Returns:
+    - (rows, columns, dtype): the most common matrix size (slices with
+      another size are rejected in Volume.load_slice) and one dtype able to
+      hold the stored values of every slice (int16 for most CT)
+    """
+    sizes = Counter((s.rows, s.columns) for s in slices)
+    rows, columns = sizes.most_common(1)[0][0] if sizes else (0, 0)
+    dtypes = [native_dtype(s) for s in slices]
+    dtype = np.result_type(*dtypes) if dtypes else np.dtype(np.int16)
+    return rows, columns, dtype
+
+
+class Volume:
+    """
+    A DICOM series stored as one (slices, rows, columns) array.
+
+    Responsibilities:
+    - Allocate the pixel array once for the whole series
+    - Fill slices as they are decoded (possibly from several threads)
+    - Expose the stored values and the per-slice metadata
+    """
+
+    def __init__(self, slices, pixels=None, decoded=True):
+        """
+        Initialize the Volume and allocate its pixel array.
+
+        Parameters:
+        - slices: list of SliceInfo, already sorted (cranial → caudal)
+        - pixels: optional array (count, rows, columns) holding every slice
+          already decoded (e.g. a memory-mapped volume cache); nothing is
+          allocated in that case
+        - decoded: False if `pixels` is an empty buffer that is still to be
+          filled (e.g. shared memory written by decoding processes)
+
+        Attributes:
+        - slices: the SliceInfo of each slice (geometry, rescale, window)
+        - pixels: numpy array (count, rows, columns) with stored pixel values
+        - loaded: boolean numpy array, True for slices already decoded
+        - rescale_slopes / rescale_intercepts: per-slice modality rescale
+        - buffer_owner: object owning the memory of `pixels` (e.g. a shared
+          memory block), kept alive as long as the volume
+        - preview: low-resolution level (count, rows // f, columns // f),
+          None until enable_preview() is called
+        - preview_loaded: boolean numpy array, True for slices with a preview
+        """
+        self.slices = list(slices)
+        self.buffer_owner = None
+        self.preview = None
+        self.preview_loaded = None
+        self.preview_factor = 1
+
+        if pixels is not None:
+            self.rows, self.columns = pixels.shape[1:]
+            self.pixels = pixels
+            self.loaded = np.full(len(self.slices), decoded, dtype=bool)
+            self._init_rescale()
+            return
+
+        self.rows, self.columns, dtype = volume_layout(self.slices)
+        self.pixels = np.zeros((len(self.slices), self.rows, self.columns), dtype=dtype)
+        self.loaded = np.zeros(len(self.slices), dtype=bool)
+        self._init_rescale()
+
+    def _init_rescale(self):
+        """Collect the per-slice rescale values."""
+        self.rescale_slopes = np.array([s.rescale_slope for s in self.slices], dtype=np.float32)
+        self.rescale_intercepts = np.array([s.rescale_intercept for s in self.slices], dtype=np.float32)
+
+    @property
+    def is_complete(self):
+        """
+        True once every slice has been decoded.
+        """
+        return bool(self.loaded.all())
+
+    def count(self):
+        """
+        Return the number of slices in the volume.
+        """
+        return len(self.slices)
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the pixel array, in bytes.
+        """
+        return self.pixels.nbytes
+
+    def load_slice(self, index):
+        """
+        Decode one slice from its file into the pixel array.
+
+        Parameters:
+        - index: slice index
+
+        Returns:
+        - the stored values of the slice (a view into self.pixels)
+
+        Raises ValueError if the slice does not match the volume matrix size.
+        """
+        raw = read_slice_pixels(self.slices[index])
+        if raw.shape != (self.rows, self.columns):
+            raise ValueError(f"Slice shape {raw.shape} does not match volume "
+                             f"({self.rows}, {self.columns})")
+        self.pixels[index] = raw
+        self.loaded[index] = True
+        self.update_preview(index)
+        return self.pixels[index]
+
+    def get_slice(self, index):
+        """
+        Return the stored values of a slice (a view, no copy).
+        """
+        return self.pixels[index]
+
+    def is_loaded(self, index):
+        """
+        True if the slice has been decoded.
+        """
+        return bool(self.loaded[index])
+
+    def enable_preview(self, factor=PREVIEW_FACTOR, min_size=PREVIEW_MIN_SIZE):
+        """
+        Allocate the low-resolution level of a large series.
+
+        Parameters:
+        - factor: reduction factor of the preview level
+        - min_size: smallest matrix side (rows or columns) getting a preview
+
+        Returns:
+        - True if the preview level is used (False for small matrices)
+        """
+        if factor < 2 or max(self.rows, self.columns) < min_size:
+            return False
+        self.preview_factor = factor
+        self.preview = np.zeros((self.count(), self.rows // factor, self.columns // factor),
+                                dtype=self.pixels.dtype)
+        self.preview_loaded = np.zeros(self.count(), dtype=bool)
+        return True
+
+    def drop_preview(self):
+        """
+        Free the preview level (e.g. to stay within the memory budget).
+        Slices without their full resolution are then not shown until decoded.
+        """
+        self.preview = None
+        self.preview_loaded = None
+
+    # The preview level may be dropped by another thread at any time:
+    # the methods below work on local references to it.
+
+    def set_preview(self, index, small):
+        """
+        Store the low-resolution version of a slice (e.g. decoded at reduced
+        resolution, see image_processor.read_slice_preview).
+        Ignored once the preview level was dropped.
+
+        Raises ValueError if it does not match the preview level size.
+        """
+        preview, loaded = self.preview, self.preview_loaded
+        if preview is None or loaded is None:
+            return
+        if small.shape != preview.shape[1:]:
+            raise ValueError(f"Preview shape {small.shape} does not match "
+                             f"{preview.shape[1:]}")
+        preview[index] = small
+        loaded[index] = True
+
+    def update_preview(self, index):
+        """
+        Compute the preview of a decoded slice by block averaging
+        (no-op without a preview level).
+        """
+        preview, loaded = self.preview, self.preview_loaded
+        if preview is not None and loaded is not None:
+            preview[index] = block_average(self.pixels[index], self.preview_factor)
+            loaded[index] = True
+
+    def has_preview(self, index):
+        """
+        True if a low-resolution version of the slice is available.
+        """
+        loaded = self.preview_loaded
+        return loaded is not None and bool(loaded[index])
+
+    def best_slice(self, index):
+        """
+        Return the best version of a slice available now: the full
+        resolution once decoded, else its preview, else None.
+        """
+        if self.loaded[index]:
+            return self.pixels[index]
+        preview, loaded = self.preview, self.preview_loaded
+        if preview is not None and loaded is not None and loaded[index]:
+            return preview[index]
+        return None
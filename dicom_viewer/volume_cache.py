@@ -0,0 +1,182 @@
+# === dicom_viewer/volume_cache.py ===
+# This file stores decoded series on disk as a raw .npy volume plus a small
+# JSON sidecar (slice headers and a fingerprint of the source files).
+# Reopening a cached series maps the .npy file with numpy memmap: nothing is
+# decoded, and only the pages of the slices actually viewed are read.
+# The main series of a dataset is cached as volume.npy; other series of a
+# multi-series folder get a file named after a hash of their series_id.
+
+import hashlib  # cache file names of the other series
+import json  # sidecar format
+import os  # paths and atomic file replacement
+import numpy as np
+from .dicom_header import SliceInfo
+from .series_index import dataset_cache_dir, series_fingerprint, open_temp_file, remove_temp_file
+from .volume import Volume, volume_layout
+
+VOLUME_CACHE_VERSION = 3  # bump when the cache layout changes
+VOLUME_FILE = "volume.npy"
+SIDECAR_FILE = "volume.json"
+SPILL_FILE = "spill.npy"  # decoding buffer of volumes too large for the memory budget
+
+
+def _cache_paths(cache_folder, dataset_folder, series=None):
+    """Return the (volume, sidecar) paths of a series of a dataset (None: main series)."""
+    folder = dataset_cache_dir(cache_folder, dataset_folder)
+    if series is None:
+        return os.path.join(folder, VOLUME_FILE), os.path.join(folder, SIDECAR_FILE)
+    key = hashlib.sha1(series.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(folder, f"volume_{key}.npy"), os.path.join(folder, f"volume_{key}.json")
+
+
+def read_cache_sidecar(cache_folder, dataset_folder, fingerprint=None, series=None):
+    """
+    Read the sidecar of a cached volume if it is still valid.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - fingerprint: series_fingerprint of the dataset (computed if None)
+    - series: series_id of the series (None: the main series)
+
+    Returns:
+    - the sidecar dictionary, or None if there is no valid cache
+    """
+    volume_path, sidecar_path = _cache_paths(cache_folder, dataset_folder, series)
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if sidecar.get("version") != VOLUME_CACHE_VERSION or not os.path.isfile(volume_path):
+        return None
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset_folder)
+    if sidecar.get("fingerprint") != fingerprint:
+        return None  # files were added, removed or modified since the cache was written
+    return sidecar
+
+
+def open_cached_volume(cache_folder, dataset_folder, fingerprint=None, series=None):
+    """
+    Open a previously cached volume as a read-only memory map.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - fingerprint: series_fingerprint of the dataset (computed if None)
+    - series: series_id of the series (None: the main series)
+
+    Returns:
+    - Volume backed by the memory-mapped .npy file, or None if there is
+      no valid cache (missing, outdated or unreadable)
+    """
+    sidecar = read_cache_sidecar(cache_folder, dataset_folder, fingerprint, series)
+    if sidecar is None:
+        return None
+
+    volume_path, _ = _cache_paths(cache_folder, dataset_folder, series)
+    try:
+        pixels = np.load(volume_path, mmap_mode="r")  # no pixel is read until accessed
+    except (OSError, ValueError) as e:
+        print("Volume cache read error:", volume_path, e)
+        return None
+
+    slices = []
+    for data in sidecar["slices"]:
+        info = SliceInfo.from_dict(data)
+        info.path = os.path.join(dataset_folder, os.path.basename(info.path))
+        slices.append(info)
+
+    if pixels.ndim != 3 or pixels.shape[0] != len(slices):
+        return None
+    return Volume(slices, pixels=pixels)
+
+
+def save_volume_cache(cache_folder, dataset_folder, volume, fingerprint=None, series=None):
+    """
+    Write a fully decoded volume to the cache.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - volume: Volume with every slice decoded
+    - fingerprint: series_fingerprint taken before the series was scanned
+      (computed now if None)
+    - series: series_id of the series (None: the main series)
+
+    Returns:
+    - True if the cache was written
+    """
+    if not volume.is_complete or volume.count() == 0:
+        return False  # never cache a partially decoded series
+
+    volume_path, sidecar_path = _cache_paths(cache_folder, dataset_folder, series)
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset_folder)
+
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(volume_path), exist_ok=True)
+
+        # Write to uniquely named temporary files, then replace: an interrupted write
+        # never leaves a broken cache, and two loaders saving the same dataset
+        # (preload and viewer) never write into the same file
+        f, tmp = open_temp_file(volume_path, "wb")
+        with f:
+            np.save(f, np.ascontiguousarray(volume.pixels))
+        try:
+            os.remove(sidecar_path)  # invalidate the old cache before replacing its volume
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, volume_path)
+        tmp = None
+
+        # Sidecar last, once the volume is in place: it marks the cache valid
+        f, tmp = open_temp_file(sidecar_path, "w", encoding="utf-8")
+        with f:
+            json.dump({
+                "version": VOLUME_CACHE_VERSION,
+                "folder": os.path.abspath(dataset_folder),
+                "fingerprint": fingerprint,
+                "shape": list(volume.pixels.shape),
+                "dtype": volume.pixels.dtype.str,
+                "slices": [info.to_dict() for info in volume.slices],
+            }, f)
+        os.replace(tmp, sidecar_path)
+        tmp = None
+        return True
+    except OSError as e:
+        print("Volume cache write error:", volume_path, e)
+        return False
+    finally:
+        remove_temp_file(tmp)
+
+
+def create_spilled_volume(cache_folder, dataset_folder, slices):
+    """
+    Allocate a Volume whose pixels live in a memory-mapped file of the
+    dataset cache folder instead of RAM, for series larger than the memory
+    budget: the OS writes decoded pages back to the file instead of
+    swapping, and reads them again on demand.
+
+    Parameters:
+    - cache_folder: root cache folder
+    - dataset_folder: path to the dataset folder
+    - slices: sorted list of SliceInfo
+
+    Returns:
+    - empty Volume (slices are decoded into it as usual)
+
+    Raises OSError if the file cannot be created.
+    """
+    rows, columns, dtype = volume_layout(slices)
+    path = os.path.join(dataset_cache_dir(cache_folder, dataset_folder), SPILL_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pixels = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(len(slices), rows, columns))
+    try:
+        os.remove(path)  # the mapping stays valid; the file disappears with it (POSIX)
+    except OSError:
+        pass  # still mapped (Windows): overwritten by the next spilled volume
+    return Volume(slices, pixels=pixels, decoded=False)
@@ -5,13 +5,18 @@
 
 import os
 import sys
+import multiprocessing
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.lang import Builder
 from kivy.uix.screenmanager import ScreenManager, NoTransition
 
-from config import DATA_FOLDER
+from config import DATA_FOLDER, PERF_STATS, PERF_LOG, MEMORY_BUDGET
 from screens.main_screen import MainScreen
 from screens.dicom_screen import DicomScreen
+from dicom_viewer.process_decoder import shutdown_process_pool
+from dicom_viewer.instrumentation import perf
+from dicom_viewer.memory_budget import memory
 
 
 def resource_path(relative_path):
@@ -63,6 +68,13 @@ class RadTrainer(App):
         # Initialize selected_file to empty
         self.selected_file = ""
 
+        # Per-stage timings (can also be turned on from the viewer)
+        perf.enabled = PERF_STATS
+
+        # Shared memory budget of the loaders and the viewer
+        memory.limit = MEMORY_BUDGET
+        memory.scheduler = lambda callback: Clock.schedule_once(lambda dt: callback())  # releases on the main thread
+
         # Create ScreenManager
         sm = ScreenManager(transition=NoTransition())
         sm.add_widget(MainScreen(name="main"))
@@ -70,9 +82,20 @@ class RadTrainer(App):
 
         return sm
 
+    def on_stop(self):
+        """
+        Kivy calls this method when the application closes.
+        Stops the decoding processes, if any were started, and writes the
+        timing statistics if they were collected.
+        """
+        shutdown_process_pool()
+        if perf.enabled:
+            perf.dump_json(PERF_LOG)
+
 
 # -------------------------------
 #   START THE APPLICATION
 # -------------------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # decoding processes in PyInstaller builds
     RadTrainer().run()
@@ -0,0 +1,284 @@
+# === precompute.py ===
+# Headless command that warms the caches of every dataset under DATA_FOLDER
+# (same 2-level Folder/Dataset layout as the main screen), so opening a
+# dataset in the viewer is instant: series index, decoded volume cache and
+# thumbnail. Datasets are processed in parallel, one per process.
+#
+# Every cache file is written atomically, so the command can be interrupted
+# and simply run again: datasets whose caches are still valid are skipped.
+# The result of each dataset is recorded in its cache folder (precompute.json),
+# so datasets with undecodable slices, which never get a volume cache, are
+# skipped too as long as their files do not change.
+#
+# Usage:
+#   python precompute.py
+#   python precompute.py --processes 4 --no-volumes --json precompute.json
+
+import argparse  # command line options
+import json  # optional report file
+import multiprocessing  # freeze_support for PyInstaller builds
+import os  # walk the data folder
+import time  # per-dataset timing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import DATA_FOLDER, CACHE_FOLDER, VOLUME_CACHE, DECODE_PROCESSES
+from dicom_viewer.dicom_header import is_dicom_file_name, has_dicom_preamble
+from dicom_viewer.series_index import (SeriesIndex, series_fingerprint, dataset_cache_dir,
+                                       open_temp_file, remove_temp_file)
+from dicom_viewer.series_loader import scan_series
+from dicom_viewer.volume import Volume
+from dicom_viewer.volume_cache import read_cache_sidecar, open_cached_volume, save_volume_cache
+from dicom_viewer.thumbnails import find_thumbnail, save_thumbnail
+
+STATE_FILE = "precompute.json"  # result of the last run for a dataset
+
+
+def _is_dataset(path):
+    """True if the folder directly contains at least one DICOM file (stops at the first one)."""
+    try:
+        with os.scandir(path) as it:
+            return any(is_dicom_file_name(e.name) and e.is_file() and has_dicom_preamble(e.path) for e in it)
+    except OSError:
+        return False
+
+
+def find_datasets(root_folder):
+    """
+    List the dataset folders of DATA_FOLDER (DATA_FOLDER/Folder/Dataset).
+
+    Returns:
+    - sorted list of dataset folder paths
+    """
+    datasets = []
+    with os.scandir(root_folder) as folders:
+        for folder in folders:
+            if not folder.is_dir():
+                continue
+            with os.scandir(folder.path) as entries:
+                for entry in entries:
+                    if entry.is_dir() and _is_dataset(entry.path):
+                        datasets.append(entry.path)
+    return sorted(datasets)
+
+
+def _state_path(cache_folder, dataset):
+    """Return the path of the precompute state of a dataset."""
+    return os.path.join(dataset_cache_dir(cache_folder, dataset), STATE_FILE)
+
+
+def read_state(cache_folder, dataset, fingerprint):
+    """
+    Return the result recorded by the last run for a dataset, or None if
+    there is none or the files changed since (other fingerprint).
+    """
+    try:
+        with open(_state_path(cache_folder, dataset), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("fingerprint") == fingerprint else None
+
+
+def write_state(cache_folder, dataset, fingerprint, result, volumes, thumbnails):
+    """
+    Record the result of a dataset (status, slice and failure counts, and
+    which caches were requested), written atomically.
+    """
+    path = _state_path(cache_folder, dataset)
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f, tmp = open_temp_file(path, "w", encoding="utf-8")
+        with f:
+            json.dump({
+                "fingerprint": fingerprint,
+                "status": result["status"],
+                "slices": result["slices"],
+                "failed": result["failed"],
+                "volumes": volumes,
+                "thumbnails": thumbnails,
+            }, f)
+        os.replace(tmp, path)
+        tmp = None
+    except OSError as e:
+        print("State write error:", path, e)
+    finally:
+        remove_temp_file(tmp)
+
+
+def cached_result(dataset, cache_folder, volumes=True, thumbnails=True, fingerprint=None):
+    """
+    Return the result of a dataset whose caches are up to date, without
+    building anything, or None if they must be built.
+
+    Complete datasets are checked against their caches (the slice count comes
+    from the volume cache sidecar). Datasets recorded as "partial" (some
+    slices cannot be decoded, so no volume cache is written) or "empty" are
+    skipped while their files are unchanged and the requested caches were
+    already attempted.
+    """
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset)
+    state = read_state(cache_folder, dataset, fingerprint)
+    result = {"dataset": dataset, "status": "cached", "slices": 0, "failed": 0}
+
+    if cache_is_valid(dataset, cache_folder, volumes, thumbnails, fingerprint):
+        sidecar = read_cache_sidecar(cache_folder, dataset, fingerprint) if volumes else None
+        if sidecar is not None:
+            result["slices"] = len(sidecar["slices"])
+        elif state is not None:
+            result["slices"] = state["slices"]
+        return result
+
+    if state is None or state["status"] not in ("partial", "empty"):
+        return None
+    if not os.path.isfile(SeriesIndex(cache_folder, dataset).path):
+        return None
+    if (volumes and not state["volumes"]) or (thumbnails and not state["thumbnails"]):
+        return None  # a cache that was not requested last time is wanted now
+    result.update(slices=state["slices"], failed=state["failed"])
+    return result
+
+
+def cache_is_valid(dataset, cache_folder, volumes=True, thumbnails=True, fingerprint=None):
+    """
+    True if every requested cache of a dataset is up to date.
+    """
+    if fingerprint is None:
+        fingerprint = series_fingerprint(dataset)
+    if not os.path.isfile(SeriesIndex(cache_folder, dataset).path):
+        return False
+    if volumes and read_cache_sidecar(cache_folder, dataset, fingerprint) is None:
+        return False
+    if thumbnails and find_thumbnail(cache_folder, dataset, fingerprint) is None:
+        return False
+    return True
+
+
+def precompute_dataset(dataset, cache_folder, volumes=True, thumbnails=True, force=False):
+    """
+    Build the caches of one dataset (runs in a worker process).
+
+    Parameters:
+    - dataset: path to the dataset folder
+    - cache_folder: root cache folder
+    - volumes: write the decoded volume cache
+    - thumbnails: write the thumbnail
+    - force: rebuild even if the caches are valid
+
+    Returns:
+    - dictionary with the dataset path, status ("cached", "built",
+      "partial" or "empty"), slice count, failed slices and duration
+    """
+    start = time.perf_counter()
+    fingerprint = series_fingerprint(dataset)
+    result = {"dataset": dataset, "slices": 0, "failed": 0}
+
+    if not force:
+        cached = cached_result(dataset, cache_folder, volumes, thumbnails, fingerprint)
+        if cached is not None:
+            cached["seconds"] = time.perf_counter() - start
+            return cached
+
+    if not force and volumes and thumbnails:
+        volume = open_cached_volume(cache_folder, dataset, fingerprint)
+        if volume is not None:
+            # Only the thumbnail is missing: render it from the memory-mapped volume
+            save_thumbnail(cache_folder, dataset, volume, fingerprint)
+            result.update(status="built", slices=volume.count(), seconds=time.perf_counter() - start)
+            write_state(cache_folder, dataset, fingerprint, result, volumes, thumbnails)
+            return result
+
+    slices = scan_series(dataset, cache_folder)  # main series; builds the series index
+    volume = Volume(slices)
+    result["slices"] = len(slices)
+
+    # Without the volume cache only the middle slice is needed (for the thumbnail)
+    if volumes:
+        indices = range(len(slices))
+    else:
+        indices = [len(slices) // 2] if slices and thumbnails else []
+
+    for i in indices:
+        try:
+            volume.load_slice(i)
+        except Exception as e:
+            print("Image error:", slices[i].path, e)
+            result["failed"] += 1
+
+    if volumes:
+        save_volume_cache(cache_folder, dataset, volume, fingerprint)  # only if every slice decoded
+    if thumbnails:
+        save_thumbnail(cache_folder, dataset, volume, fingerprint)
+
+    if not slices:
+        result["status"] = "empty"
+    else:
+        result["status"] = "partial" if result["failed"] else "built"
+    result["seconds"] = time.perf_counter() - start
+    write_state(cache_folder, dataset, fingerprint, result, volumes, thumbnails)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the RadTrainer caches of every dataset.")
+    parser.add_argument("--data-folder", default=DATA_FOLDER, help="root data folder (default: config.DATA_FOLDER)")
+    parser.add_argument("--cache-folder", default=CACHE_FOLDER, help="cache folder (default: config.CACHE_FOLDER)")
+    parser.add_argument("--processes", type=int, default=DECODE_PROCESSES, help="datasets processed in parallel")
+    parser.add_argument("--no-volumes", action="store_true", help="do not write decoded volume caches")
+    parser.add_argument("--no-thumbnails", action="store_true", help="do not write thumbnails")
+    parser.add_argument("--force", action="store_true", help="rebuild caches that are still valid")
+    parser.add_argument("--json", help="write the per-dataset report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.data_folder):
+        print("DATA_FOLDER not found:", args.data_folder)
+        return 1
+
+    volumes = VOLUME_CACHE and not args.no_volumes
+    thumbnails = not args.no_thumbnails
+    datasets = find_datasets(args.data_folder)
+    print(f"{len(datasets)} datasets in {args.data_folder}")
+
+    start = time.perf_counter()
+    results = []
+    pool = ProcessPoolExecutor(max_workers=max(1, args.processes))
+    try:
+        futures = {pool.submit(precompute_dataset, d, args.cache_folder, volumes, thumbnails, args.force): d
+                   for d in datasets}
+        for future in as_completed(futures):
+            dataset = futures[future]
+            try:
+                r = future.result()
+            except Exception as e:
+                r = {"dataset": dataset, "status": "error", "error": str(e), "slices": 0, "failed": 0, "seconds": None}
+            results.append(r)
+
+            name = os.path.relpath(dataset, args.data_folder)
+            seconds = f"{r['seconds']:.1f} s" if r["seconds"] is not None else "-"
+            detail = f", {r['failed']} failed" if r["failed"] else ""
+            if "error" in r:
+                detail = f" ({r['error']})"
+            print(f"[{len(results)}/{len(datasets)}] {name}: {r['status']}, "
+                  f"{r['slices']} slices, {seconds}{detail}")
+    except KeyboardInterrupt:
+        print("Interrupted: run the command again to resume (finished datasets are skipped).")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return 1
+    pool.shutdown()
+
+    total = time.perf_counter() - start
+    built = sum(r["status"] in ("built", "partial") for r in results)
+    print(f"Done in {total:.1f} s: {built} built, "
+          f"{sum(r['status'] == 'cached' for r in results)} already cached, "
+          f"{sum(r['status'] == 'error' for r in results)} errors")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seconds": total, "datasets": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    raise SystemExit(main())
@@ -1,15 +1,27 @@
 # === screens/dicom_screen.py ===
 
 import os  # import the OS module for file/folder operations
+import time  # loading throughput shown in the stats overlay
 from kivy.app import App  # import App class to access the running app
+from kivy.clock import Clock  # schedule loader polling on the main thread
 from kivy.uix.screenmanager import Screen  # import Screen to create Kivy screens
+from config import (CACHE_FOLDER, VOLUME_CACHE, TEXTURE_CACHE_SIZE, PREFETCH_SLICES, DECODE_PROCESSES,
+                    GPU_WINDOWING, PROGRESSIVE_PREVIEW, CINE_FPS, SESSION_CACHE_SIZE, PERF_STATS)  # settings
 
 # Import custom modules for DICOM handling
-from dicom_viewer.series_loader import load_sorted_series  # function to load DICOM files in order
-from dicom_viewer.image_processor import load_dicom_image  # function to convert DICOM file to image
-from dicom_viewer.texture_utils import pil_to_texture  # function to convert PIL image to Kivy texture
+from dicom_viewer.background_loader import SeriesLoader  # scans and decodes the series in the background
+from dicom_viewer.image_processor import render_slice, slice_window, pack_slice  # decoded slice -> display arrays, default window
+from dicom_viewer.dicom_windowing import WINDOW_PRESETS, lut_supported, window_bounds  # presets, GPU window uniforms
+from dicom_viewer.texture_utils import array_to_texture  # function to blit a uint8 array into a Kivy texture
+from dicom_viewer.gpu_windowing import WindowedImage, packed_to_texture  # noqa: F401 (WindowedImage is used in the kv file)
+from dicom_viewer.mpr import AXIAL, VIEWS, reformat_slice, reformat_info  # coronal/sagittal reformats
+from dicom_viewer.cine import CinePlayer  # wall-clock locked cine playback
+from dicom_viewer.slab import SlabProjector, SLAB_MODES  # thick-slab MIP/MinIP/average
 from dicom_viewer.viewer_state import ViewerState  # class to keep track of images and current slice
 from dicom_viewer.mouse_controller import MouseController  # class to handle mouse/scroll interactions
+from dicom_viewer.instrumentation import perf  # per-stage timings shown in the stats overlay
+from dicom_viewer.memory_budget import memory, TEXTURES, SLAB  # shared memory budget
+from dicom_viewer.session_cache import SessionCache, SessionEntry  # recently viewed datasets kept warm
 
 
 class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy Screen
@@ -18,12 +30,33 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
         """
         Initialize the DicomScreen.
 
-        - state: keeps track of the loaded images and current index.
+        - state: keeps track of the loaded series and current index.
         - mouse: handles mouse interactions like right-click and scroll.
         """
         super().__init__(**kwargs)  # call parent constructor to initialize the Screen properly
-        self.state = ViewerState()  # create a ViewerState object to store images and current index
+        # create a ViewerState object to store the series and current index (textures are created lazily)
+        self.state = ViewerState(self.create_texture, TEXTURE_CACHE_SIZE, PREFETCH_SLICES)
         self.mouse = MouseController()  # create a MouseController object to handle mouse input
+        self.loader = None  # background SeriesLoader of the current series
+        self.session = SessionCache(SESSION_CACHE_SIZE)  # datasets left recently, ready to be shown again
+        self._warm = None  # SessionEntry taken from the session cache, restored by on_pre_enter
+        self._poll_event = None  # Clock event draining the loader results
+        self._prefetch_event = None  # Clock event preparing textures around the current slice
+        self._overlay_event = None  # Clock event refreshing the stats overlay
+        self._pending_index = None  # slice requested during this frame, shown before the next one
+        self._navigate_event = None  # Clock event applying _pending_index
+        self._syncing_slider = False  # True while update_image moves the slider itself
+        self._syncing_series = False  # True while on_series_list fills the series spinner
+        self._series_ids = {}  # series spinner label -> series_id (None: main series)
+        self.gpu_window = False  # True when window/level is applied by the image shader
+        self._textures_dirty = False  # slices decoded since the reformat/slab textures were made
+        self._load_start = None  # time.perf_counter() when the current series started loading
+        self.slab_mode = None  # slab.MIP, MINIP or AVERAGE; None shows single slices
+        self.slab_thickness = 10  # slices per slab
+        self.slab = None  # SlabProjector of the displayed volume (None when slabs are off)
+        self.cine = CinePlayer(CINE_FPS)  # cine playback scheduler
+        self._cine_event = None  # Clock event advancing the playback every frame
+        self._cine_status_time = 0.0  # last time the cine statistics were shown
 
     # -------------------------------
     #   MOUSE INPUT HANDLING
@@ -36,13 +69,12 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
         Handles:
         - Mouse scroll: navigate slices (up/down)
         - Right-click: stored for drag actions
+        - Left-click: stored for window/level drag
         """
         res = self.mouse.touch_down(widget, touch)  # delegate the event to MouseController
 
-        if res == 'scrolldown':  # if user scrolled down
-            self.next_image()  # go to next image slice
-        elif res == 'scrollup':  # if user scrolled up
-            self.previous_image()  # go to previous image slice
+        if res in ('scrolldown', 'scrollup'):  # if user scrolled (down = next slices)
+            self.move_slices(self.mouse.scroll_steps(res))  # quick wheel clicks move further
 
         return True  # consume the touch event so it doesn't propagate further
 
@@ -50,14 +82,16 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
         """
         Called when the user moves the mouse/finger on the image.
 
-        Handles dragging with right-click to navigate slices vertically.
+        Handles dragging with right-click to navigate slices vertically,
+        and dragging with left-click to adjust window/level.
         """
-        res = self.mouse.touch_move(widget, touch)  # delegate the move event to MouseController
+        steps = self.mouse.touch_move(widget, touch)  # slices to move, scaled by drag speed
+        if steps:
+            self.move_slices(steps)  # up = previous slices, down = next slices
 
-        if res == "up":  # if dragging moved up
-            self.previous_image()  # go to previous image slice
-        elif res == "down":  # if dragging moved down
-            self.next_image()  # go to next image slice
+        delta = self.mouse.window_move(widget, touch)  # left-drag movement, if any
+        if delta:
+            self.adjust_window(*delta)
 
         return True  # consume the event
 
@@ -77,19 +111,45 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
     def next_image(self):  # move to next DICOM slice
         """
         Move to the next DICOM slice.
-
-        Updates the displayed image if index changes.
         """
-        if self.state.set_index(self.state.current_index + 1):  # increase index if possible
-            self.update_image()  # refresh image on screen
+        self.move_slices(1)
 
     def previous_image(self):  # move to previous DICOM slice
         """
         Move to the previous DICOM slice.
+        """
+        self.move_slices(-1)
+
+    def move_slices(self, steps):
+        """
+        Move by a number of slices from the target of this frame
+        (several events in one frame add up).
+        """
+        if self.state.count() == 0:
+            return
+        target = self._pending_index if self._pending_index is not None else self.state.current_index
+        self.request_index(min(max(target + steps, 0), self.state.count() - 1))
+
+    def request_index(self, index):
+        """
+        Ask to display a slice. Requests are coalesced: only the last
+        index requested before the next frame is displayed, so fast
+        scrolling never renders slices that would not be seen.
+        Manual navigation stops cine playback.
+        """
+        if self.cine.playing:
+            self.stop_cine()
+        self._pending_index = index
+        if self._navigate_event is None:
+            self._navigate_event = Clock.schedule_once(self.apply_navigation, 0)  # before the next frame
 
-        Updates the displayed image if index changes.
+    def apply_navigation(self, dt):
         """
-        if self.state.set_index(self.state.current_index - 1):  # decrease index if possible
+        Clock callback: jump directly to the last requested slice.
+        """
+        self._navigate_event = None
+        index, self._pending_index = self._pending_index, None
+        if index is not None and index != self.state.current_index and self.state.set_index(index):
             self.update_image()  # refresh image on screen
 
     def on_slider_change(self, slider, value):  # called when slider value changes
@@ -97,11 +157,193 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
         Called when the slice slider is moved.
 
         Converts the slider value to the correct slice index
-        and updates the displayed image.
+        and requests it for the next frame.
         """
+        if self._syncing_slider:
+            return  # moved by update_image, not by the user
         idx = self.state.count() - 1 - int(value)  # convert slider value to image index (invert slider)
-        if self.state.set_index(idx):  # set new index if valid
-            self.update_image()  # refresh image
+        if 0 <= idx < self.state.count():
+            self.request_index(idx)
+
+    # -------------------------------
+    #     CINE PLAYBACK
+    # -------------------------------
+
+    def toggle_cine(self, active):
+        """
+        Start or stop cine playback (Cine button).
+        """
+        if active:
+            self.start_cine()
+        else:
+            self.stop_cine()
+
+    def start_cine(self):
+        """
+        Play the slices from the current one, at cine.fps.
+        """
+        if self.state.count() < 2:
+            self.ids.cine_button.state = "normal"
+            return
+        self.cine.start(self.state.current_index)
+        if self._cine_event is None:
+            self._cine_event = Clock.schedule_interval(self.cine_tick, 0)  # every frame
+
+    def stop_cine(self):
+        """
+        Stop cine playback and show its statistics.
+        """
+        if self._cine_event is not None:
+            self._cine_event.cancel()
+            self._cine_event = None
+        if self.cine.playing:
+            self.cine.stop()
+            self.update_cine_status()
+        self.ids.cine_button.state = "normal"
+
+    def set_cine_fps(self, text):
+        """
+        Change the playback rate (spinner text such as "30 fps").
+        """
+        self.cine.set_fps(int(text.split()[0]), self.state.current_index)
+
+    def cine_tick(self, dt):
+        """
+        Clock callback: show the slice due now. Frames are never delayed:
+        if the display fell behind, the late ones are skipped, and a slice
+        that is not decoded yet is counted as dropped.
+        """
+        index = self.cine.tick(self.state.count())
+        if index is None:
+            return True  # next frame not due yet
+        if self.state.set_index(index):  # also sets the prefetch direction
+            self.update_image()
+        if index in self.state.textures:
+            self.cine.frame_shown()
+        else:
+            self.cine.frame_missed()
+
+        now = time.perf_counter()
+        if now - self._cine_status_time > 0.5:
+            self._cine_status_time = now
+            self.update_cine_status()
+        return True
+
+    def update_cine_status(self):
+        """
+        Show the requested and achieved frame rates and the dropped frames.
+        """
+        cine = self.cine
+        self.ids.load_status.text = (f"Cine {cine.fps:.0f} fps: {cine.achieved_fps():.1f} fps, "
+                                     f"{cine.dropped} dropped")
+
+    # -------------------------------
+    #     WINDOW / LEVEL
+    # -------------------------------
+
+    def current_window(self):
+        """
+        Return the window (center, width) used for the displayed slice,
+        None if the slice is not decoded yet.
+        """
+        if self.state.window is not None:
+            return self.state.window
+        if self.state.count() == 0:
+            return None
+        volume = self.state.volume
+        # default window of the displayed slice (of the middle slice for reformats);
+        # taken from the stored slice so no slab or reformat is computed again
+        index = self.state.current_index if self.state.view == AXIAL else volume.count() // 2
+        raw = volume.best_slice(index)
+        if raw is None:
+            return None
+        return slice_window(raw, volume.slices[index])
+
+    def adjust_window(self, dx, dy):
+        """
+        Change window/level from a left-drag movement.
+
+        - Horizontal movement changes the width (contrast)
+        - Vertical movement changes the center (brightness)
+        The step scales with the current width so small and large windows
+        are both easy to adjust.
+        """
+        window = self.current_window()
+        if window is None:
+            return
+        center, width = window
+        step = max(width, 1.0) / 200.0  # window units per pixel
+        self.set_window((center + dy * step, max(width + dx * step, 1.0)))
+
+    def apply_preset(self, name):
+        """
+        Apply a named window preset (see WINDOW_PRESETS), or the DICOM
+        default window for "Default".
+        """
+        self.set_window(WINDOW_PRESETS.get(name))
+
+    def set_window(self, window):
+        """
+        Change the display window and re-render the displayed slice.
+        Other slices are re-rendered lazily when displayed or prefetched.
+        """
+        self.state.set_window(window, rerender=not self.gpu_window)  # GPU: textures stay valid
+        self.update_image()
+
+    def update_window_bounds(self):
+        """
+        Pass the window of the displayed slice to the image shader (GPU windowing).
+        """
+        window = self.current_window()
+        if window is None:
+            return
+        info = self.slice_info(self.state.current_index)
+        self.ids.dicom_image.set_window_bounds(*window_bounds(
+            self.state.volume.pixels.dtype, info.rescale_slope, info.rescale_intercept, *window))
+
+    def update_window_label(self):
+        """
+        Show the current window center/width.
+        """
+        window = self.current_window()
+        if window is None:
+            self.ids.window_label.text = ""
+        else:
+            self.ids.window_label.text = f"W {window[1]:.0f}  L {window[0]:.0f}"
+
+    # -------------------------------
+    #     THICK SLABS
+    # -------------------------------
+
+    def set_slab_mode(self, text):
+        """
+        Choose the slab projection (slab spinner): "MIP", "MinIP",
+        "Average", or anything else for single slices.
+        """
+        self.slab_mode = text if text in SLAB_MODES else None
+        self.update_slab()
+
+    def set_slab_thickness(self, text):
+        """
+        Change the slab thickness (spinner text such as "10 slices").
+        """
+        self.slab_thickness = int(text.split()[0])
+        self.update_slab()
+
+    def update_slab(self):
+        """
+        Create, reconfigure or drop the slab projector of the displayed
+        volume, then redraw. Slabs apply to the acquired slices only.
+        """
+        volume = self.state.volume
+        if self.slab_mode is None or volume is None:
+            self.slab = None
+        elif self.slab is None or self.slab.volume is not volume:
+            self.slab = SlabProjector(volume, self.slab_mode, self.slab_thickness)
+        else:
+            self.slab.configure(self.slab_mode, self.slab_thickness)
+        self.state.textures.clear(recycle=True)
+        self.update_image()
 
     # -------------------------------
     #     LOADING SERIES
@@ -111,49 +353,470 @@ class DicomScreen(Screen):  # define the DicomScreen class, inherits from Kivy S
         """
         Called before the screen is displayed.
 
-        - Loads the selected DICOM series from the dataset folder.
-        - Converts each image to a texture and stores it in state.
-        - Updates the slider max value and displays the first image.
+        - Starts loading the selected DICOM series in the background,
+          or takes over the loader started by preload() when the dataset
+          was selected (its queued slices are delivered right away).
+        - A dataset viewed recently is shown again at once, where it was left
+          (see restore_warm).
+        - Slices are shown as soon as they are decoded; the slider range
+          is set once the series has been scanned.
         """
         folder = App.get_running_app().selected_file  # get selected folder from the app
         if not folder:  # if no folder selected
             print("No dataset selected.")  # print warning
             return  # exit early
 
-        files = load_sorted_series(folder)  # load all DICOM files sorted by anatomical position
+        self.reset_view()
+        self.on_series_list([])  # filled by the loader once the folder is scanned
 
+        self.preload(folder)  # no-op if this dataset is already loading
+        if self._warm is not None:
+            self.restore_warm()
+        # drain finished slices once per frame on the main thread
+        self._poll_event = Clock.schedule_interval(self.poll_loader, 0)
+
+    def reset_view(self):
+        """
+        Clear the displayed series before another one is loaded.
+        """
         self.state.reset()  # clear any previously loaded images
+        self.slab = None
+        self.ids.dicom_image.texture = None  # do not show the previous series
+        self.ids.window_label.text = ""
+        self.ids.load_status.text = "Scanning series..."
+
+    def preload(self, folder, series=None):
+        """
+        Start loading a dataset in the background before the viewer is shown
+        (called when the dataset is selected on the main screen), so the
+        first slices are ready by the time the user presses Start.
+        Results stay queued in the loader until the screen polls it.
+
+        Parameters:
+        - folder: path to the dataset folder
+        - series: series_id of the series to load (None: the main series)
+        """
+        if (self.loader is not None and self.loader.folder == folder
+                and self.loader.series == series and not self.loader.cancelled):
+            return  # already loading this series
+        self.park()  # keep a dataset viewed before warm, cancel a mere preload
+
+        entry = self.session.take(folder)
+        if entry is not None:
+            if series is None or entry.loader.series == series:
+                # viewed recently: reuse its loader (shown by restore_warm)
+                self.loader = entry.loader
+                self._warm = entry
+                self._load_start = None
+                return
+            entry.loader.cancel()  # another series of the folder is wanted
+            memory.discard(folder)
+
+        self._load_start = time.perf_counter()
+        self.loader = SeriesLoader(
+            folder,
+            on_series=self.on_series_scanned,
+            on_slice=self.on_slice_loaded,
+            on_done=self.on_series_loaded,
+            cache_folder=CACHE_FOLDER,
+            volume_cache=VOLUME_CACHE,
+            processes=DECODE_PROCESSES,
+            series=series,
+            on_series_list=self.on_series_list,
+            preview=PROGRESSIVE_PREVIEW,
+            on_preview=self.on_preview_loaded,
+        )
+        self.loader.start()  # scan + decode on worker threads
+
+    def restore_warm(self):
+        """
+        Show a dataset taken from the session cache: its volume is already
+        (at least partly) decoded, and the slice, plane and window it was
+        left with are restored.
+        """
+        entry, self._warm = self._warm, None
+        loader = entry.loader
+        self.on_series_list(loader.series_list)
+        self.on_series_scanned(loader.volume)
+        if self.state.count() == 0:
+            return
+
+        self.state.set_view(entry.view)
+        for view in VIEWS:
+            self.ids[f"view_{view}"].state = "down" if view == self.state.view else "normal"
+        self.state.set_index(entry.index)
+        self.state.set_window(entry.window, rerender=not self.gpu_window)
+        self.update_slider_range()
+        self.update_image()
+
+    def on_leave(self):  # called automatically when the screen is left
+        """
+        Keep the dataset warm when leaving the viewer (see park).
+        """
+        self.park()
 
-        for path in files:  # loop over each file path
-            try:
-                img = load_dicom_image(path)  # read DICOM file and convert to image
-                tex = pil_to_texture(img)  # convert image to Kivy texture
-                self.state.images.append(tex)  # add texture to state
-            except Exception as e:  # catch errors (e.g., corrupted DICOM)
-                print("Image error:", path, e)  # print error message
+    def park(self):
+        """
+        Leave the current dataset. A dataset that was displayed is parked in
+        the session cache with its slice, plane and window (its loader is
+        paused); a dataset only loaded in advance is cancelled.
+        """
+        loader, entry = self.loader, self._warm
+        if entry is None and loader is not None and not loader.cancelled \
+                and loader.volume is not None and self.state.volume is loader.volume:
+            entry = SessionEntry(loader, self.state.current_index, self.state.view, self.state.window)
+        if entry is None:
+            self.stop_loading()
+            return
+        self.loader = None  # parked, not cancelled
+        self.stop_loading()
+        self.session.park(entry)
+        self.state.reset()  # textures are made again when the dataset is shown
+        self.slab = None
+
+    def stop_loading(self):
+        """
+        Cancel the background loader and stop polling it.
+        """
+        self.stop_cine()
+        self._warm = None
+        if self._poll_event is not None:
+            self._poll_event.cancel()
+            self._poll_event = None
+        if self._prefetch_event is not None:
+            self._prefetch_event.cancel()
+            self._prefetch_event = None
+        if self._navigate_event is not None:
+            self._navigate_event.cancel()
+            self._navigate_event = None
+        self._pending_index = None
+        if self.loader is not None:
+            self.loader.cancel()
+            memory.discard(self.loader.folder)  # its volume, preview and textures are dropped
+            self.loader = None
+
+    def poll_loader(self, dt):
+        """
+        Clock callback: hand decoded slices from the loader to the UI.
+        Returning False unschedules the callback once loading is finished.
+        """
+        running = self.loader is not None and self.loader.poll()
+        if self._textures_dirty:
+            # reformats and slabs use many slices: redraw them once per frame, not per slice
+            self._textures_dirty = False
+            if self.slab is not None:
+                self.slab.invalidate()
+            self.state.textures.clear(recycle=True)
+            self.update_image()
+        if not running:
+            self._poll_event = None
+            return False
+        return True
+
+    def on_series_list(self, series_list):
+        """
+        Fill the series spinner with the series of the folder.
+        The spinner stays hidden when the folder holds a single series.
 
-        if not self.state.images:  # if no images loaded
+        Parameters:
+        - series_list: [(series_id, label), ...], main series first
+        """
+        spinner = self.ids.series_spinner
+        labels = [f"{i + 1}. {label}" for i, (_, label) in enumerate(series_list)]
+        # the main series is loaded with series=None (see SeriesLoader)
+        self._series_ids = {text: (sid if i else None) for i, (text, (sid, _)) in
+                            enumerate(zip(labels, series_list))}
+        current = self.loader.series if self.loader is not None else None
+        self._syncing_series = True
+        spinner.values = labels
+        spinner.text = next((text for text, sid in self._series_ids.items() if sid == current),
+                            labels[0] if labels else "")
+        self._syncing_series = False
+        spinner.opacity = 1 if len(labels) > 1 else 0
+        spinner.disabled = len(labels) <= 1
+
+    def select_series(self, text):
+        """
+        Load another series of the current dataset (series spinner).
+        """
+        if self._syncing_series or self.loader is None or text not in self._series_ids:
+            return
+        series = self._series_ids[text]
+        if series == self.loader.series:
+            return  # already displayed
+        folder = self.loader.folder
+        self.stop_loading()
+        self.reset_view()
+        self.preload(folder, series)
+        self._poll_event = Clock.schedule_interval(self.poll_loader, 0)
+
+    def on_series_scanned(self, volume):
+        """
+        Called once the series has been sorted.
+        Stores the (still empty) volume and sets the slider range.
+        """
+        if volume.count() == 0:  # if no DICOM files found
             print("No DICOM images loaded.")  # warn user
-            return  # exit early
+            self.ids.load_status.text = "No DICOM images found"
+            return
 
-        self.ids.slice_slider.max = self.state.count() - 1  # set slider max value
-        self.ids.slice_slider.value = self.state.count() - 1  # set slider to first slice (top)
+        # 16-bit textures windowed on the GPU when enabled and supported (CPU lookup tables otherwise)
+        use_gpu = GPU_WINDOWING and lut_supported(volume.pixels.dtype)
+        self.gpu_window = self.ids.dicom_image.enable_gpu_windowing(use_gpu)
 
-        self.update_image()  # display first image
+        self.state.set_volume(volume)  # slices are filled in as they are decoded
+        self.update_slab()
+        for view in VIEWS:  # new series: acquired plane
+            self.ids[f"view_{view}"].state = "down" if view == AXIAL else "normal"
+
+        self.update_slider_range()
+        self.update_progress()
+
+    def update_slider_range(self):
+        """
+        Fit the slider to the slices of the displayed plane (current slice at the top).
+        """
+        self._syncing_slider = True
+        self.ids.slice_slider.max = max(self.state.count() - 1, 1)  # set slider max value
+        self.ids.slice_slider.value = self.state.count() - 1 - self.state.current_index
+        self._syncing_slider = False
+
+    def set_view(self, view):
+        """
+        Show the acquired slices or a reformat (view buttons).
+
+        Parameters:
+        - view: mpr.AXIAL, CORONAL or SAGITTAL
+        """
+        if self.state.count() == 0:
+            return
+        self._pending_index = None
+        self.state.set_view(view)
+        self.update_slider_range()
+        self.update_image()
+
+    def on_preview_loaded(self, index):
+        """
+        Called on the main thread when the low-resolution preview of a slice
+        is ready (large series only). Shown until the full slice is decoded.
+        """
+        if self.state.volume is None or self.state.volume.is_loaded(index) or self.state.view != AXIAL:
+            return  # the full resolution is already there (reformats never use previews)
+        if index == self.state.current_index:
+            self.update_image()
+        elif index in self.state.prefetch_indices():
+            self.schedule_prefetch()
+        self.update_progress()
+
+    def on_slice_loaded(self, index, raw):
+        """
+        Called on the main thread for each decoded slice.
+        Refreshes the display if it is the current slice, otherwise
+        lets the prefetcher pick it up if it is close to the current slice.
+        A preview texture of the slice is replaced by the full resolution.
+        """
+        if self.state.view != AXIAL or self.slab is not None:
+            self._textures_dirty = True  # redrawn by poll_loader
+            self.update_progress()
+            return
+        self.state.textures.discard(index)  # drop its preview texture, if any
+        if index == self.state.current_index:
+            self.update_image()
+        elif index in self.state.prefetch_indices():
+            self.schedule_prefetch()
+        self.update_progress()
+
+    def on_series_loaded(self):
+        """
+        Called once every slice has been processed.
+        """
+        self.update_progress()
+
+    def update_progress(self):
+        """
+        Show the loading progress below the image.
+        """
+        loader = self.loader
+        if loader is None or loader.total == 0 or self.cine.playing:
+            return  # the cine statistics use the same label
+        if loader.previewed and loader.loaded == 0:
+            self.ids.load_status.text = f"Preview {loader.previewed}/{loader.total}"
+        elif loader.loaded < loader.total:
+            self.ids.load_status.text = f"Loading {loader.loaded}/{loader.total}"
+        else:
+            self.ids.load_status.text = f"{loader.total} slices"
 
     # -------------------------------
     #       DISPLAY UPDATE
     # -------------------------------
 
+    def create_texture(self, volume, index, texture=None):
+        """
+        Texture factory used by the ViewerState cache.
+        Textures must be created on the main thread.
+
+        Parameters:
+        - texture: recycled texture to update in place (None to create one)
+
+        Returns:
+        - Kivy texture of the slice (of its preview while the full
+          resolution is decoding), None if nothing is decoded yet
+        """
+        raw = self.slice_pixels(index)
+        if raw is None:
+            return None
+        info = self.slice_info(index)
+        if self.gpu_window:
+            # full stored values: the window is applied by the shader
+            return packed_to_texture(pack_slice(raw, info), texture)
+        return array_to_texture(render_slice(raw, info, self.state.window), texture)
+
+    def slice_pixels(self, index):
+        """
+        Return the stored values of a slice of the displayed plane: the
+        best decoded version of an acquired slice, or a reformat cut from
+        the volume (no file is read). None if not decoded yet.
+        """
+        volume = self.state.volume
+        if self.state.view != AXIAL:
+            return reformat_slice(volume, self.state.view, index)
+        if self.slab is not None:
+            # projection of the slab around the slice (once the slice itself is decoded)
+            return self.slab.project(index) if volume.is_loaded(index) else None
+        return volume.best_slice(index)
+
+    def slice_info(self, index):
+        """
+        Return the SliceInfo used to render a slice of the displayed plane.
+        """
+        volume = self.state.volume
+        if self.state.view == AXIAL:
+            return volume.slices[index]
+        return reformat_info(volume)
+
+    def schedule_prefetch(self):
+        """
+        Start preparing the textures around the current slice (once per frame).
+        """
+        if self._prefetch_event is None:
+            self._prefetch_event = Clock.schedule_interval(self.prefetch_textures, 0)
+
+    def prefetch_textures(self, dt):
+        """
+        Clock callback: create one missing texture of the prefetch window per frame,
+        so scrolling stays smooth. Stops once the window is complete.
+        """
+        if self.state.prefetch_next():
+            return True
+        self._prefetch_event = None
+        self.account_memory()  # the prefetch window is complete
+        return False
+
+    def account_memory(self):
+        """
+        Record the textures and slab caches of the displayed dataset in the
+        memory budget, and release data if it is exceeded (other datasets
+        first, then the slab caches and textures of this one).
+        """
+        if self.loader is None:
+            return
+        folder = self.loader.folder
+        textures = self.state.textures
+        memory.set(folder, TEXTURES, textures.nbytes, release=textures.clear)
+        slab = self.slab
+        if slab is not None:
+            memory.set(folder, SLAB, slab.nbytes, release=slab.invalidate)
+        else:
+            memory.discard(folder, SLAB)
+        memory.touch(folder)
+        memory.enforce(keep=folder)
+
     def update_image(self):  # update the displayed image
         """
         Updates the Kivy image widget with the currently selected slice texture.
         """
-        tex = self.state.get_current_texture()  # get current slice texture
+        if self.state.count() == 0:  # nothing loaded yet
+            return
+
+        with perf.timed("frame"):
+            self._show_current_slice()
+
+    def _show_current_slice(self):
+        """
+        Display the current slice texture and synchronize the controls.
+        """
+        if self.loader is not None and self.state.view == AXIAL:
+            self.loader.set_focus(self.state.current_index)  # decode around the displayed slice first
+
+        tex = self.state.get_current_texture()  # get current slice texture (None while decoding)
         if tex:  # if texture exists
             self.ids.dicom_image.texture = tex  # update Kivy Image widget
-            # synchronize slider value with current index
-            self.ids.slice_slider.value = self.state.count() - 1 - self.state.current_index  
+            self.ids.dicom_image.canvas.ask_update()  # redraw even if the same texture was updated in place
+            if self.gpu_window:
+                self.update_window_bounds()
+            self.update_window_label()
+        self.schedule_prefetch()  # prepare the next slices in the scrolling direction
+        # synchronize slider value with current index
+        self._syncing_slider = True
+        self.ids.slice_slider.value = self.state.count() - 1 - self.state.current_index
+        self._syncing_slider = False
+
+    # -------------------------------
+    #     PERFORMANCE OVERLAY
+    # -------------------------------
+
+    def toggle_stats(self, active):
+        """
+        Show or hide the performance overlay.
+        Showing it also turns on timing collection (see instrumentation.perf);
+        hiding it turns collection back off unless PERF_STATS is set.
+        """
+        overlay = self.ids.perf_overlay
+        if active:
+            perf.enabled = True
+            overlay.opacity = 1
+            if self._overlay_event is None:
+                self._overlay_event = Clock.schedule_interval(self.update_overlay, 0.5)
+            self.update_overlay(0)
+        else:
+            perf.enabled = PERF_STATS  # no timing overhead once the overlay is closed
+            overlay.opacity = 0
+            overlay.text = ""
+            if self._overlay_event is not None:
+                self._overlay_event.cancel()
+                self._overlay_event = None
+
+    def update_overlay(self, dt):
+        """
+        Clock callback: refresh the overlay with the frame rate, the load
+        progress and the p50/p95 duration of each stage.
+        """
+        lines = [f"{Clock.get_fps():.0f} fps  frame {1000.0 * Clock.frametime:.1f} ms"]
+
+        loader = self.loader
+        if loader is not None and loader.total and self._load_start is not None:
+            rate = loader.loaded / max(time.perf_counter() - self._load_start, 1e-6)
+            if loader.loaded < loader.total:
+                lines.append(f"loaded {loader.loaded}/{loader.total}  {rate:.0f} slices/s")
+            else:
+                lines.append(f"loaded {loader.total} slices")
+
+        if self.cine.playing:
+            lines.append(f"cine {self.cine.fps:.0f} fps target: {self.cine.achieved_fps():.1f} fps, "
+                         f"{self.cine.dropped} dropped / {self.cine.shown + self.cine.dropped}")
+
+        if memory.limit:
+            used = memory.report().get(self.loader.folder, {}) if self.loader is not None else {}
+            parts = "  ".join(f"{category} {n / 2 ** 20:.0f}" for category, n in used.items() if n)
+            lines.append(f"memory {memory.used() / 2 ** 20:.0f}/{memory.limit / 2 ** 20:.0f} MB  {parts}")
+
+        for stage, s in perf.summary().items():
+            line = f"{stage}: p50 {s['p50_ms']:.2f} ms  p95 {s['p95_ms']:.2f} ms"
+            if s["bytes"]:
+                line += f"  {s['bytes'] / 2 ** 20:.0f} MB"
+            lines.append(line)
+
+        self.ids.perf_overlay.text = "\n".join(lines)
 
     def go_back(self):  # switch back to main screen
         """
@@ -3,8 +3,10 @@
 import os  # work with folder paths
 from kivy.uix.screenmanager import Screen  # base Screen class
 from kivy.app import App  # access global app state
-from kivy.uix.button import Button  # create dynamic buttons
-from config import DATA_FOLDER  # root data folder
+from kivy.clock import Clock  # deliver background listings on the main thread
+from config import DATA_FOLDER, CACHE_FOLDER, PRELOAD_ON_SELECT  # root data folder, caches, speculative loading
+from dicom_viewer.folder_browser import FolderBrowser  # folder listings on a background thread
+from dicom_viewer.thumbnails import ThumbnailLoader  # dataset previews made in the background
 
 
 class MainScreen(Screen):
@@ -26,20 +28,45 @@ class MainScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_folder = None  # store selected folder (None until user clicks)
+        self.browser = FolderBrowser(CACHE_FOLDER)  # cached, asynchronous folder listings
+        self.thumbnails = ThumbnailLoader(CACHE_FOLDER)  # dataset previews
+        self._poll_event = None  # Clock event delivering listings and thumbnails
+        self._dataset_rows = {}  # dataset path -> row index in dataset_list.data
+        self._refresh_event = None  # Clock event redrawing the dataset list once per frame
 
     def on_pre_enter(self):
         """
         Called each time we return to this screen.
         Refresh the folder list.
         If a folder was previously selected, reload its datasets.
+        Cached listings are shown at once and refreshed in the background.
         """
+        if self._poll_event is None:
+            self._poll_event = Clock.schedule_interval(self.poll_background, 0.1)
+
         self.load_folder_list()
 
         if self.current_folder:
             self.load_dataset_list(self.current_folder)
         else:
             # Clear dataset list if no folder selected yet
-            self.ids.dataset_list.clear_widgets()
+            self.set_dataset_rows([])
+
+    def on_leave(self):
+        """
+        Stop delivering listings and making thumbnails while the viewer is shown.
+        """
+        if self._poll_event is not None:
+            self._poll_event.cancel()
+            self._poll_event = None
+        self.thumbnails.clear_pending()
+
+    def poll_background(self, dt):
+        """
+        Clock callback: show the folder listings and thumbnails made in the background.
+        """
+        self.browser.poll()
+        self.thumbnails.poll()
 
     # -------------------------------------------------------------------------
     #   FOLDER LIST (LEFT COLUMN)
@@ -47,32 +74,25 @@ class MainScreen(Screen):
     def load_folder_list(self):
         """Populate the folder list with subfolders inside DATA_FOLDER."""
 
-        folder_list = self.ids.folder_list
-        folder_list.clear_widgets()
+        root_folder = App.get_running_app().DATA_FOLDER
 
-        app = App.get_running_app()
-        root_folder = app.DATA_FOLDER
+        # Show the last listing at once, then refresh it in the background
+        cached = self.browser.cached(root_folder)
+        if cached is not None:
+            self.show_folders(root_folder, cached, {})
+        self.browser.request(root_folder, self.show_folders)
 
-        if not os.path.isdir(root_folder):
+    def show_folders(self, root_folder, names, counts):
+        """
+        Called (on the main thread) with the subfolders of DATA_FOLDER.
+        The RecycleView only creates widgets for the visible rows.
+        """
+        if names is None:
             print("DATA_FOLDER not found:", root_folder)
-            return
-
-        # Loop over subfolders inside DATA_FOLDER
-        for item in sorted(os.listdir(root_folder)):
-            full_path = os.path.join(root_folder, item)
-
-            if os.path.isdir(full_path):
-                # Create a folder button
-                btn = Button(
-                    text=item,
-                    size_hint_y=None,
-                    height=50,
-                    background_normal="",               # remove default style
-                    background_color=(0.12, 0.12, 0.13, 1),
-                    color=(1, 1, 1, 1),                 # white text
-                    on_release=lambda b, p=full_path: self.select_folder(p)
-                )
-                folder_list.add_widget(btn)
+            names = []
+        self.ids.folder_list.data = [
+            {"text": name, "path": os.path.join(root_folder, name)} for name in names
+        ]
 
     def select_folder(self, folder_path):
         """
@@ -82,10 +102,12 @@ class MainScreen(Screen):
         - Clear selected dataset
         """
         self.current_folder = folder_path
+        self.thumbnails.clear_pending()  # previews of the previous folder are no longer needed
 
         # Clear selected dataset in global state
         App.get_running_app().selected_file = ""
         self.ids.selected_label.text = "Selected dataset: "
+        self.manager.get_screen("dicom").park()  # drop a dataset loaded in advance
 
         self.load_dataset_list(folder_path)
 
@@ -95,26 +117,60 @@ class MainScreen(Screen):
     def load_dataset_list(self, folder_path):
         """Load datasets that exist inside the selected folder."""
 
-        dataset_list = self.ids.dataset_list
-        dataset_list.clear_widgets()
+        cached = self.browser.cached(folder_path)
+        if cached is not None:
+            self.show_datasets(folder_path, cached, self.browser.cached_counts(folder_path))
+        else:
+            self.set_dataset_rows([])  # do not show the datasets of another folder
+        self.browser.request(folder_path, self.show_datasets, counts=True)
 
-        if not os.path.isdir(folder_path):
+    def show_datasets(self, folder_path, names, counts):
+        """
+        Called (on the main thread) with the datasets of a folder, and again
+        once their slice counts (from the cached series indexes) are known.
+        """
+        if folder_path != self.current_folder:
+            return  # another folder was selected in the meantime
+        if names is None:
             print("Folder not found:", folder_path)
-            return
+            names = []
+
+        data = []
+        for name in names:
+            path = os.path.join(folder_path, name)
+            count = counts.get(name)
+            text = f"{name}  ({count} slices)" if count else name
+            data.append({"text": text, "path": path, "thumbnail": self.thumbnails.cached(path)})
+            # Made in list order on a background thread; existing thumbnails are reused
+            # (checked against the fingerprint of the dataset's series index, when known)
+            self.thumbnails.request(path, self.show_thumbnail, self.browser.cached_fingerprint(path))
+        self.set_dataset_rows(data)
+
+    def set_dataset_rows(self, data):
+        """
+        Fill the dataset list and index its rows by dataset path.
+        """
+        self._dataset_rows = {row["path"]: i for i, row in enumerate(data)}
+        self.ids.dataset_list.data = data
 
-        # Loop through subdirectories inside the selected folder
-        for item in sorted(os.listdir(folder_path)):
-            full_path = os.path.join(folder_path, item)
+    def show_thumbnail(self, dataset, path):
+        """
+        Called (on the main thread) when the thumbnail of a dataset is ready.
+        The list is redrawn once per frame, however many thumbnails arrived.
+        """
+        row = self._dataset_rows.get(dataset)
+        if not path or row is None:
+            return
+        self.ids.dataset_list.data[row]["thumbnail"] = path
+        if self._refresh_event is None:
+            self._refresh_event = Clock.schedule_once(self.refresh_dataset_list, 0)
 
-            if os.path.isdir(full_path):
-                # Create a dataset button
-                btn = Button(
-                    text=item,
-                    size_hint_y=None,
-                    height=50,
-                    on_release=lambda b, p=full_path: self.select_dataset(p),
-                )
-                dataset_list.add_widget(btn)
+    def refresh_dataset_list(self, dt):
+        """
+        Clock callback: redraw the visible dataset rows with their new thumbnails.
+        """
+        self._refresh_event = None
+        self.ids.dataset_list.refresh_from_data()
 
     def select_dataset(self, path):
         """
@@ -126,6 +182,11 @@ class MainScreen(Screen):
         self.ids.selected_label.text = f"Selected dataset: {os.path.basename(path)}"
         print("Selected dataset:", path)
 
+        # Start loading while the user moves to the Start button
+        # (a dataset selected before is cancelled, or kept warm if it was viewed)
+        if PRELOAD_ON_SELECT:
+            self.manager.get_screen("dicom").preload(path)
+
     # -------------------------------------------------------------------------
     #   START BUTTON
     # -------------------------------------------------------------------------
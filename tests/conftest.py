@@ -0,0 +1,8 @@
+# === tests/conftest.py ===
+# Lets the tests import the application packages (dicom_viewer, ...) when
+# pytest is run from the repository root.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+# === tests/test_image_processor.py ===
+# Color (RGB) series are loaded as luminance, one value per pixel.
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydicom")
+
+from pydicom.dataset import Dataset, FileMetaDataset  # noqa: E402
+from pydicom.uid import SecondaryCaptureImageStorage, ExplicitVRLittleEndian, generate_uid  # noqa: E402
+
+from dicom_viewer.dicom_header import SliceInfo, read_slice_info  # noqa: E402
+from dicom_viewer.image_processor import read_slice_pixels, to_luminance  # noqa: E402
+from dicom_viewer.volume import Volume  # noqa: E402
+
+
+def write_rgb_slice(path, rgb):
+    """Save an (rows, columns, 3) uint8 array as an uncompressed RGB DICOM file."""
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = SecondaryCaptureImageStorage
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Rows, ds.Columns = rgb.shape[:2]
+    ds.SamplesPerPixel = 3
+    ds.PlanarConfiguration = 0
+    ds.PhotometricInterpretation = "RGB"
+    ds.BitsAllocated = 8
+    ds.BitsStored = 8
+    ds.HighBit = 7
+    ds.PixelRepresentation = 0
+    ds.PixelData = rgb.tobytes()
+    ds.save_as(str(path), enforce_file_format=True)
+
+
+def rgb_image():
+    rgb = np.zeros((4, 6, 3), dtype=np.uint8)
+    rgb[..., 0] = 200  # red
+    rgb[1, :, :] = 255  # one white row
+    return rgb
+
+
+def test_rgb_slice_is_read_as_luminance(tmp_path):
+    path = tmp_path / "rgb.dcm"
+    write_rgb_slice(path, rgb_image())
+    raw = read_slice_pixels(read_slice_info(str(path)))
+    assert raw.shape == (4, 6)
+    assert raw.dtype == np.uint8
+    assert raw[0, 0] == round(200 * 0.299)
+    assert raw[1, 0] == 255
+
+
+def test_rgb_series_loads_into_a_volume(tmp_path):
+    path = tmp_path / "rgb.dcm"
+    write_rgb_slice(path, rgb_image())
+    volume = Volume([read_slice_info(str(path))])
+    assert volume.load_slice(0).shape == (4, 6)
+    assert volume.is_complete
+
+
+def test_unsupported_layout_is_reported():
+    info = SliceInfo("x.dcm")
+    info.photometric, info.samples_per_pixel = "ARGB", 4
+    with pytest.raises(ValueError, match="Unsupported photometric interpretation"):
+        to_luminance(np.zeros((2, 2, 4), dtype=np.uint8), info)
@@ -0,0 +1,71 @@
+# === tests/test_mpr.py ===
+# Display orientation of the coronal and sagittal reformats.
+# Kivy shows array row 0 at the bottom of the screen: the top row of the
+# texture is the last row of the array returned by reformat_slice.
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydicom")
+
+from dicom_viewer.dicom_header import SliceInfo  # noqa: E402
+from dicom_viewer.mpr import CORONAL, SAGITTAL, reformat_slice, reformat_info  # noqa: E402
+from dicom_viewer.volume import Volume  # noqa: E402
+
+ROWS, COLUMNS, COUNT = 3, 5, 4
+AXIAL_IOP = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)  # rows towards patient left, columns towards posterior
+
+
+def make_volume(iop=AXIAL_IOP, ascending=True):
+    """
+    Volume whose voxel values encode their position: 100 * z + 10 * row + column,
+    z being the slice height (0 = foot, COUNT - 1 = head).
+    """
+    heights = list(range(COUNT)) if ascending else list(reversed(range(COUNT)))
+    slices = []
+    for z in heights:
+        info = SliceInfo(f"slice{z}.dcm")
+        info.position = float(z)
+        info.orientation = iop
+        info.pixel_spacing = (1.0, 1.0)
+        info.rows, info.columns = ROWS, COLUMNS
+        slices.append(info)
+    z = np.array(heights)[:, None, None]
+    r = np.arange(ROWS)[None, :, None]
+    c = np.arange(COLUMNS)[None, None, :]
+    return Volume(slices, pixels=(100 * z + 10 * r + c).astype(np.int16))
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_coronal_head_on_top_patient_right_on_left(ascending):
+    image = reformat_slice(make_volume(ascending=ascending), CORONAL, 0)
+    assert image.shape == (COUNT, COLUMNS)
+    assert image[-1, 0] // 100 == COUNT - 1  # top texture row: head
+    assert image[0, 0] // 100 == 0  # bottom texture row: foot
+    assert image[-1, 0] % 10 == 0  # left: column 0, patient right
+    assert image[-1, 0] // 10 % 10 == 0  # index 0: most anterior row
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sagittal_head_on_top_anterior_on_left(ascending):
+    image = reformat_slice(make_volume(ascending=ascending), SAGITTAL, 0)
+    assert image.shape == (COUNT, ROWS)
+    assert image[-1, 0] // 100 == COUNT - 1  # top texture row: head
+    assert image[-1, 0] // 10 % 10 == 0  # left: row 0, anterior
+    assert image[-1, -1] // 10 % 10 == ROWS - 1  # right: posterior
+    assert image[-1, 0] % 10 == 0  # index 0: patient right column
+
+
+def test_directions_follow_direction_cosines():
+    # rows towards patient right, columns towards anterior
+    volume = make_volume(iop=(-1.0, 0.0, 0.0, 0.0, -1.0, 0.0))
+    coronal = reformat_slice(volume, CORONAL, 0)
+    assert coronal[-1, 0] % 10 == COLUMNS - 1  # patient right is the last column
+    assert coronal[-1, 0] // 10 % 10 == ROWS - 1  # anterior is the last row
+    sagittal = reformat_slice(volume, SAGITTAL, 0)
+    assert sagittal[-1, 0] // 10 % 10 == ROWS - 1  # anterior on the left
+    assert sagittal[-1, 0] % 10 == COLUMNS - 1  # index 0: patient right
+
+
+def test_reformat_info_disables_axial_flips():
+    assert reformat_info(make_volume()).orientation == ()